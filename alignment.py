@@ -0,0 +1,283 @@
+"""
+Paarweises Alignment nach Needleman-Wunsch (global) und Smith-Waterman (lokal)
+
+Lücken kosten affin nach Gotoh: eine Lücke der Länge k kostet
+oeffnung + (k-1)*erweiterung. Die Matrizen werden Antidiagonale für
+Antidiagonale berechnet, alle Zellen einer Antidiagonale hängen nur von den
+beiden vorherigen ab und werden mit NumPy in einem Schritt gerechnet.
+
+Mit band werden nur Zellen höchstens band Spalten neben der Diagonale
+berechnet, Speicher und Zeit wachsen dann nur linear mit der Länge.
+"""
+
+from typing import Callable, NamedTuple
+import numpy as np
+
+from bioinformatik import Basen, leerbase
+from intervalle import Intervallkarte
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+# Herkunft einer Zelle in H, in den unteren beiden Bits der Rückverfolgung
+_DIAGONAL, _LINKS, _OBEN, _ANFANG = 0, 1, 2, 3
+# E bzw. F der Zelle verlängert eine Lücke statt eine zu öffnen
+_LINKS_WEITER, _OBEN_WEITER = 4, 8
+
+
+class Alignment(NamedTuple):
+    """
+    Ergebnis von aligniere
+
+    luecken_a und luecken_b sind (Position, Anzahl) in der Sequenz ohne leere
+    Basen: vor der Base an Position werden Anzahl leere Basen eingefügt.
+    bereich_a und bereich_b sind die alignierten Abschnitte, beim globalen
+    Alignment die ganzen Sequenzen.
+    """
+    punkte: float
+    luecken_a: list[tuple[int, int]]
+    luecken_b: list[tuple[int, int]]
+    bereich_a: range
+    bereich_b: range
+
+
+_blosum62 = """
+   A  R  N  D  C  Q  E  G  H  I  L  K  M  F  P  S  T  W  Y  V  B  Z  X  *
+A  4 -1 -2 -2  0 -1 -1  0 -2 -1 -1 -1 -1 -2 -1  1  0 -3 -2  0 -2 -1  0 -4
+R -1  5  0 -2 -3  1  0 -2  0 -3 -2  2 -1 -3 -2 -1 -1 -3 -2 -3 -1  0 -1 -4
+N -2  0  6  1 -3  0  0  0  1 -3 -3  0 -2 -3 -2  1  0 -4 -2 -3  3  0 -1 -4
+D -2 -2  1  6 -3  0  2 -1 -1 -3 -4 -1 -3 -3 -1  0 -1 -4 -3 -3  4  1 -1 -4
+C  0 -3 -3 -3  9 -3 -4 -3 -3 -1 -1 -3 -1 -2 -3 -1 -1 -2 -2 -1 -3 -3 -2 -4
+Q -1  1  0  0 -3  5  2 -2  0 -3 -2  1  0 -3 -1  0 -1 -2 -1 -2  0  3 -1 -4
+E -1  0  0  2 -4  2  5 -2  0 -3 -3  1 -2 -3 -1  0 -1 -3 -2 -2  1  4 -1 -4
+G  0 -2  0 -1 -3 -2 -2  6 -2 -4 -4 -2 -3 -3 -2  0 -2 -2 -3 -3 -1 -2 -1 -4
+H -2  0  1 -1 -3  0  0 -2  8 -3 -3 -1 -2 -1 -2 -1 -2 -2  2 -3  0  0 -1 -4
+I -1 -3 -3 -3 -1 -3 -3 -4 -3  4  2 -3  1  0 -3 -2 -1 -3 -1  3 -3 -3 -1 -4
+L -1 -2 -3 -4 -1 -2 -3 -4 -3  2  4 -2  2  0 -3 -2 -1 -2 -1  1 -4 -3 -1 -4
+K -1  2  0 -1 -3  1  1 -2 -1 -3 -2  5 -1 -3 -1  0 -1 -3 -2 -2  0  1 -1 -4
+M -1 -1 -2 -3 -1  0 -2 -3 -2  1  2 -1  5  0 -2 -1 -1 -1 -1  1 -3 -1 -1 -4
+F -2 -3 -3 -3 -2 -3 -3 -3 -1  0  0 -3  0  6 -4 -2 -2  1  3 -1 -3 -3 -1 -4
+P -1 -2 -2 -1 -3 -1 -1 -2 -2 -3 -3 -1 -2 -4  7 -1 -1 -4 -3 -2 -2 -1 -2 -4
+S  1 -1  1  0 -1  0  0  0 -1 -2 -2  0 -1 -2 -1  4  1 -3 -2 -2  0  0  0 -4
+T  0 -1  0 -1 -1 -1 -1 -2 -2 -1 -1 -1 -1 -2 -1  1  5 -2 -2  0 -1 -1  0 -4
+W -3 -3 -4 -4 -2 -2 -3 -2 -2 -3 -2 -3 -1  1 -4 -3 -2 11  2 -3 -4 -3 -2 -4
+Y -2 -2 -2 -3 -2 -1 -2 -3  2 -1 -1 -2 -1  3 -3 -2 -2  2  7 -1 -3 -2 -1 -4
+V  0 -3 -3 -3 -1 -2 -2 -3 -3  3  1 -2  1 -1 -2 -2  0 -3 -1  4 -3 -2 -1 -4
+B -2 -1  3  4 -3  0  1 -1  0 -3 -4  0 -3 -3 -2  0 -1 -4 -3 -3  4  1 -1 -4
+Z -1  0  0  1 -3  3  4 -2  0 -3 -3  1 -1 -3 -1  0 -1 -3 -2 -2  1  4 -1 -4
+X  0 -1 -1 -1 -2 -1 -1 -1 -1 -1 -1 -1 -1 -1 -2  0  0 -2 -1 -1 -1 -1 -1 -4
+* -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4 -4  1
+"""
+
+
+def blosum62(buchstaben: bytes) -> np.ndarray:
+    "Die BLOSUM62-Werte der Paare aus buchstaben, unbekannte Buchstaben zählen wie X."
+
+    kopf, *zeilen = _blosum62.split('\n')[1:-1]
+    reihenfolge = kopf.split()
+    werte = np.array([zeile.split()[1:] for zeile in zeilen], dtype=float)
+    index = [reihenfolge.index(chr(c)) if chr(c) in reihenfolge else reihenfolge.index('X') for c in buchstaben]
+    return werte[np.ix_(index, index)]
+
+
+def ohneLuecken(chars: bytes) -> bytes:
+    return bytes(chars).replace(leerbase, b'')
+
+
+@logme(logger.debug)
+def aligniere(a: bytes, b: bytes, lokal: bool = False, band: int = None,
+              treffer: float = 5, fehler: float = -4, oeffnung: float = 10, erweiterung: float = 0.5) -> Alignment:
+    """
+    Aligniert die Basen a und b, leere Basen darin werden ignoriert.
+
+    band begrenzt die Berechnung auf einen Streifen um die Diagonale, der
+    breit genug für den Längenunterschied der Sequenzen ist. Ein Alignment,
+    das den Streifen verlassen müsste, wird nicht gefunden.
+    """
+
+    a = np.frombuffer(ohneLuecken(a).upper(), dtype=np.uint8)
+    b_rueck = np.frombuffer(ohneLuecken(b).upper()[::-1], dtype=np.uint8)
+    n, m = len(a), len(b_rueck)
+
+    def wertung(d: int, von: int, bis: int) -> np.ndarray:
+        return np.where(a[von-1:bis] == b_rueck[m-d+von:m-d+bis+1], treffer, fehler)
+
+    return gotoh(n, m, wertung, lokal, band, oeffnung, erweiterung)
+
+
+def gotoh(n: int, m: int, wertung: Callable[[int, int, int], np.ndarray], lokal: bool = False, band: int = None,
+          oeffnung: float = 10, erweiterung: float = 0.5) -> Alignment:
+    """
+    Berechnet ein Alignment von n mit m Positionen.
+
+    wertung(d, von, bis) liefert die Punkte für das Gegenüberstellen der
+    Positionen i-1 und d-i-1 für alle i von von bis bis einschließlich.
+    """
+
+    # Erlaubte Werte von j-i
+    if band is None:
+        unten, oben = -n, m
+    else:
+        band = max(band, 1)
+        unten, oben = min(0, m-n) - band, max(0, m-n) + band
+
+    # Je Antidiagonale d=i+j die Zeilen i von start bis ende (einschließlich),
+    # die Werte liegen mit einem -inf an jedem Rand in Arrays ab Zeile start-1
+    diagonalen = n + m + 1
+    starts = np.empty(diagonalen, dtype=np.intp)
+    spuren: list[np.ndarray] = []
+    ninf = -np.inf
+    leer = np.full(3, ninf)
+    H2 = H1 = E1 = F1 = leer
+    s2 = s1 = 0
+    bester, beste_zelle = 0.0, (0, 0)
+
+    for d in range(diagonalen):
+        start = max(0, d-m, -((oben-d) // 2))
+        ende = min(n, d, (d-unten) // 2)
+        anzahl = ende - start + 1
+        starts[d] = start
+        H, E, F = np.full((3, anzahl+2), ninf)
+        spur = np.zeros(anzahl, dtype=np.uint8)
+        if anzahl > 0:
+            # Innere Zellen mit i >= 1 und j >= 1
+            von, bis = max(start, 1), min(ende, d-1)
+            if von <= bis:
+                k = bis - von + 1
+                innen = slice(von - start + 1, von - start + 1 + k)
+                # Zelle (i, j-1) auf d-1 und (i-1, j) auf d-1, (i-1, j-1) auf d-2
+                links = slice(von - s1, von - s1 + k)
+                ueber = slice(von-1 - s1, von-1 - s1 + k)
+                diag = slice(von-1 - s2, von-1 - s2 + k)
+                e_weiter = E1[links] - erweiterung
+                e_neu = H1[links] - oeffnung
+                e = np.maximum(e_weiter, e_neu, out=E[innen])
+                f_weiter = F1[ueber] - erweiterung
+                f_neu = H1[ueber] - oeffnung
+                f = np.maximum(f_weiter, f_neu, out=F[innen])
+                h = H2[diag] + wertung(d, von, bis)
+                von_links = e > h
+                np.maximum(h, e, out=h)
+                herkunft = np.where(f > h, _OBEN, von_links.view(np.uint8))
+                np.maximum(h, f, out=h)
+                if lokal:
+                    herkunft[h <= 0] = _ANFANG
+                    np.maximum(h, 0, out=h)
+                    besteinnen = int(np.argmax(h))
+                    if h[besteinnen] > bester:
+                        bester, beste_zelle = float(h[besteinnen]), (von+besteinnen, d-von-besteinnen)
+                H[innen] = h
+                herkunft |= (e_weiter >= e_neu).view(np.uint8) << 2
+                herkunft |= (f_weiter >= f_neu).view(np.uint8) << 3
+                spur[von-start:von-start+k] = herkunft
+            # Ränder: erste Zeile (i=0) und erste Spalte (j=0)
+            if start == 0:
+                if d == 0:
+                    H[1] = 0
+                    spur[0] = _ANFANG
+                else:
+                    H[1] = E[1] = 0 if lokal else -oeffnung - (d-1)*erweiterung
+                    spur[0] = _ANFANG if lokal else _LINKS | _LINKS_WEITER
+            if ende == d and d > 0:
+                H[anzahl] = F[anzahl] = 0 if lokal else -oeffnung - (d-1)*erweiterung
+                spur[anzahl-1] = _ANFANG if lokal else _OBEN | _OBEN_WEITER
+        spuren.append(spur)
+        H2, H1, E1, F1 = H1, H, E, F
+        s2, s1 = s1, start - 1
+
+    if lokal:
+        punkte = bester
+        i, j = beste_zelle
+    else:
+        punkte = float(H1[n - s1]) if n + m > 0 else 0.0
+        i, j = n, m
+    if punkte == ninf:
+        raise ValueError('Kein Alignment innerhalb des Bandes')
+    ende_a, ende_b = i, j
+
+    # Rückverfolgung, die Lücken werden vom Ende her gesammelt
+    luecken_a: list[tuple[int, int]] = []
+    luecken_b: list[tuple[int, int]] = []
+    zustand = _DIAGONAL
+    while i > 0 or j > 0:
+        spur = spuren[i+j][i - starts[i+j]]
+        if zustand == _DIAGONAL:
+            herkunft = spur & 3
+            if herkunft == _ANFANG:
+                if lokal:
+                    break
+                herkunft = _LINKS if i == 0 else _OBEN
+            if herkunft == _DIAGONAL:
+                i, j = i-1, j-1
+                continue
+            zustand = herkunft
+        if zustand == _LINKS:
+            # Base j von b gegenüber einer Lücke in a
+            weiter = spur & _LINKS_WEITER and j > 1
+            _verlaengere(luecken_a, i)
+            j -= 1
+        else:
+            weiter = spur & _OBEN_WEITER and i > 1
+            _verlaengere(luecken_b, j)
+            i -= 1
+        if not weiter:
+            zustand = _DIAGONAL
+    anfang_a, anfang_b = i, j
+
+    if lokal:
+        # Die Abschnitte vor und nach dem Alignment werden bündig gesetzt
+        if anfang_a < anfang_b:
+            _verlaengere(luecken_a, 0, anfang_b - anfang_a)
+        elif anfang_b < anfang_a:
+            _verlaengere(luecken_b, 0, anfang_a - anfang_b)
+    luecken_a.reverse()
+    luecken_b.reverse()
+    return Alignment(punkte, luecken_a, luecken_b, range(anfang_a, ende_a), range(anfang_b, ende_b))
+
+
+def _verlaengere(luecken: list[tuple[int, int]], pos: int, anzahl: int = 1):
+    if luecken and luecken[-1][0] == pos:
+        luecken[-1] = (pos, luecken[-1][1] + anzahl)
+    else:
+        luecken.append((pos, anzahl))
+
+
+def mitLuecken(basen: Basen, luecken: list[tuple[int, int]]) -> Basen:
+    """
+    Entfernt die leeren Basen und fügt die Lücken eines Alignments ein.
+
+    Die Markierungen bleiben bei ihren Basen, die neuen leeren Basen sind
+    nicht markiert.
+    """
+
+    anzahl = len(basen) - basen.chars.count(leerbase)
+    ziel = verschiebe(np.arange(anzahl), luecken)
+    return nachSpalten(basen, ziel, anzahl + sum(luecke for _, luecke in luecken))
+
+
+def verschiebe(spalten: np.ndarray, luecken: list[tuple[int, int]]) -> np.ndarray:
+    "Die Spalten nach dem Einfügen der Lücken, die Spalten müssen aufsteigend sein."
+
+    if not luecken:
+        return spalten
+    pos, anzahl = np.array(luecken, dtype=np.intp).T
+    summen = np.concatenate(([0], np.cumsum(anzahl)))
+    return spalten + summen[np.searchsorted(pos, spalten, side='right')]
+
+
+def nachSpalten(basen: Basen, ziel: np.ndarray, laenge: int) -> Basen:
+    """
+    Verteilt die Basen ohne die leeren auf die Spalten ziel einer neuen
+    Zeile der Länge laenge, die Markierungen bleiben bei ihren Basen.
+    """
+
+    roh = np.frombuffer(basen.chars, dtype=np.uint8)
+    positionen = np.flatnonzero(roh != leerbase[0])
+    chars = np.full(laenge, leerbase[0], dtype=np.uint8)
+    chars[ziel] = roh[positionen]
+    alt = basen.markierungen.liste(0, len(basen))
+    markierungen = [None]*laenge
+    for z, p in zip(ziel.tolist(), positionen.tolist()):
+        markierungen[z] = alt[p]
+    return Basen(chars.tobytes(), Intervallkarte.ausListe(markierungen))
@@ -1,10 +1,226 @@
-
 import re
+from bisect import bisect_right
+from typing import NamedTuple
+import numpy as np
 from PySide6.QtCore import QObject, Signal
+from intervalle import Intervallkarte
 import logging
 from logger import logme
 logger = logging.getLogger(__name__)
 
+leerbase = b'~'
+leerblock = 1024
+
+
+class Basen:
+    """
+    Kompakter Abschnitt von Basen
+
+    Die Buchstaben liegen als bytes vor, die Markierungen als Intervallkarte
+    mit Positionen relativ zum Anfang des Abschnitts. Ein Basen-Objekt wird
+    nicht verändert und kann deshalb in Undo-Kommandos aufbewahrt werden.
+    """
+
+    __slots__ = ('_chars', '_markierungen')
+
+    def __init__(self, chars: bytes = b'', markierungen: Intervallkarte = None):
+        self._chars = bytes(chars)
+        self._markierungen = markierungen if markierungen is not None else Intervallkarte()
+
+    @property
+    def chars(self) -> bytes:
+        return self._chars
+
+    @property
+    def markierungen(self) -> Intervallkarte:
+        return self._markierungen
+
+    def __len__(self) -> int:
+        return len(self._chars)
+
+    def __repr__(self) -> str:
+        return f'Basen[{len(self)}]'
+
+
+class Codontabelle(NamedTuple):
+    """
+    Genetischer Code nach NCBI
+
+    aminosaeuren und starts haben je 64 Zeichen für die Codons in der
+    Reihenfolge TTT, TTC, TTA, TTG, TCT, ... GGG, also Index 16*a+4*b+c mit
+    T=0, C=1, A=2, G=3. Ein Stoppcodon ist '*', ein Startcodon in starts 'M'.
+    """
+    name: str
+    aminosaeuren: str
+    starts: str
+
+
+codontabellen: dict[int, Codontabelle] = {
+    1: Codontabelle('Standard',
+        'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '---M------**--*----M---------------M----------------------------'),
+    2: Codontabelle('Vertebrate Mitochondrial',
+        'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG',
+        '----------**--------------------MMMM----------**---M------------'),
+    3: Codontabelle('Yeast Mitochondrial',
+        'FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '----------**----------------------MM---------------M------------'),
+    4: Codontabelle('Mold, Protozoan, Coelenterate Mitochondrial, Mycoplasma',
+        'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '--MM------**-------M------------MMMM---------------M------------'),
+    5: Codontabelle('Invertebrate Mitochondrial',
+        'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG',
+        '---M------**--------------------MMMM---------------M------------'),
+    6: Codontabelle('Ciliate, Dasycladacean, Hexamita Nuclear',
+        'FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '--------------*--------------------M----------------------------'),
+    9: Codontabelle('Echinoderm, Flatworm Mitochondrial',
+        'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG',
+        '-----------------------------------M---------------M------------'),
+    10: Codontabelle('Euplotid Nuclear',
+        'FFLLSSSSYY**CCCWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '-----------------------------------M----------------------------'),
+    11: Codontabelle('Bacterial, Archaeal, Plant Plastid',
+        'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '---M------**--*----M------------MMMM---------------M------------'),
+    12: Codontabelle('Alternative Yeast Nuclear',
+        'FFLLSSSSYY**CC*WLLLSPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '-------------------M---------------M----------------------------'),
+    13: Codontabelle('Ascidian Mitochondrial',
+        'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSGGVVVVAAAADDEEGGGG',
+        '---M------------------------------MM---------------M------------'),
+    14: Codontabelle('Alternative Flatworm Mitochondrial',
+        'FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG',
+        '-----------------------------------M----------------------------'),
+    16: Codontabelle('Chlorophycean Mitochondrial',
+        'FFLLSSSSYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '-----------------------------------M----------------------------'),
+    21: Codontabelle('Trematode Mitochondrial',
+        'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNNKSSSSVVVVAAAADDEEGGGG',
+        '-----------------------------------M---------------M------------'),
+    22: Codontabelle('Scenedesmus obliquus Mitochondrial',
+        'FFLLSS*SYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '-----------------------------------M----------------------------'),
+    23: Codontabelle('Thraustochytrium Mitochondrial',
+        'FF*LSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '--------------------------------M--M---------------M------------'),
+    24: Codontabelle('Rhabdopleuridae Mitochondrial',
+        'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG',
+        '---M---------------M---------------M---------------M------------'),
+    25: Codontabelle('Candidate Division SR1, Gracilibacteria',
+        'FFLLSSSSYY**CCGWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '---M-------------------------------M---------------M------------'),
+    26: Codontabelle('Pachysolen tannophilus Nuclear',
+        'FFLLSSSSYY**CC*WLLLAPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+        '-------------------M---------------M----------------------------'),
+}
+
+leserahmen = (1, 2, 3, -1, -2, -3)
+
+# T/U=0, C=1, A=2, G=3, alles andere 4
+_codonbase = np.full(256, 4, dtype=np.uint8)
+for _i, _c in enumerate(b'TCAG'):
+    _codonbase[_c] = _codonbase[_c | 0x20] = _i
+_codonbase[ord('U')] = _codonbase[ord('u')] = 0
+# Komplement in derselben Nummerierung, T<->A und C<->G
+_komplement = np.array([2, 3, 0, 1, 4], dtype=np.uint8)
+
+
+def codons(chars: bytes, rahmen: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Zerlegt chars im Leserahmen 1, 2, 3 oder -1, -2, -3 in Codons.
+
+    Leere Basen werden übersprungen, ein Codon kann also über Lücken reichen.
+    Die negativen Rahmen lesen den Gegenstrang vom Ende her. Ergebnis sind
+    der Index jedes Codons in einer Codontabelle (64 bei unbekannten Basen)
+    und die Positionen seiner drei Basen in chars als Array der Form (n, 3),
+    in Leserichtung.
+    """
+
+    if rahmen not in leserahmen:
+        raise ValueError(f'Ungültiger Leserahmen {rahmen}')
+    roh = np.frombuffer(chars, dtype=np.uint8)
+    positionen = np.flatnonzero(roh != leerbase[0])
+    basen = _codonbase[roh[positionen]]
+    if rahmen < 0:
+        positionen = positionen[::-1]
+        basen = _komplement[basen[::-1]]
+    versatz = abs(rahmen) - 1
+    anzahl = max(len(basen) - versatz, 0) // 3
+    positionen = positionen[versatz:versatz+3*anzahl].reshape(anzahl, 3)
+    basen = basen[versatz:versatz+3*anzahl].reshape(anzahl, 3).astype(np.intp)
+    index = 16*basen[:, 0] + 4*basen[:, 1] + basen[:, 2]
+    index[(basen == 4).any(axis=1)] = 64
+    return index, positionen
+
+
+def uebersetze(chars: bytes, rahmen: int, tabelle: int = 1) -> bytes:
+    """
+    Übersetzt chars im Leserahmen mit der Codontabelle Nummer tabelle.
+
+    Das Ergebnis ist so lang wie chars, jede Aminosäure steht unter der
+    mittleren Base ihres Codons, alle anderen Stellen sind leere Basen.
+    Codons mit unbekannten Basen werden zu X.
+    """
+
+    index, positionen = codons(chars, rahmen)
+    aminosaeuren = np.frombuffer(codontabellen[tabelle].aminosaeuren.encode('ascii') + b'X', dtype=np.uint8)
+    spur = np.full(len(chars), leerbase[0], dtype=np.uint8)
+    spur[positionen[:, 1]] = aminosaeuren[index]
+    return spur.tobytes()
+
+
+class ORF(NamedTuple):
+    "Ein offener Leserahmen von Spalte start bis vor ende, Start- und Stoppcodon eingeschlossen"
+    rahmen: int
+    start: int
+    ende: int
+    codons: int
+
+
+# ATG in der Nummerierung von codons()
+_atg = 16*2 + 4*0 + 3
+
+
+def orfs(chars: bytes, mindestlaenge: int = 100, tabelle: int = 1, rahmen: list[int] = leserahmen) -> list[ORF]:
+    """
+    Sucht in den Leserahmen die offenen Leserahmen von ATG bis zum Stoppcodon.
+
+    Zu jedem Stoppcodon zählt nur das erste ATG davor, weiter innen liegende
+    ATGs ergeben keine eigenen, kürzeren ORFs. Ohne Stoppcodon bis zum Ende
+    gibt es keinen ORF. mindestlaenge ist die Anzahl der Codons ohne das
+    Stoppcodon. Leere Basen werden wie bei codons() übersprungen.
+    """
+
+    stopps = np.frombuffer(codontabellen[tabelle].aminosaeuren.encode('ascii') + b'X', dtype=np.uint8) == ord('*')
+    ergebnis = []
+    for r in rahmen:
+        index, positionen = codons(chars, r)
+        stopp = stopps[index]
+        stelle_stopp = np.flatnonzero(stopp)
+        # Abschnitt k reicht bis einschließlich zum k-ten Stoppcodon
+        abschnitt = np.cumsum(stopp) - stopp
+        atgs = np.flatnonzero(index == _atg)
+        abschnitte, erste = np.unique(abschnitt[atgs], return_index=True)
+        mit_stopp = abschnitte < len(stelle_stopp)
+        anfaenge = atgs[erste[mit_stopp]]
+        enden = stelle_stopp[abschnitte[mit_stopp]]
+        lang = enden - anfaenge >= mindestlaenge
+        anfaenge, enden = anfaenge[lang], enden[lang]
+        erste_spalte = np.minimum(positionen[anfaenge].min(axis=1), positionen[enden].min(axis=1))
+        letzte_spalte = np.maximum(positionen[anfaenge].max(axis=1), positionen[enden].max(axis=1))
+        ergebnis += [ORF(r, start, ende+1, codons) for start, ende, codons in
+                     zip(erste_spalte.tolist(), letzte_spalte.tolist(), (enden-anfaenge).tolist())]
+    return ergebnis
+
+
+def istNukleotid(sequenzen: list[bytes]) -> bool:
+    "Bestehen die Sequenzen fast nur aus A, C, G, T, U und N?"
+
+    basen = b''.join(sequenzen).upper()
+    nukleotide = sum(basen.count(c) for c in b'ACGTUN')
+    return nukleotide >= 0.9*max(len(basen), 1)
+
 
 class Sequenz(QObject):
     """
@@ -12,29 +228,38 @@ class Sequenz(QObject):
 
     name: Name der Sequenz
 
-    Die Basen werden entweder über einen Textstring mit createBasenFromString oder
-    über ein Array mit importBasenArrayOfDict importiert. Das Array besteht aus Dicts
-    mit den Attributen char für den Buchstaben und background für die
-    Hintergrundfarbe (default weiß).
+    Die Basen werden über einen Textstring mit createBasenFromString oder als
+    fertiges Basen-Objekt übergeben. Projektdateien werden im Modul projektdatei
+    gelesen.
+
+    Die Buchstaben werden in einem bytearray gehalten, die Markierungen als
+    Intervalle (start, ende, markierung) in einer Intervallkarte. Base-Objekte
+    werden nur bei Bedarf als Sicht auf eine Position erzeugt.
     """
 
     nameChanged = Signal()
     basenRenewed = Signal()
-    basenInserted = Signal(int, list)
-    basenRemoved = Signal(int, list)
+    basenInserted = Signal(int, int)
+    basenRemoved = Signal(int, int)
+    basenChanged = Signal(int, int)
 
-    def __init__(self, _name, _basen: list['Base']=None):
+    def __init__(self, _name, _basen: Basen = None):
         super().__init__()
         self._name = _name
-        self._basen = _basen or []
+        self._chars = bytearray()
+        self._markierungen = Intervallkarte()
+        self._verbunden: set[Markierung] = set()
+        self._leerpraefix: list[int] = [0]
+        if _basen is not None:
+            self._setzeBasen(_basen)
 
     @property
-    def basen(self) -> list['Base']:
-        return self._basen
+    def basen(self) -> Basen:
+        return Basen(self._chars, self._markierungen.copy())
 
     @basen.setter
-    def basen(self, basen: list['Base']):
-        self._basen = basen
+    def basen(self, basen: Basen):
+        self._setzeBasen(basen)
         self.basenRenewed.emit()
 
     @property
@@ -47,60 +272,218 @@ class Sequenz(QObject):
         self.nameChanged.emit()
 
     @property
-    def basenstr(self):
-        txt = ''
-        for base in self.basen:
-            txt += base.char
-        return txt
-    
-    @logme(logger.debug)
-    def importBasenArrayOfDict(self, array):
-        self.basen = [Base(self, **baseobj) for baseobj in array]
+    def laenge(self) -> int:
+        return len(self._chars)
+
+    @property
+    def basenstr(self) -> str:
+        return self._chars.decode('ascii')
+
+    def base(self, index: int) -> 'Base':
+        return Base(self, index)
+
+    def char(self, index: int) -> str:
+        return chr(self._chars[index])
+
+    def chars(self, pos: int = 0, anzahl: int = None) -> bytes:
+        ende = self.laenge if anzahl is None else pos+anzahl
+        return bytes(self._chars[pos:ende])
+
+    def markierung(self, index: int) -> 'Markierung':
+        return self._markierungen.wert(index)
+
+    def markierungen(self, pos: int = 0, anzahl: int = None) -> list['Markierung']:
+        ende = self.laenge if anzahl is None else min(pos+anzahl, self.laenge)
+        return self._markierungen.liste(pos, ende)
+
+    def markierteBereiche(self, markierung: 'Markierung' = None) -> list[tuple[range, 'Markierung']]:
+        "Die markierten Abschnitte, auf Wunsch nur die einer Markierung"
+
+        if markierung is None:
+            return self._markierungen.abschnitte()
+        return [(bereich, markierung) for bereich in self._markierungen.bereicheMit(markierung)]
+
+    def markierungsausschnitt(self, pos: int, anzahl: int) -> Intervallkarte:
+        "Die Markierungen von pos bis pos+anzahl, nach 0 verschoben"
+        return self._markierungen.ausschnitt(pos, anzahl)
+
+    def setzeMarkierungen(self, pos: int, anzahl: int, markierungen: Intervallkarte):
+        "Ersetzt die Markierungen von pos bis pos+anzahl durch die eines Ausschnitts."
+
+        anzahl = max(min(anzahl, self.laenge-pos), 0)
+        markierungen = markierungen.ausschnitt(0, anzahl)
+        for markierung in markierungen.werte():
+            self._verbinde(markierung)
+        self._markierungen.ausschneiden(pos, anzahl)
+        self._markierungen.einfuegen(pos, anzahl, markierungen)
+        self.basenChanged.emit(pos, anzahl)
+
+    def markiereBasen(self, pos: int, anzahl: int, markierung: 'Markierung'):
+        anzahl = max(min(anzahl, self.laenge-pos), 0)
+        self._verbinde(markierung)
+        self._markierungen.setzen(range(pos, pos+anzahl), markierung)
+        self.basenChanged.emit(pos, anzahl)
+
+    @property
+    def laengeOhneLeer(self) -> int:
+        return self.laenge - self._leerVor(self.laenge)
+
+    def nummerOhneLeer(self, index: int) -> int:
+        return index - self._leerVor(index) + 1
+
+    def indexAusNummerOhneLeer(self, nummer: int) -> int:
+        """
+        Umkehrung von nummerOhneLeer: Index der nummer-ten Base, die keine Leerstelle ist.
+
+        Ist die Nummer größer als die Anzahl der Basen, wird die Länge der Sequenz zurückgegeben.
+        """
+
+        if nummer > self.laengeOhneLeer:
+            return self.laenge
+        ohneleer = [block*leerblock-leer for block, leer in enumerate(self._leerpraefix)]
+        block = bisect_right(ohneleer, nummer-1) - 1
+        rest = nummer - ohneleer[block]
+        for index in range(block*leerblock, self.laenge):
+            if self._chars[index] != leerbase[0]:
+                rest -= 1
+                if not rest:
+                    return index
+        return self.laenge
+
+    def _leerVor(self, index: int) -> int:
+        """
+        Anzahl der Leerstellen vor index.
+
+        _leerpraefix[k] enthält die Anzahl der Leerstellen vor dem Block k der Länge
+        leerblock. Die Präfixe werden bei Bedarf ergänzt und beim Einfügen oder
+        Entfernen ab dem Block der Änderung verworfen.
+        """
+
+        block = index // leerblock
+        letzter = self.laenge // leerblock
+        while len(self._leerpraefix) <= min(block, letzter):
+            start = (len(self._leerpraefix)-1)*leerblock
+            self._leerpraefix.append(self._leerpraefix[-1] + self._chars.count(leerbase, start, start+leerblock))
+        block = min(block, len(self._leerpraefix)-1)
+        return self._leerpraefix[block] + self._chars.count(leerbase, block*leerblock, index)
+
+    def _verwerfeLeerpraefix(self, pos: int):
+        del self._leerpraefix[pos // leerblock + 1:]
 
     @logme(logger.debug)
-    def createBasenFromString(self, text: str) -> list['Base']:
+    def createBasenFromString(self, text: str) -> Basen:
         pattern = re.compile(r'\s+')
         text = re.sub(pattern, '', text).upper()
-        return [Base(self, char) for char in text]
-
-    def createLeereBasen(self, anzahl: int):
-        return [Base(self) for _ in range(anzahl)]
-    
-    def inAminosaeure(self):
-        neueBasen = []
-        for base in self.basen:
-            neueBasen.append(base)
-            neueBasen.append(Base(self))
-            neueBasen.append(Base(self))
-        return neueBasen
-
-    def insertBasen(self, pos: int, basen: list['Base']):
-        self._basen[pos:pos] = basen
-        self.basenInserted.emit(pos, basen)
+        return Basen(text.encode('ascii', 'replace'))
+
+    def createLeereBasen(self, anzahl: int) -> Basen:
+        return Basen(leerbase*anzahl)
+
+    def inAminosaeure(self) -> Basen:
+        anzahl = self.laenge
+        chars = bytearray(leerbase*(3*anzahl))
+        chars[0::3] = self._chars
+        markierungen = [None]*(3*anzahl)
+        markierungen[0::3] = self.markierungen()
+        return Basen(chars, Intervallkarte.ausListe(markierungen))
+
+    def orfs(self, mindestlaenge: int = 100, tabelle: int = 1, rahmen: list[int] = leserahmen) -> list[ORF]:
+        return orfs(bytes(self._chars), mindestlaenge, tabelle, rahmen)
+
+    def uebersetzung(self, rahmen: int, tabelle: int = 1) -> Basen:
+        "Die Aminosäuren im Leserahmen, ausgerichtet an den Spalten dieser Sequenz"
+        return Basen(uebersetze(self._chars, rahmen, tabelle))
+
+    def insertBasen(self, pos: int, basen: Basen) -> Basen:
+        self._chars[pos:pos] = basen.chars
+        self._verwerfeLeerpraefix(pos)
+        for markierung in basen.markierungen.werte():
+            self._verbinde(markierung)
+        self._markierungen.einfuegen(pos, len(basen), basen.markierungen)
+        self.basenInserted.emit(pos, len(basen))
         return basen
 
-    def removeBasen(self, pos: int, anzahl: int):
-        muell = self._basen[pos:pos+anzahl]
-        self._basen[pos:pos+anzahl] = []
-        self.basenRemoved.emit(pos, muell)
+    def removeBasen(self, pos: int, anzahl: int) -> Basen:
+        muell = Basen(self._chars[pos:pos+anzahl], self._markierungen.ausschneiden(pos, anzahl))
+        del self._chars[pos:pos+anzahl]
+        self._verwerfeLeerpraefix(pos)
+        self.basenRemoved.emit(pos, len(muell))
         return muell
 
+    @classmethod
+    def ausBytearray(cls, name: str, chars: bytearray, markierungen: Intervallkarte) -> 'Sequenz':
+        "Übernimmt chars und markierungen ohne Kopie, beide dürfen danach nicht mehr anderweitig verwendet werden."
+
+        sequenz = cls(name)
+        sequenz._uebernehme(chars, markierungen)
+        return sequenz
+
+    def _setzeBasen(self, basen: Basen):
+        self._uebernehme(bytearray(basen.chars), basen.markierungen.copy())
+
+    def _uebernehme(self, chars: bytearray, markierungen: Intervallkarte):
+        for markierung in list(self._verbunden):
+            self._trenneMarkierung(markierung)
+        self._chars = chars
+        self._verwerfeLeerpraefix(0)
+        self._markierungen = markierungen
+        for markierung in self._markierungen.werte():
+            self._verbinde(markierung)
+
+    def _verbinde(self, markierung: 'Markierung'):
+        "Die Sequenz muss neu gezeichnet werden, wenn sich eine ihrer Markierungen ändert."
+
+        if markierung is None or markierung in self._verbunden:
+            return
+        self._verbunden.add(markierung)
+        markierung.deleted.connect(self._markierungGeloescht)
+        markierung.farbeChanged.connect(self._markierungGeaendert)
+
+    def _trenneMarkierung(self, markierung: 'Markierung'):
+        self._verbunden.discard(markierung)
+        markierung.deleted.disconnect(self._markierungGeloescht)
+        markierung.farbeChanged.disconnect(self._markierungGeaendert)
+
+    def _markierungGeloescht(self):
+        markierung = self.sender()
+        self._trenneMarkierung(markierung)
+        if self._markierungen.entferneWert(markierung):
+            self.basenChanged.emit(0, self.laenge)
+
+    def _markierungGeaendert(self):
+        if self.sender() in self._markierungen.werte():
+            self.basenChanged.emit(0, self.laenge)
+
     def __str__(self) -> str:
         return f'Sequenz[{self.name}]'
 
-    def to_json(self) -> str:
-        return {'Sequenz': { '_name': self._name, '_basen': self._basen}}
+    def to_json(self, kompakt: bool = True) -> str:
+        if kompakt:
+            markierungen = [[bereich.start, len(bereich), markierung.beschreibung] for bereich, markierung in self.markierteBereiche()]
+            return {'Sequenz': { '_name': self._name, '_basen': self.basenstr, '_markierungen': markierungen}}
+        basen = []
+        for char, markierung in zip(self.basenstr, self.markierungen()):
+            basedict = {'_char': char}
+            if markierung:
+                basedict['_mtxt'] = markierung.beschreibung
+            basen.append(basedict)
+        return {'Sequenz': { '_name': self._name, '_basen': basen}}
 
 
-class Base(QObject):
+class Base:
     """
-    Klasse für die Base einer Sequenz
+    Sicht auf eine Base einer Sequenz
 
     sequenz: die Sequenz zu die die Base gehört
-    char: der Buchstabe der Base
-    background: die Hintergrundfarbe der Base
+    index: die Position der Base in der Sequenz
+
+    Eine Base speichert selbst keine Daten, Buchstabe und Markierung werden aus
+    der Sequenz gelesen. Nach dem Einfügen oder Entfernen von Basen vor der
+    Position zeigt die Sicht auf eine andere Base.
     """
 
+    __slots__ = ('_sequenz', '_index')
+
     @staticmethod
     def colorMap(char):
         colormap = {
@@ -111,19 +494,13 @@ class Base(QObject):
         }
         return colormap[char] if char in colormap else 'black'
 
-    changed = Signal()
-
-    def __init__(self, _sequenz: Sequenz, _char: str = '~', _mtxt: str = None, _versteckt: bool = False):
-        super().__init__()
+    def __init__(self, _sequenz: Sequenz, _index: int):
         self._sequenz = _sequenz
-        self._char = _char
-        self._versteckt = _versteckt
-        self._markierung = None
-        self._mtxt = _mtxt
+        self._index = _index
 
     @property
     def char(self) -> str:
-        return self._char
+        return self.sequenz.char(self._index)
 
     @property
     def sequenz(self) -> Sequenz:
@@ -131,35 +508,17 @@ class Base(QObject):
 
     @property
     def markierung(self) -> 'Markierung':
-        return self._markierung
+        return self.sequenz.markierung(self._index)
 
     @markierung.setter
     def markierung(self, markierung: 'Markierung'):
-        self._markierung = markierung
-        if self._markierung:
-            self._markierung.deleted.connect(self.removeMarkierung)
-            self._markierung.farbeChanged.connect(self.changed.emit)
-        self.changed.emit()
-
-    @property
-    def versteckt(self):
-        return self._versteckt
-
-    @versteckt.setter
-    def versteckt(self, value):
-        self._versteckt = value
-        self.changed.emit(value)
+        self.sequenz.markiereBasen(self._index, 1, markierung)
 
     def getIndexInSequenz(self) -> int:
-        return self.sequenz.basen.index(self)
+        return self._index
 
     def getNummerInSequenzOhneLeer(self) -> int:
-        nummer = 1
-        for base in self.sequenz.basen:
-            if base == self:
-                return nummer
-            if base.char != '~':
-                nummer += 1
+        return self.sequenz.nummerOhneLeer(self._index)
 
     def removeMarkierung(self):
         self.markierung = None
@@ -173,12 +532,18 @@ class Base(QObject):
             farbe = self.markierung.farbe
         return farbe
 
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Base) and self._sequenz is other._sequenz and self._index == other._index
+
+    def __hash__(self) -> int:
+        return hash((id(self._sequenz), self._index))
+
     def __repr__(self) -> str:
         return f'Base[{self.char}]'
 
     def to_json(self) -> str:
         basedict = {'_char': self.char}
-        if self._markierung:
+        if self.markierung:
             basedict['_mtxt'] = self.markierung.beschreibung
         return basedict
 
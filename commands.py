@@ -2,6 +2,8 @@
 from PySide6.QtGui import QUndoCommand
 from bioinformatik import Sequenz, Markierung, Base
 from sequenzenmodel import SequenzenModel
+from intervalle import Intervallmenge, Intervallkarte
+from alignment import Alignment, mitLuecken
 
 
 class AddSequenzenCommand(QUndoCommand):
@@ -97,24 +99,18 @@ class MarkiereBasenCommand(QUndoCommand):
 
     def __init__(self, base: Base, anzahl: int, markierung: Markierung):
         super(MarkiereBasenCommand, self).__init__('Basen markiert')
-        index = base.getIndexInSequenz()
-        sequenz = base.sequenz
-        neu_markiert = sequenz.basen[index:index+anzahl]
-        self.basen_mark_alt: dict[Base,Markierung] = {}
-        self.basen_mark_neu: dict[Base,Markierung] = {}
-        for b in sequenz.basen:
-            self.basen_mark_alt[b] = b.markierung
-            self.basen_mark_neu[b] = b.markierung
-            if b in neu_markiert:
-                self.basen_mark_neu[b] = markierung
+        self.sequenz = base.sequenz
+        self.pos = base.getIndexInSequenz()
+        self.anzahl = max(min(anzahl, self.sequenz.laenge-self.pos), 0)
+        self.markierung = markierung
+        # Nur die Markierungen des betroffenen Bereichs, nicht die der ganzen Sequenz
+        self.mark_alt: Intervallkarte = self.sequenz.markierungsausschnitt(self.pos, self.anzahl)
 
     def redo(self):
-        for b in self.basen_mark_neu:
-            b.markierung = self.basen_mark_neu[b]
+        self.sequenz.markiereBasen(self.pos, self.anzahl, self.markierung)
 
     def undo(self):
-        for b in self.basen_mark_alt:
-            b.markierung = self.basen_mark_alt[b]
+        self.sequenz.setzeMarkierungen(self.pos, self.anzahl, self.mark_alt)
 
 
 class EntferneBaseCommand(QUndoCommand):
@@ -124,7 +120,7 @@ class EntferneBaseCommand(QUndoCommand):
         self.pos = base.getIndexInSequenz()
         self.sequenz = base.sequenz
         self.anzahl = anzahl
-        self.basen = []
+        self.basen = None
 
     def redo(self):
         self.basen = self.sequenz.removeBasen(self.pos, self.anzahl)
@@ -154,7 +150,7 @@ class RemoveMarkierungCommand(QUndoCommand):
         super(RemoveMarkierungCommand, self).__init__('Markierung entfernt '+markierung.beschreibung)
         self.model = model
         self.markierung = markierung
-        self.markierteBasen = self.model.markierteBasen(markierung)
+        self.markierteBereiche = self.model.markierteBereiche(markierung)
 
     def redo(self):
         self.markierung.deleted.emit()
@@ -162,8 +158,8 @@ class RemoveMarkierungCommand(QUndoCommand):
 
     def undo(self):
         self.model.addMarkierungen([self.markierung])
-        for base in self.markierteBasen:
-            base.markierung = self.markierung
+        for sequenz, bereich in self.markierteBereiche:
+            sequenz.markiereBasen(bereich.start, len(bereich), self.markierung)
 
 
 class AddMarkierungCommand(QUndoCommand):
@@ -212,35 +208,53 @@ class changeBeschreibungMarkierungCommand(QUndoCommand):
 
 class VerstecktCommand(QUndoCommand):
 
-    def __init__(self, model: SequenzenModel, versteckt: list[bool]):
+    def __init__(self, model: SequenzenModel, bereich: range):
         super(VerstecktCommand, self).__init__('Verstecken')
         self.model = model
-        self.versteckt = versteckt
+        # Nur was noch nicht versteckt war, wird beim Rückgängigmachen wieder enttarnt.
+        self.bereiche = model.versteckt.luecken(bereich)
 
     def redo(self):
-        self.model.addVersteckt(self.versteckt)
+        self.model.addVersteckt(self.bereiche)
 
     def undo(self):
-        self.model.removeVersteckt(self.versteckt)
+        self.model.removeVersteckt(self.bereiche)
 
 
 class EnttarnenCommand(QUndoCommand):
 
-    def __init__(self, model: SequenzenModel, enttarnen: list[bool]):
+    def __init__(self, model: SequenzenModel, bereich: range):
         super(EnttarnenCommand, self).__init__('Enttarnen')
         self.model = model
-        self.enttarnen = enttarnen
+        self.bereiche = model.versteckt.schnitt(bereich)
+
+    def redo(self):
+        self.model.removeVersteckt(self.bereiche)
+
+    def undo(self):
+        self.model.addVersteckt(self.bereiche)
+
+
+class AlignmentCommand(QUndoCommand):
+
+    def __init__(self, sequenz_a: Sequenz, sequenz_b: Sequenz, alignment: Alignment):
+        super(AlignmentCommand, self).__init__('Aligniert '+sequenz_a.name+' und '+sequenz_b.name)
+        self.sequenzen = [sequenz_a, sequenz_b]
+        self.basenalt = [sequenz_a.basen, sequenz_b.basen]
+        self.basenneu = [mitLuecken(self.basenalt[0], alignment.luecken_a), mitLuecken(self.basenalt[1], alignment.luecken_b)]
 
     def redo(self):
-        self.model.removeVersteckt(self.enttarnen)
+        for sequenz, basen in zip(self.sequenzen, self.basenneu):
+            sequenz.basen = basen
 
     def undo(self):
-        self.model.addVersteckt(self.enttarnen)
+        for sequenz, basen in zip(self.sequenzen, self.basenalt):
+            sequenz.basen = basen
 
 
 class SetAllCommand(QUndoCommand):
 
-    def __init__(self, model: SequenzenModel, *all: tuple[list[Sequenz], list[Markierung], list[bool]]):
+    def __init__(self, model: SequenzenModel, *all: tuple[list[Sequenz], list[Markierung], Intervallmenge]):
         super(SetAllCommand, self).__init__('Alles ersetzen')
         self.model = model
         self.allneu = all
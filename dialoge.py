@@ -2,10 +2,11 @@
 from PySide6.QtCore import Signal
 from PySide6.QtWidgets import (QDialog, 
     QGroupBox, QHBoxLayout, QVBoxLayout, QLabel, QPushButton,
-    QSpinBox, QComboBox, QLineEdit, QPlainTextEdit
+    QSpinBox, QComboBox, QLineEdit, QPlainTextEdit, QListWidget, QAbstractItemView
 )
 
-from bioinformatik import Markierung, Base, Sequenz
+from bioinformatik import Markierung, Base, Sequenz, codontabellen, leserahmen
+from fasta import FaiEintrag
 
 class BaseDialog(QDialog):
 
@@ -124,6 +125,9 @@ class SequenzDialog(QDialog):
     sequenzUmbenennen = Signal(Sequenz, str)
     basenErsetzen = Signal(Sequenz,str)
     sequenzInAmino = Signal(Sequenz)
+    sequenzUebersetzen = Signal(Sequenz, list, int)
+    sequenzAlignieren = Signal(Sequenz, Sequenz, bool, int)
+    orfsMarkieren = Signal(Sequenz, list, int, int)
 
     def __init__(self, parent, sequenz: Sequenz):
         super().__init__(parent)
@@ -132,10 +136,12 @@ class SequenzDialog(QDialog):
         self.setLayout(vbox)
         gb_umbenennen = QGroupBox('Sequenz umbenennen',self)
         gb_animo = QGroupBox('Sequenz in Aminosäure umwandeln',self)
+        gb_alignieren = QGroupBox('Mit anderer Sequenz alignieren',self)
         gb_basenstr = QGroupBox('Basen bearbeiten',self)
         gb_entferne = QGroupBox('Sequenz entfernen',self)
         vbox.addWidget(gb_umbenennen)
         vbox.addWidget(gb_animo)
+        vbox.addWidget(gb_alignieren)
         vbox.addWidget(gb_basenstr)
         vbox.addWidget(gb_entferne)
 
@@ -147,12 +153,62 @@ class SequenzDialog(QDialog):
         hbox_umbenennen.addWidget(btn_umbenennen)
         btn_umbenennen.clicked.connect(self.umbenennenclick)
 
+        vbox_amino = QVBoxLayout()
+        gb_animo.setLayout(vbox_amino)
         hbox_amino = QHBoxLayout()
-        gb_animo.setLayout(hbox_amino)
         btn_amino = QPushButton('In Aminosäure')
         hbox_amino.addStretch()
         hbox_amino.addWidget(btn_amino)
         btn_amino.clicked.connect(self.aminosaeure)
+        hbox_uebersetzen = QHBoxLayout()
+        self._cb_rahmen = QComboBox()
+        for rahmen in leserahmen:
+            self._cb_rahmen.addItem(f'Rahmen {rahmen:+d}', [rahmen])
+        self._cb_rahmen.addItem('Alle sechs Rahmen', list(leserahmen))
+        self._cb_codontabelle = QComboBox()
+        for nummer, tabelle in codontabellen.items():
+            self._cb_codontabelle.addItem(f'{nummer}: {tabelle.name}', nummer)
+        btn_uebersetzen = QPushButton('Übersetzen')
+        hbox_uebersetzen.addWidget(self._cb_rahmen)
+        hbox_uebersetzen.addWidget(self._cb_codontabelle, 1)
+        hbox_uebersetzen.addWidget(btn_uebersetzen)
+        btn_uebersetzen.clicked.connect(self.uebersetzen)
+        hbox_orfs = QHBoxLayout()
+        self._sb_orflaenge = QSpinBox()
+        self._sb_orflaenge.setRange(1, 100000)
+        self._sb_orflaenge.setValue(100)
+        self._sb_orflaenge.setSuffix(' Codons')
+        self._sb_orflaenge.setToolTip('Mindestlänge von ATG bis vor das Stoppcodon')
+        btn_orfs = QPushButton('ORFs markieren')
+        hbox_orfs.addWidget(QLabel('Offene Leserahmen ab'))
+        hbox_orfs.addWidget(self._sb_orflaenge)
+        hbox_orfs.addStretch()
+        hbox_orfs.addWidget(btn_orfs)
+        btn_orfs.clicked.connect(self.orfs_markieren)
+        vbox_amino.addLayout(hbox_amino)
+        vbox_amino.addLayout(hbox_uebersetzen)
+        vbox_amino.addLayout(hbox_orfs)
+
+        hbox_alignieren = QHBoxLayout()
+        gb_alignieren.setLayout(hbox_alignieren)
+        self._cb_partner = QComboBox()
+        for andere in parent.sequenzmodel.sequenzen:
+            if andere is not sequenz:
+                self._cb_partner.addItem(andere.name, andere)
+        self._cb_art = QComboBox()
+        self._cb_art.addItems(['Global', 'Lokal'])
+        self._sb_band = QSpinBox()
+        self._sb_band.setRange(0, 99999)
+        self._sb_band.setSpecialValueText('ohne')
+        self._sb_band.setToolTip('Nur so viele Spalten neben der Diagonale berechnen, schneller für lange, ähnliche Sequenzen')
+        btn_alignieren = QPushButton('Alignieren')
+        btn_alignieren.setEnabled(self._cb_partner.count() > 0)
+        hbox_alignieren.addWidget(self._cb_partner, 1)
+        hbox_alignieren.addWidget(self._cb_art)
+        hbox_alignieren.addWidget(QLabel('Band'))
+        hbox_alignieren.addWidget(self._sb_band)
+        hbox_alignieren.addWidget(btn_alignieren)
+        btn_alignieren.clicked.connect(self.alignieren)
 
         vbox_basentext = QVBoxLayout()
         hbox_labelbutton = QHBoxLayout()
@@ -184,6 +240,19 @@ class SequenzDialog(QDialog):
         self.sequenzInAmino.emit(self.sequenz)
         self.close()
 
+    def uebersetzen(self):
+        self.sequenzUebersetzen.emit(self.sequenz, self._cb_rahmen.currentData(), self._cb_codontabelle.currentData())
+        self.close()
+
+    def orfs_markieren(self):
+        self.orfsMarkieren.emit(self.sequenz, self._cb_rahmen.currentData(), self._cb_codontabelle.currentData(), self._sb_orflaenge.value())
+        self.close()
+
+    def alignieren(self):
+        lokal = self._cb_art.currentIndex() == 1
+        self.sequenzAlignieren.emit(self.sequenz, self._cb_partner.currentData(), lokal, self._sb_band.value())
+        self.close()
+
     def basen_ersetzen(self):
         self.basenErsetzen.emit(self.sequenz, self._te_sequenztext.toPlainText())
         self.close()
@@ -268,10 +337,63 @@ class LinealDialog(QDialog):
         return self._column
     
     def verstecken(self):
-        self.basenVerstecken.emit(list(range(self.column, self.column+self._sb_verstecken.value())))
+        self.basenVerstecken.emit(range(self.column, self.column+self._sb_verstecken.value()))
         self.close()
 
     def enttarnen(self):
-        self.basenEnttarnen.emit(list(range(self.column, self.column+self._sb_enttarnen.value())))
+        self.basenEnttarnen.emit(range(self.column, self.column+self._sb_enttarnen.value()))
         self.close()
 
+
+class FastaAuswahlDialog(QDialog):
+    """
+    Auswahl von Einträgen und Abschnitten einer indizierten FASTA-Datei
+
+    Die Basennummern beginnen bei 1 und schließen das Ende ein, wie bei
+    samtools. Bis 0 steht für das Ende des Eintrags.
+    """
+
+    ausschnitteGewaehlt = Signal(list)
+
+    def __init__(self, parent, eintraege: list[FaiEintrag]):
+        super().__init__(parent)
+        self._eintraege = eintraege
+        vbox = QVBoxLayout(self)
+        self.setLayout(vbox)
+        self._lw_eintraege = QListWidget()
+        self._lw_eintraege.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self._lw_eintraege.addItems([f'{eintrag.name} ({eintrag.laenge})' for eintrag in eintraege])
+        vbox.addWidget(QLabel('Einträge:'))
+        vbox.addWidget(self._lw_eintraege)
+
+        gb_bereich = QGroupBox('Basen', self)
+        hbox_bereich = QHBoxLayout()
+        gb_bereich.setLayout(hbox_bereich)
+        maxlaenge = max([eintrag.laenge for eintrag in eintraege], default=1)
+        self._sb_von = QSpinBox()
+        self._sb_von.setRange(1, max(maxlaenge, 1))
+        self._sb_bis = QSpinBox()
+        self._sb_bis.setRange(0, maxlaenge)
+        self._sb_bis.setSpecialValueText('Ende')
+        hbox_bereich.addWidget(QLabel('Von'))
+        hbox_bereich.addWidget(self._sb_von)
+        hbox_bereich.addWidget(QLabel('Bis'))
+        hbox_bereich.addWidget(self._sb_bis)
+        vbox.addWidget(gb_bereich)
+
+        btn_laden = QPushButton('Laden')
+        btn_laden.clicked.connect(self.laden)
+        vbox.addWidget(btn_laden)
+
+    @property
+    def eintraege(self):
+        return self._eintraege
+
+    def laden(self):
+        ausschnitte = []
+        for zeile in sorted(index.row() for index in self._lw_eintraege.selectedIndexes()):
+            eintrag = self.eintraege[zeile]
+            bis = self._sb_bis.value() or eintrag.laenge
+            ausschnitte.append((eintrag.name, self._sb_von.value()-1, min(bis, eintrag.laenge)))
+        self.ausschnitteGewaehlt.emit(ausschnitte)
+        self.close()
@@ -0,0 +1,130 @@
+import math
+import struct
+import zlib
+from typing import BinaryIO
+
+from PySide6.QtCore import QBuffer, QMarginsF, QRectF, QSizeF
+from PySide6.QtGui import QColor, QImage, QPageLayout, QPageSize, QPainter, QPdfWriter
+from PySide6.QtWidgets import QGraphicsScene
+
+from sceneitems import SvgGenerator
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+FORMATE = ('png', 'svg', 'pdf')
+
+
+@logme(logger.debug)
+def renderePNG(scene: QGraphicsScene, dateiname: str, kachelbreite: int = 4096, speicher: int = 64 << 20) -> bool:
+    """
+    Zeichnet die ganze Scene in Streifen und schreibt sie direkt als PNG.
+
+    Ein Streifen ist höchstens so hoch, dass seine Zeilen speicher Bytes
+    brauchen, und wird in Kacheln von kachelbreite Pixeln gezeichnet. Jede
+    Zeile geht sofort an zlib, der Speicherbedarf hängt deshalb nicht von der
+    Größe der Scene ab.
+    """
+
+    # Auf ganze Pixel ausgerichtet, damit jede Kachel die Basen gleich rastert
+    rect_f = scene.itemsBoundingRect()
+    links, oben = math.floor(rect_f.left()), math.floor(rect_f.top())
+    breite = max(math.ceil(rect_f.right()) - links, 1)
+    hoehe = max(math.ceil(rect_f.bottom()) - oben, 1)
+    streifenhoehe = max(min(hoehe, speicher // (3*breite)), 1)
+    kachel = QImage(min(kachelbreite, breite), streifenhoehe, QImage.Format_RGB888)
+    packer = zlib.compressobj()
+    try:
+        with open(dateiname, 'wb') as datei:
+            datei.write(b'\x89PNG\r\n\x1a\n')
+            # 8 Bit RGB ohne Interlacing
+            _schreibeChunk(datei, b'IHDR', struct.pack('>IIBBBBB', breite, hoehe, 8, 2, 0, 0, 0))
+            for y in range(0, hoehe, streifenhoehe):
+                h = min(streifenhoehe, hoehe-y)
+                # Jede Zeile beginnt mit dem Filtertyp 0
+                zeilen = [bytearray(1) for _ in range(h)]
+                for x in range(0, breite, kachelbreite):
+                    w = min(kachelbreite, breite-x)
+                    kachel.fill(QColor('white'))
+                    p = QPainter(kachel)
+                    scene.render(p, target=QRectF(0, 0, w, h), source=QRectF(links+x, oben+y, w, h))
+                    p.end()
+                    bits = kachel.constBits()
+                    zeilenbytes = kachel.bytesPerLine()
+                    for i, zeile in enumerate(zeilen):
+                        zeile += bits[i*zeilenbytes:i*zeilenbytes+3*w]
+                daten = b''.join(packer.compress(zeile) for zeile in zeilen)
+                if daten:
+                    _schreibeChunk(datei, b'IDAT', daten)
+            _schreibeChunk(datei, b'IDAT', packer.flush())
+            _schreibeChunk(datei, b'IEND', b'')
+    except OSError as e:
+        logger.error(f'PNG {dateiname} nicht geschrieben: {e}')
+        return False
+    return True
+
+
+def _schreibeChunk(datei: BinaryIO, art: bytes, daten: bytes):
+    datei.write(struct.pack('>I', len(daten)) + art)
+    datei.write(daten)
+    datei.write(struct.pack('>I', zlib.crc32(daten, zlib.crc32(art))))
+
+
+@logme(logger.debug)
+def rendereSVG(scene: QGraphicsScene, dateiname: str) -> bool:
+    """
+    Zeichnet die ganze Scene als SVG.
+
+    Die Basen einer Zeile werden je Farbe als ein Text ausgegeben, siehe
+    zeichneLaeufe.
+    """
+
+    rect_f = scene.itemsBoundingRect()
+    puffer = QBuffer()
+    generator = SvgGenerator()
+    generator.setOutputDevice(puffer)
+    generator.setSize(rect_f.size().toSize())
+    generator.setViewBox(QRectF(0, 0, rect_f.width(), rect_f.height()))
+    generator.setTitle('Gensequenzeditor')
+    p = QPainter()
+    if not p.begin(generator):
+        return False
+    scene.render(p, target=QRectF(0, 0, rect_f.width(), rect_f.height()), source=rect_f)
+    if not p.end():
+        return False
+    try:
+        with open(dateiname, 'w', encoding='utf-8') as datei:
+            datei.write(generator.ersetzePlatzhalter(bytes(puffer.data()).decode('utf-8')))
+    except OSError as e:
+        logger.error(f'SVG {dateiname} nicht geschrieben: {e}')
+        return False
+    return True
+
+
+@logme(logger.debug)
+def renderePDF(scene: QGraphicsScene, dateiname: str) -> bool:
+    "Zeichnet die ganze Scene auf eine PDF-Seite in der Größe der Scene, ein Pixel ist ein Punkt."
+
+    rect_f = scene.itemsBoundingRect()
+    writer = QPdfWriter(dateiname)
+    writer.setResolution(72)
+    writer.setPageLayout(QPageLayout(QPageSize(QSizeF(rect_f.width(), rect_f.height()), QPageSize.Point), QPageLayout.Portrait, QMarginsF()))
+    writer.setCreator('Gensequenzeditor')
+    p = QPainter()
+    if not p.begin(writer):
+        return False
+    scene.render(p, target=QRectF(0, 0, rect_f.width(), rect_f.height()), source=rect_f)
+    return p.end()
+
+
+def rendere(scene: QGraphicsScene, dateiname: str, format: str) -> bool:
+    "Exportiert die Scene im Format png, svg oder pdf."
+
+    if format == 'png':
+        return renderePNG(scene, dateiname)
+    if format == 'svg':
+        return rendereSVG(scene, dateiname)
+    if format == 'pdf':
+        return renderePDF(scene, dateiname)
+    raise ValueError(f'Unbekanntes Exportformat {format}')
@@ -0,0 +1,256 @@
+import mmap
+import os
+from typing import BinaryIO, Callable, Iterator, NamedTuple
+
+from PySide6.QtCore import QThread, Signal
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+blockgroesse = 1 << 20
+
+# Whitespace fällt weg, Kleinbuchstaben werden groß und Zeichen außerhalb von
+# ASCII werden wie bei createBasenFromString zu '?'.
+_basentabelle = bytes(range(128)).upper() + b'?'*128
+_leerzeichen = b' \t\n\r\v\f'
+
+
+def leseFasta(datei: BinaryIO, fortschritt: Callable[[int], None] = None) -> Iterator[tuple[str, bytes]]:
+    """
+    Liest eine FASTA-Datei blockweise und liefert (Name, Basen) je Eintrag.
+
+    Die Zeilen eines Eintrags werden gesammelt und erst am Ende einmal
+    zusammengefügt. Auch die unvollständige letzte Zeile eines Blocks wird
+    stückweise gesammelt und erst am nächsten Zeilenende zusammengefügt, so
+    dass lange Zeilen nicht mit jedem Block erneut kopiert werden. Zeilen,
+    die mit # beginnen, werden übersprungen. Basen vor dem ersten Kopf
+    gehören zu einem Eintrag namens 'Unbekannt'. fortschritt wird nach jedem
+    Block mit der Anzahl der gelesenen Bytes aufgerufen.
+    """
+
+    name = 'Unbekannt'
+    zeilen: list[bytes] = []
+    gesehen = False
+    rest: list[bytes] = []
+    while True:
+        block = datei.read(blockgroesse)
+        ende = not block
+        if not ende and fortschritt:
+            fortschritt(datei.tell())
+        if not ende:
+            teile = block.split(b'\n')
+            rest.append(teile[0])
+            if len(teile) == 1:
+                continue
+            teile[0] = b''.join(rest)
+            rest = [teile.pop()]
+        else:
+            teile = [b''.join(rest)]
+        for zeile in teile:
+            if zeile[:1] == b'#':
+                continue
+            if zeile[:1] == b'>':
+                basen = _basen(zeilen)
+                if basen:
+                    yield name, basen
+                zeilen = []
+                name = zeile[1:].strip().decode('utf-8', 'replace')
+                gesehen = True
+                continue
+            zeilen.append(zeile)
+        if ende:
+            break
+    basen = _basen(zeilen)
+    if basen or gesehen:
+        yield name, basen
+
+
+def _basen(zeilen: list[bytes]) -> bytes:
+    return b''.join(zeilen).translate(_basentabelle, _leerzeichen)
+
+
+class FastaImport(QThread):
+    """
+    Liest eine FASTA-Datei im Hintergrund
+
+    Die Einträge werden in Stapeln als Liste von (Name, Basen) gemeldet. Die
+    Sequenzen selbst müssen im GUI-Thread erzeugt werden. Mit
+    requestInterruption wird das Lesen nach dem aktuellen Block abgebrochen.
+    vollstaendig ist erst wahr, wenn die ganze Datei ohne Fehler gelesen wurde.
+    """
+
+    fortschritt = Signal(int)
+    eintraegeGelesen = Signal(list)
+    fehler = Signal(str)
+
+    def __init__(self, parent, dateiname: str, stapelgroesse: int = 20):
+        super().__init__(parent)
+        self._dateiname = dateiname
+        self._stapelgroesse = stapelgroesse
+        self._vollstaendig = False
+
+    @property
+    def dateiname(self) -> str:
+        return self._dateiname
+
+    @property
+    def vollstaendig(self) -> bool:
+        return self._vollstaendig
+
+    @property
+    def dateigroesse(self) -> int:
+        return os.path.getsize(self.dateiname)
+
+    @logme(logger.debug)
+    def run(self):
+        try:
+            with open(self.dateiname, 'rb') as datei:
+                stapel = []
+                for eintrag in leseFasta(datei, self._meldeFortschritt):
+                    stapel.append(eintrag)
+                    if len(stapel) >= self._stapelgroesse:
+                        self.eintraegeGelesen.emit(stapel)
+                        stapel = []
+                if stapel:
+                    self.eintraegeGelesen.emit(stapel)
+            self._vollstaendig = True
+        except InterruptedError:
+            logger.info(f'Import von {self.dateiname} abgebrochen')
+        except Exception as e:
+            self.fehler.emit(str(e))
+
+    def _meldeFortschritt(self, gelesen: int):
+        if self.isInterruptionRequested():
+            raise InterruptedError()
+        self.fortschritt.emit(gelesen)
+
+
+class FaiEintrag(NamedTuple):
+    "Eine Zeile einer .fai-Datei wie bei samtools faidx"
+
+    name: str
+    laenge: int
+    offset: int
+    zeilenbasen: int
+    zeilenbytes: int
+
+
+def erzeugeFai(dateiname: str) -> list[FaiEintrag]:
+    """
+    Erzeugt den Index einer FASTA-Datei.
+
+    Wie bei samtools ist der Name das erste Wort der Kopfzeile. Innerhalb eines
+    Eintrags müssen alle Zeilen außer der letzten gleich lang sein.
+    """
+
+    eintraege = []
+    name = None
+    pos = 0
+    with open(dateiname, 'rb') as datei:
+        for zeile in datei:
+            if zeile[:1] == b'>':
+                if name is not None:
+                    eintraege.append(FaiEintrag(name, laenge, offset, zeilenbasen, zeilenbytes))
+                woerter = zeile[1:].split(None, 1)
+                name = woerter[0].decode('utf-8', 'replace') if woerter else ''
+                laenge = zeilenbasen = zeilenbytes = 0
+                offset = pos + len(zeile)
+                kurz = False
+            elif name is None:
+                if zeile.strip():
+                    raise ValueError(f'{dateiname}: Basen vor der ersten Kopfzeile')
+            else:
+                basen = len(zeile.rstrip(b'\r\n'))
+                if basen and kurz:
+                    raise ValueError(f'{dateiname}: Unterschiedlich lange Zeilen in {name}')
+                if not zeilenbasen:
+                    zeilenbasen, zeilenbytes = basen, len(zeile)
+                elif basen > zeilenbasen or (basen == zeilenbasen and len(zeile) != zeilenbytes and zeile[-1:] == b'\n'):
+                    raise ValueError(f'{dateiname}: Unterschiedlich lange Zeilen in {name}')
+                kurz = basen < zeilenbasen or not zeile.endswith(b'\n')
+                laenge += basen
+            pos += len(zeile)
+    if name is not None:
+        eintraege.append(FaiEintrag(name, laenge, offset, zeilenbasen, zeilenbytes))
+    return eintraege
+
+
+def leseFai(dateiname: str) -> list[FaiEintrag]:
+    eintraege = []
+    with open(dateiname, encoding='utf-8') as datei:
+        for zeile in datei:
+            felder = zeile.rstrip('\n').split('\t')
+            if len(felder) >= 5:
+                eintraege.append(FaiEintrag(felder[0], *(int(feld) for feld in felder[1:5])))
+    return eintraege
+
+
+def schreibeFai(dateiname: str, eintraege: list[FaiEintrag]):
+    with open(dateiname, 'w', encoding='utf-8', newline='\n') as datei:
+        for eintrag in eintraege:
+            datei.write('\t'.join(str(feld) for feld in eintrag) + '\n')
+
+
+class IndizierteFasta:
+    """
+    FASTA-Datei mit .fai-Index
+
+    Die Datei wird per mmap eingeblendet. Gelesen werden nur die Bytes der
+    angefragten Abschnitte, die Position einer Base ergibt sich aus dem Index.
+    Ein vorhandener Index wird benutzt, wenn er nicht älter als die Datei ist,
+    sonst wird er neu erzeugt und, wenn möglich, neben der Datei gespeichert.
+    """
+
+    def __init__(self, dateiname: str):
+        self._dateiname = dateiname
+        fai = dateiname + '.fai'
+        if os.path.exists(fai) and os.path.getmtime(fai) >= os.path.getmtime(dateiname):
+            self._eintraege = leseFai(fai)
+        else:
+            self._eintraege = erzeugeFai(dateiname)
+            try:
+                schreibeFai(fai, self._eintraege)
+            except OSError as e:
+                logger.warning(f'Index {fai} nicht gespeichert: {e}')
+        self._namen = {eintrag.name: eintrag for eintrag in self._eintraege}
+        self._datei = open(dateiname, 'rb')
+        self._mmap = mmap.mmap(self._datei.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(dateiname) else b''
+
+    @property
+    def dateiname(self) -> str:
+        return self._dateiname
+
+    @property
+    def eintraege(self) -> list[FaiEintrag]:
+        return self._eintraege
+
+    def eintrag(self, name: str) -> FaiEintrag:
+        return self._namen[name]
+
+    def basen(self, name: str, start: int = 0, ende: int = None) -> bytes:
+        "Die Basen von start bis ende (ohne ende, ab 0 gezählt) des Eintrags name"
+
+        eintrag = self.eintrag(name)
+        start = max(start, 0)
+        ende = eintrag.laenge if ende is None else min(ende, eintrag.laenge)
+        if start >= ende:
+            return b''
+        von = self._byteposition(eintrag, start)
+        bis = self._byteposition(eintrag, ende-1) + 1
+        return self._mmap[von:bis].translate(_basentabelle, _leerzeichen)
+
+    def _byteposition(self, eintrag: FaiEintrag, index: int) -> int:
+        zeile, spalte = divmod(index, eintrag.zeilenbasen)
+        return eintrag.offset + zeile*eintrag.zeilenbytes + spalte
+
+    def schliessen(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._datei.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.schliessen()
@@ -0,0 +1,345 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator
+
+
+class Intervallmenge:
+    """
+    Menge ganzer Zahlen, gespeichert als sortierte, disjunkte Intervalle
+
+    Die Intervalle sind halboffen wie range. Benachbarte und überlappende
+    Intervalle werden beim Hinzufügen zusammengefasst. Anfragen kosten
+    O(log k) bei k Intervallen, unabhängig davon, wie viele Zahlen die
+    Intervalle enthalten.
+    """
+
+    def __init__(self, bereiche: Iterable[range] = ()):
+        self._anfaenge: list[int] = []
+        self._enden: list[int] = []
+        self._kumuliert: list[int] = None
+        for bereich in bereiche:
+            self.hinzufuegen(bereich)
+
+    @classmethod
+    def ausIndizes(cls, indizes: Iterable[int]) -> 'Intervallmenge':
+        "Erzeugt die Menge aus einzelnen Zahlen, wie sie in älteren Dateien stehen."
+
+        menge = cls()
+        for idx in sorted(set(indizes)):
+            if menge._enden and menge._enden[-1] == idx:
+                menge._enden[-1] = idx + 1
+            else:
+                menge._anfaenge.append(idx)
+                menge._enden.append(idx + 1)
+        return menge
+
+    @classmethod
+    def ausJson(cls, daten: list) -> 'Intervallmenge':
+        "Liest Abschnitte [start, länge] oder, wie in älteren Dateien, einzelne Zahlen."
+
+        if daten and isinstance(daten[0], list):
+            return cls(range(start, start+laenge) for start, laenge in daten)
+        return cls.ausIndizes(daten)
+
+    @property
+    def bereiche(self) -> list[range]:
+        return [range(a, e) for a, e in zip(self._anfaenge, self._enden)]
+
+    def copy(self) -> 'Intervallmenge':
+        menge = Intervallmenge()
+        menge._anfaenge = self._anfaenge.copy()
+        menge._enden = self._enden.copy()
+        return menge
+
+    def __len__(self):
+        "Anzahl der enthaltenen Zahlen"
+        return self._kumulierteAnzahl()[-1]
+
+    def __bool__(self):
+        return bool(self._anfaenge)
+
+    def __contains__(self, idx: int) -> bool:
+        i = bisect_right(self._anfaenge, idx) - 1
+        return i >= 0 and idx < self._enden[i]
+
+    def __iter__(self) -> Iterator[int]:
+        for a, e in zip(self._anfaenge, self._enden):
+            yield from range(a, e)
+
+    def __eq__(self, other):
+        if not isinstance(other, Intervallmenge):
+            return NotImplemented
+        return self._anfaenge == other._anfaenge and self._enden == other._enden
+
+    def __repr__(self):
+        return f'Intervallmenge({self.bereiche})'
+
+    def hinzufuegen(self, bereich: range):
+        start, ende = bereich.start, bereich.stop
+        if start >= ende:
+            return
+        # Alle Intervalle, die den Bereich berühren, gehen im neuen auf.
+        i = bisect_left(self._enden, start)
+        j = bisect_right(self._anfaenge, ende)
+        if i < j:
+            start = min(start, self._anfaenge[i])
+            ende = max(ende, self._enden[j-1])
+        self._anfaenge[i:j] = [start]
+        self._enden[i:j] = [ende]
+        self._kumuliert = None
+
+    def entfernen(self, bereich: range):
+        start, ende = bereich.start, bereich.stop
+        if start >= ende:
+            return
+        i = bisect_right(self._enden, start)
+        j = bisect_left(self._anfaenge, ende)
+        if i >= j:
+            return
+        anfaenge = []
+        enden = []
+        if self._anfaenge[i] < start:
+            anfaenge.append(self._anfaenge[i])
+            enden.append(start)
+        if self._enden[j-1] > ende:
+            anfaenge.append(ende)
+            enden.append(self._enden[j-1])
+        self._anfaenge[i:j] = anfaenge
+        self._enden[i:j] = enden
+        self._kumuliert = None
+
+    def bereicheAb(self, idx: int) -> Iterator[range]:
+        "Die Intervalle, die Zahlen ab idx enthalten, in aufsteigender Reihenfolge"
+
+        for i in range(bisect_right(self._enden, idx), len(self._anfaenge)):
+            yield range(self._anfaenge[i], self._enden[i])
+
+    def schnitt(self, bereich: range) -> list[range]:
+        "Die Teile von bereich, die in der Menge liegen"
+
+        schnitt = []
+        for teil in self.bereicheAb(bereich.start):
+            if teil.start >= bereich.stop:
+                break
+            schnitt.append(range(max(teil.start, bereich.start), min(teil.stop, bereich.stop)))
+        return schnitt
+
+    def luecken(self, bereich: range) -> list[range]:
+        "Die Teile von bereich, die nicht in der Menge liegen"
+
+        luecken = []
+        pos = bereich.start
+        for teil in self.schnitt(bereich):
+            if teil.start > pos:
+                luecken.append(range(pos, teil.start))
+            pos = teil.stop
+        if pos < bereich.stop:
+            luecken.append(range(pos, bereich.stop))
+        return luecken
+
+    def anzahlVor(self, idx: int) -> int:
+        "Anzahl der enthaltenen Zahlen kleiner als idx"
+
+        i = bisect_right(self._anfaenge, idx) - 1
+        if i < 0:
+            return 0
+        return self._kumulierteAnzahl()[i] + min(idx, self._enden[i]) - self._anfaenge[i]
+
+    def naechsteFehlende(self, idx: int) -> int:
+        "Die kleinste Zahl ab idx, die nicht in der Menge liegt"
+
+        i = bisect_right(self._anfaenge, idx) - 1
+        if i >= 0 and idx < self._enden[i]:
+            return self._enden[i]
+        return idx
+
+    def _kumulierteAnzahl(self) -> list[int]:
+        "Anzahl der Zahlen in den Intervallen vor jedem Intervall, am Ende die Gesamtzahl"
+
+        if self._kumuliert is None:
+            self._kumuliert = [0]
+            for a, e in zip(self._anfaenge, self._enden):
+                self._kumuliert.append(self._kumuliert[-1] + e - a)
+        return self._kumuliert
+
+    def to_json(self):
+        return [[a, e-a] for a, e in zip(self._anfaenge, self._enden)]
+
+
+class Intervallkarte:
+    """
+    Ordnet disjunkten Intervallen ganzer Zahlen einen Wert zu
+
+    Die Intervalle sind halboffen und sortiert. Benachbarte Intervalle mit
+    gleichem Wert werden zusammengefasst, Zahlen ohne Wert liegen in keinem
+    Intervall. Der Wert an einer Stelle wird in O(log k) bei k Intervallen
+    gefunden. Einfügen und Ausschneiden verschieben die folgenden Intervalle
+    wie die Basen einer Sequenz.
+    """
+
+    def __init__(self):
+        self._anfaenge: list[int] = []
+        self._enden: list[int] = []
+        self._werte: list = []
+
+    @classmethod
+    def ausListe(cls, werte: Iterable) -> 'Intervallkarte':
+        "Erzeugt die Karte aus einem Wert je Stelle. None steht für keinen Wert."
+
+        karte = cls()
+        for idx, wert in enumerate(werte):
+            if wert is None:
+                continue
+            if karte._enden and karte._enden[-1] == idx and karte._werte[-1] == wert:
+                karte._enden[-1] = idx + 1
+            else:
+                karte._anfaenge.append(idx)
+                karte._enden.append(idx + 1)
+                karte._werte.append(wert)
+        return karte
+
+    @classmethod
+    def ausAbschnitten(cls, abschnitte: Iterable[tuple[range, object]]) -> 'Intervallkarte':
+        "Erzeugt die Karte aus sortierten, disjunkten Abschnitten mit ihren Werten."
+
+        karte = cls()
+        for bereich, wert in abschnitte:
+            if len(bereich) and wert is not None:
+                karte._anfaenge.append(bereich.start)
+                karte._enden.append(bereich.stop)
+                karte._werte.append(wert)
+                karte._verschmelze(len(karte._anfaenge)-1)
+        return karte
+
+    def copy(self) -> 'Intervallkarte':
+        karte = Intervallkarte()
+        karte._anfaenge = self._anfaenge.copy()
+        karte._enden = self._enden.copy()
+        karte._werte = self._werte.copy()
+        return karte
+
+    def __len__(self):
+        "Anzahl der Intervalle"
+        return len(self._anfaenge)
+
+    def __eq__(self, other):
+        if not isinstance(other, Intervallkarte):
+            return NotImplemented
+        return self._anfaenge == other._anfaenge and self._enden == other._enden and self._werte == other._werte
+
+    def __repr__(self):
+        return f'Intervallkarte({self.abschnitte()})'
+
+    def wert(self, idx: int):
+        i = bisect_right(self._anfaenge, idx) - 1
+        if i >= 0 and idx < self._enden[i]:
+            return self._werte[i]
+        return None
+
+    def abschnitte(self, start: int = 0, ende: int = None) -> list[tuple[range, object]]:
+        "Die Intervalle mit ihren Werten, auf start bis ende beschnitten"
+
+        abschnitte = []
+        for i in range(bisect_right(self._enden, start), len(self._anfaenge)):
+            if ende is not None and self._anfaenge[i] >= ende:
+                break
+            stop = self._enden[i] if ende is None else min(self._enden[i], ende)
+            abschnitte.append((range(max(self._anfaenge[i], start), stop), self._werte[i]))
+        return abschnitte
+
+    def liste(self, start: int, ende: int) -> list:
+        "Ein Wert je Stelle von start bis ende, None wo kein Intervall liegt"
+
+        werte = [None]*(ende-start)
+        for bereich, wert in self.abschnitte(start, ende):
+            werte[bereich.start-start:bereich.stop-start] = [wert]*len(bereich)
+        return werte
+
+    def bereicheMit(self, wert) -> list[range]:
+        return [range(a, e) for a, e, w in zip(self._anfaenge, self._enden, self._werte) if w == wert]
+
+    def werte(self) -> set:
+        return set(self._werte)
+
+    def setzen(self, bereich: range, wert):
+        "Setzt den Wert für alle Zahlen in bereich. Mit None werden sie entfernt."
+
+        if bereich.start >= bereich.stop:
+            return
+        i = self._teile(bereich.start)
+        j = self._teile(bereich.stop)
+        if wert is None:
+            del self._anfaenge[i:j], self._enden[i:j], self._werte[i:j]
+        else:
+            self._anfaenge[i:j] = [bereich.start]
+            self._enden[i:j] = [bereich.stop]
+            self._werte[i:j] = [wert]
+            self._verschmelze(i+1)
+        self._verschmelze(i)
+
+    def entferneWert(self, wert) -> bool:
+        "Entfernt alle Intervalle mit dem Wert. Gibt zurück, ob es welche gab."
+
+        behalten = [i for i, w in enumerate(self._werte) if w != wert]
+        if len(behalten) == len(self._werte):
+            return False
+        self._anfaenge = [self._anfaenge[i] for i in behalten]
+        self._enden = [self._enden[i] for i in behalten]
+        self._werte = [self._werte[i] for i in behalten]
+        return True
+
+    def ausschnitt(self, pos: int, anzahl: int) -> 'Intervallkarte':
+        "Kopie der Intervalle von pos bis pos+anzahl, nach 0 verschoben"
+
+        karte = Intervallkarte()
+        for bereich, wert in self.abschnitte(pos, pos+anzahl):
+            karte._anfaenge.append(bereich.start-pos)
+            karte._enden.append(bereich.stop-pos)
+            karte._werte.append(wert)
+        return karte
+
+    def einfuegen(self, pos: int, anzahl: int, karte: 'Intervallkarte' = None):
+        "Schiebt alles ab pos um anzahl nach hinten und fügt die Intervalle von karte bei pos ein."
+
+        i = self._teile(pos)
+        self._verschiebe(i, anzahl)
+        if karte is not None and karte._anfaenge:
+            self._anfaenge[i:i] = [a+pos for a in karte._anfaenge]
+            self._enden[i:i] = [e+pos for e in karte._enden]
+            self._werte[i:i] = karte._werte
+            self._verschmelze(i+len(karte))
+        self._verschmelze(i)
+
+    def ausschneiden(self, pos: int, anzahl: int) -> 'Intervallkarte':
+        "Entfernt die Stellen von pos bis pos+anzahl und gibt ihre Intervalle nach 0 verschoben zurück."
+
+        karte = self.ausschnitt(pos, anzahl)
+        i = self._teile(pos)
+        j = self._teile(pos+anzahl)
+        del self._anfaenge[i:j], self._enden[i:j], self._werte[i:j]
+        self._verschiebe(i, -anzahl)
+        self._verschmelze(i)
+        return karte
+
+    def _teile(self, idx: int) -> int:
+        "Teilt das Intervall, das idx enthält, bei idx. Gibt den Index des ersten Intervalls ab idx zurück."
+
+        i = bisect_left(self._enden, idx+1)
+        if i < len(self._anfaenge) and self._anfaenge[i] < idx:
+            self._anfaenge.insert(i+1, idx)
+            self._enden.insert(i+1, self._enden[i])
+            self._werte.insert(i+1, self._werte[i])
+            self._enden[i] = idx
+            return i+1
+        return i
+
+    def _verschiebe(self, i: int, anzahl: int):
+        for k in range(i, len(self._anfaenge)):
+            self._anfaenge[k] += anzahl
+            self._enden[k] += anzahl
+
+    def _verschmelze(self, i: int):
+        "Fasst das Intervall i mit seinem Vorgänger zusammen, wenn sie aneinander stoßen und den gleichen Wert haben."
+
+        if 0 < i < len(self._anfaenge) and self._enden[i-1] == self._anfaenge[i] and self._werte[i-1] == self._werte[i]:
+            self._enden[i-1] = self._enden[i]
+            del self._anfaenge[i], self._enden[i], self._werte[i]
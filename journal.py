@@ -0,0 +1,368 @@
+"""
+Journal zur Wiederherstellung nach einem Absturz
+
+Jede Änderung auf dem Undo-Stack wird als kurzer Datensatz an eine
+Journaldatei angehängt. Die erste Zeile nennt die zuletzt gespeicherte
+Projektdatei, jede weitere Zeile ist eine JSON-Liste von Operationen, z.B.
+
+    ["einfuegen", 3, 120, "~~~", []]
+
+Sequenzen und Markierungen werden über Nummern angesprochen. Die Objekte der
+Projektdatei erhalten beim Start des Journals die Nummern 0, 1, ... in der
+Reihenfolge des Models, neue Objekte werden mit einer Operation "sequenz" bzw.
+"markierung" vor ihrer ersten Verwendung beschrieben.
+
+Aufgezeichnet wird nicht der Befehl selbst, sondern seine Wirkung: beim Undo
+die Umkehrung. Das Journal kann deshalb ohne Undo-Stack auf die Projektdatei
+angewendet werden. Geschrieben wird in einem eigenen Thread, ein Datensatz
+kostet nur so viel wie die Änderung selbst.
+"""
+
+import json
+import os
+import queue
+
+from PySide6.QtCore import QObject, QStandardPaths, QThread
+from PySide6.QtGui import QUndoCommand, QUndoStack
+
+from bioinformatik import Basen, Markierung, Sequenz
+from intervalle import Intervallkarte, Intervallmenge
+from sequenzenmodel import SequenzenModel
+from commands import (
+    AddSequenzenCommand, RemoveSequenzenCommand, RenameSequenzCommand, AminosaeureSequenzCommand,
+    RenewSequenzBasenCommand, InsertLeerBaseCommand, InsertBaseCommand, EntferneBaseCommand,
+    MarkiereBasenCommand, AddMarkierungCommand, RemoveMarkierungCommand, changeColorMarkierungCommand,
+    changeBeschreibungMarkierungCommand, VerstecktCommand, EnttarnenCommand, AlignmentCommand
+)
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+
+
+def journaldatei() -> str:
+    "Der Standardort der Journaldatei im Datenverzeichnis der Anwendung"
+
+    verzeichnis = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    os.makedirs(verzeichnis, exist_ok=True)
+    return os.path.join(verzeichnis, 'wiederherstellung.journal')
+
+
+def leseJournal(dateiname: str) -> tuple[str, list[list]]:
+    """
+    Liest ein Journal und liefert (Projektdatei, Datensätze).
+
+    Eine unvollständige letzte Zeile, z.B. nach einem Absturz während des
+    Schreibens, wird ignoriert.
+    """
+
+    datensaetze = []
+    with open(dateiname, encoding='utf-8') as datei:
+        kopf = json.loads(datei.readline())
+        if kopf.get('journal') != VERSION:
+            raise ValueError(f'{dateiname}: Unbekannte Journalversion {kopf.get("journal")}')
+        for zeile in datei:
+            try:
+                datensaetze.append(json.loads(zeile))
+            except json.JSONDecodeError:
+                logger.warning(f'{dateiname}: Unvollständiger Datensatz am Ende ignoriert')
+                break
+    return kopf.get('basis'), datensaetze
+
+
+class JournalSchreiber(QThread):
+    """
+    Schreibt die Zeilen des Journals im Hintergrund
+
+    Nach jedem Schub von Zeilen wird die Datei mit fsync auf die Platte
+    gebracht. Nachrichten sind Tupel (Art, Text): 'neu' beginnt die Datei
+    neu, 'zeile' hängt an, 'ende' beendet den Thread und löscht die Datei, wenn
+    der Text True ist.
+    """
+
+    def __init__(self, parent, dateiname: str):
+        super().__init__(parent)
+        self._dateiname = dateiname
+        self._warteschlange = queue.SimpleQueue()
+
+    @property
+    def dateiname(self) -> str:
+        return self._dateiname
+
+    def neu(self, kopf: str):
+        self._warteschlange.put(('neu', kopf))
+
+    def anhaengen(self, zeile: str):
+        self._warteschlange.put(('zeile', zeile))
+
+    def beenden(self, loeschen: bool):
+        self._warteschlange.put(('ende', loeschen))
+
+    @logme(logger.debug)
+    def run(self):
+        datei = None
+        try:
+            while True:
+                art, text = self._warteschlange.get()
+                while True:
+                    if art == 'ende':
+                        if datei:
+                            datei.close()
+                            datei = None
+                        if text and os.path.exists(self.dateiname):
+                            os.remove(self.dateiname)
+                        return
+                    if art == 'neu':
+                        if datei:
+                            datei.close()
+                        datei = open(self.dateiname, 'w', encoding='utf-8', newline='\n')
+                        datei.write(text + '\n')
+                    elif datei is None:
+                        datei = open(self.dateiname, 'a', encoding='utf-8', newline='\n')
+                        datei.write(text + '\n')
+                    else:
+                        datei.write(text + '\n')
+                    try:
+                        art, text = self._warteschlange.get_nowait()
+                    except queue.Empty:
+                        break
+                datei.flush()
+                os.fsync(datei.fileno())
+        except OSError as e:
+            logger.error(f'Journal {self.dateiname} nicht geschrieben: {e}')
+        finally:
+            if datei:
+                datei.close()
+
+
+class Journal(QObject):
+    """
+    Zeichnet die Änderungen eines Undo-Stacks auf
+
+    Das Journal hängt am Signal indexChanged des Stacks. Steigt der Index,
+    wurden Befehle ausgeführt, sinkt er, wurden sie rückgängig gemacht. Makros
+    werden als Folge ihrer Kinder aufgezeichnet. Befehle ohne eigene Regel
+    werden als vollständiger Stand des Models gespeichert.
+    """
+
+    def __init__(self, parent, model: SequenzenModel, undostack: QUndoStack, dateiname: str):
+        super().__init__(parent)
+        self._model = model
+        self._undostack = undostack
+        self._schreiber = JournalSchreiber(self, dateiname)
+        self._index = undostack.index()
+        self._sequenznummern: dict[Sequenz, int] = {}
+        self._markierungsnummern: dict[Markierung, int] = {}
+        self._vorab: list[list] = []
+        undostack.indexChanged.connect(self.indexGeaendert)
+
+    @property
+    def dateiname(self) -> str:
+        return self._schreiber.dateiname
+
+    @property
+    def aktiv(self) -> bool:
+        return self._schreiber.isRunning()
+
+    @logme(logger.debug)
+    def neu(self, basis: str = None):
+        "Beginnt das Journal neu auf dem Stand der Projektdatei basis"
+
+        self._nummeriere()
+        self._schreiber.neu(json.dumps({'journal': VERSION, 'basis': basis}))
+        if not self.aktiv:
+            self._schreiber.start()
+
+    @logme(logger.debug)
+    def wiederherstellen(self, datensaetze: list[list]):
+        """
+        Wendet die Datensätze eines Journals auf das Model an.
+
+        Das Model muss den Stand der Projektdatei des Journals haben. Danach
+        wird an das vorhandene Journal angehängt.
+        """
+
+        self._nummeriere()
+        sequenzen = {nummer: sequenz for sequenz, nummer in self._sequenznummern.items()}
+        markierungen = {nummer: markierung for markierung, nummer in self._markierungsnummern.items()}
+        for datensatz in datensaetze:
+            for operation in datensatz:
+                self._anwenden(operation, sequenzen, markierungen)
+        self._sequenznummern = {sequenz: nummer for nummer, sequenz in sequenzen.items()}
+        self._markierungsnummern = {markierung: nummer for nummer, markierung in markierungen.items()}
+        self._index = self._undostack.index()
+        if not self.aktiv:
+            self._schreiber.start()
+
+    @logme(logger.debug)
+    def beenden(self, loeschen: bool = True):
+        "Beendet die Aufzeichnung, mit loeschen wird die Journaldatei entfernt."
+
+        self._undostack.indexChanged.disconnect(self.indexGeaendert)
+        if self.aktiv:
+            self._schreiber.beenden(loeschen)
+            self._schreiber.wait()
+
+    def indexGeaendert(self, index: int):
+        alt, self._index = self._index, index
+        if not self.aktiv:
+            return
+        if index > alt:
+            for i in range(alt, index):
+                self._aufzeichnen(self._undostack.command(i), False)
+        else:
+            for i in reversed(range(index, alt)):
+                self._aufzeichnen(self._undostack.command(i), True)
+
+    def _aufzeichnen(self, befehl: QUndoCommand, rueckwaerts: bool):
+        if befehl is None:
+            return
+        operationen = self._operationen(befehl, rueckwaerts)
+        # Neue Sequenzen werden mit ihrem jetzigen Stand beschrieben. Hat ein
+        # Makro danach noch Basen in ihnen eingefügt oder entfernt, passt das
+        # nicht mehr zusammen, dann wird der ganze Stand gespeichert.
+        neu = {operation[1] for operation in self._vorab if operation[0] == 'sequenz'}
+        if any(operation[0] in ('einfuegen', 'entfernen') and operation[1] in neu for operation in operationen):
+            operationen = self._alles()
+        operationen, self._vorab = self._vorab + operationen, []
+        self._schreiber.anhaengen(json.dumps(operationen, ensure_ascii=False, separators=(',', ':')))
+
+    def _nummeriere(self):
+        self._sequenznummern = {sequenz: nummer for nummer, sequenz in enumerate(self._model.sequenzen)}
+        self._markierungsnummern = {markierung: nummer for nummer, markierung in enumerate(self._model.markierungen)}
+        self._vorab = []
+
+    def _operationen(self, befehl: QUndoCommand, rueckwaerts: bool) -> list[list]:
+        "Die Wirkung von befehl (beim Undo die Umkehrung) als Operationen"
+
+        if befehl.childCount():
+            kinder = [befehl.child(i) for i in range(befehl.childCount())]
+            if rueckwaerts:
+                kinder.reverse()
+            operationen = []
+            for kind in kinder:
+                operationen += self._operationen(kind, rueckwaerts)
+            return operationen
+
+        if isinstance(befehl, AddSequenzenCommand):
+            art = 'sequenzenWeg' if rueckwaerts else 'sequenzenHinzu'
+            return [[art, [self._sequenz(sequenz) for sequenz in befehl.sequenzen]]]
+        if isinstance(befehl, RemoveSequenzenCommand):
+            art = 'sequenzenHinzu' if rueckwaerts else 'sequenzenWeg'
+            return [[art, [self._sequenz(befehl.sequenzen)]]]
+        if isinstance(befehl, RenameSequenzCommand):
+            return [['name', self._sequenz(befehl.sequenz), befehl.sequenz.name]]
+        if isinstance(befehl, (AminosaeureSequenzCommand, RenewSequenzBasenCommand)):
+            return [['basen', self._sequenz(befehl.sequenz), *self._basen(befehl.sequenz.basen)]]
+        if isinstance(befehl, AlignmentCommand):
+            return [['basen', self._sequenz(sequenz), *self._basen(sequenz.basen)] for sequenz in befehl.sequenzen]
+        if isinstance(befehl, (InsertLeerBaseCommand, InsertBaseCommand, EntferneBaseCommand)):
+            entfernen = rueckwaerts != isinstance(befehl, EntferneBaseCommand)
+            if entfernen:
+                return [['entfernen', self._sequenz(befehl.sequenz), befehl.pos, len(befehl.basen)]]
+            return [['einfuegen', self._sequenz(befehl.sequenz), befehl.pos, *self._basen(befehl.basen)]]
+        if isinstance(befehl, MarkiereBasenCommand):
+            karte = befehl.sequenz.markierungsausschnitt(befehl.pos, befehl.anzahl)
+            return [['markieren', self._sequenz(befehl.sequenz), befehl.pos, befehl.anzahl, self._abschnitte(karte)]]
+        if isinstance(befehl, AddMarkierungCommand):
+            return [['markierungWeg' if rueckwaerts else 'markierungHinzu', self._markierung(befehl.markierung)]]
+        if isinstance(befehl, RemoveMarkierungCommand):
+            if not rueckwaerts:
+                return [['markierungGeloescht', self._markierung(befehl.markierung)]]
+            operationen = [['markierungHinzu', self._markierung(befehl.markierung)]]
+            for sequenz, bereich in befehl.markierteBereiche:
+                karte = sequenz.markierungsausschnitt(bereich.start, len(bereich))
+                operationen.append(['markieren', self._sequenz(sequenz), bereich.start, len(bereich), self._abschnitte(karte)])
+            return operationen
+        if isinstance(befehl, changeColorMarkierungCommand):
+            return [['farbe', self._markierung(befehl.markierung), befehl.markierung.farbe]]
+        if isinstance(befehl, changeBeschreibungMarkierungCommand):
+            return [['beschreibung', self._markierung(befehl.markierung), befehl.markierung.beschreibung]]
+        if isinstance(befehl, (VerstecktCommand, EnttarnenCommand)):
+            verstecken = rueckwaerts == isinstance(befehl, EnttarnenCommand)
+            return [['verstecken' if verstecken else 'enttarnen', [[bereich.start, len(bereich)] for bereich in befehl.bereiche]]]
+        return self._alles()
+
+    def _alles(self) -> list[list]:
+        return [['alles',
+                 [self._sequenz(sequenz) for sequenz in self._model.sequenzen],
+                 [self._markierung(markierung) for markierung in self._model.markierungen],
+                 self._model.versteckt.to_json()]]
+
+    def _sequenz(self, sequenz: Sequenz) -> int:
+        "Die Nummer von sequenz; eine unbekannte Sequenz wird vorab beschrieben."
+
+        nummer = self._sequenznummern.get(sequenz)
+        if nummer is None:
+            basen = self._basen(sequenz.basen)
+            nummer = self._sequenznummern[sequenz] = len(self._sequenznummern)
+            self._vorab.append(['sequenz', nummer, sequenz.name, *basen])
+        return nummer
+
+    def _markierung(self, markierung: Markierung) -> int:
+        nummer = self._markierungsnummern.get(markierung)
+        if nummer is None:
+            nummer = self._markierungsnummern[markierung] = len(self._markierungsnummern)
+            self._vorab.append(['markierung', nummer, markierung.beschreibung, markierung.farbe])
+        return nummer
+
+    def _basen(self, basen: Basen) -> list:
+        return [basen.chars.decode('ascii', 'replace'), self._abschnitte(basen.markierungen)]
+
+    def _abschnitte(self, karte: Intervallkarte) -> list[list[int]]:
+        return [[bereich.start, len(bereich), self._markierung(markierung)] for bereich, markierung in karte.abschnitte()]
+
+    def _anwenden(self, operation: list, sequenzen: dict[int, Sequenz], markierungen: dict[int, Markierung]):
+        art, *werte = operation
+
+        def basen(chars: str, abschnitte: list[list[int]]) -> Basen:
+            return Basen(chars.encode('ascii', 'replace'), karte(abschnitte))
+
+        def karte(abschnitte: list[list[int]]) -> Intervallkarte:
+            return Intervallkarte.ausAbschnitten((range(start, start+laenge), markierungen[nummer]) for start, laenge, nummer in abschnitte)
+
+        if art == 'sequenz':
+            nummer, name, chars, abschnitte = werte
+            sequenzen[nummer] = Sequenz(name, basen(chars, abschnitte))
+        elif art == 'markierung':
+            nummer, beschreibung, farbe = werte
+            markierungen[nummer] = Markierung(beschreibung, farbe)
+        elif art == 'sequenzenHinzu':
+            self._model.addSequenzen([sequenzen[nummer] for nummer in werte[0]])
+        elif art == 'sequenzenWeg':
+            self._model.removeSequenzen([sequenzen[nummer] for nummer in werte[0]])
+        elif art == 'name':
+            sequenzen[werte[0]].name = werte[1]
+        elif art == 'basen':
+            sequenzen[werte[0]].basen = basen(werte[1], werte[2])
+        elif art == 'einfuegen':
+            nummer, pos, chars, abschnitte = werte
+            sequenzen[nummer].insertBasen(pos, basen(chars, abschnitte))
+        elif art == 'entfernen':
+            nummer, pos, anzahl = werte
+            sequenzen[nummer].removeBasen(pos, anzahl)
+        elif art == 'markieren':
+            nummer, pos, anzahl, abschnitte = werte
+            sequenzen[nummer].setzeMarkierungen(pos, anzahl, karte(abschnitte))
+        elif art == 'markierungHinzu':
+            self._model.addMarkierungen([markierungen[werte[0]]])
+        elif art == 'markierungWeg':
+            self._model.removeMarkierung(markierungen[werte[0]])
+        elif art == 'markierungGeloescht':
+            markierungen[werte[0]].deleted.emit()
+            self._model.removeMarkierung(markierungen[werte[0]])
+        elif art == 'farbe':
+            markierungen[werte[0]].farbe = werte[1]
+        elif art == 'beschreibung':
+            markierungen[werte[0]].beschreibung = werte[1]
+        elif art == 'verstecken':
+            self._model.addVersteckt([range(start, start+laenge) for start, laenge in werte[0]])
+        elif art == 'enttarnen':
+            self._model.removeVersteckt([range(start, start+laenge) for start, laenge in werte[0]])
+        elif art == 'alles':
+            seqnummern, marknummern, versteckt = werte
+            self._model.setAll([sequenzen[nummer] for nummer in seqnummern], [markierungen[nummer] for nummer in marknummern], Intervallmenge.ausJson(versteckt))
+        else:
+            raise ValueError(f'Unbekannte Operation {art} im Journal')
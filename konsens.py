@@ -0,0 +1,164 @@
+"""
+Konsens und Konservierung der Spalten
+
+Die Buchstaben aller Sequenzen liegen als Codes in einer Matrix mit einer
+Zeile je Sequenz und einer Spalte je Basenindex, dazu die Anzahl jedes
+Codes je Spalte. Code 0 steht für leere Basen und für Spalten hinter dem
+Ende einer kürzeren Sequenz.
+
+Wird in einer Sequenz eingefügt oder entfernt, verschiebt sich nur ihre
+Zeile ab dieser Stelle. Ihre alten Codes werden aus den Anzahlen
+abgezogen, die neuen addiert, und die Werte werden nur ab der ersten
+geänderten Spalte neu berechnet.
+"""
+
+import math
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+
+from bioinformatik import Sequenz, istNukleotid, leerbase
+from sequenzenmodel import SequenzenModel
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+
+class Konsens(QObject):
+    """
+    Für jede Spalte der häufigste Buchstabe, die Identität und die Entropie
+
+    identitaet ist der Anteil aller Sequenzen, die in der Spalte den
+    häufigsten Buchstaben haben, leere Basen zählen also dagegen. Die
+    Entropie in Bit wird nur über die Buchstaben gebildet. konservierung
+    ist 1 minus die Entropie geteilt durch die größtmögliche für Nukleotide
+    oder Aminosäuren.
+
+    konsensChanged(pos) wird gesendet, wenn sich die Werte ab der Spalte pos
+    geändert haben.
+    """
+
+    konsensChanged = Signal(int)
+
+    def __init__(self, parent: QObject, model: SequenzenModel):
+        super().__init__(parent)
+        self._model = model
+        self._verbunden: list[Sequenz] = []
+        self._codes = np.zeros(256, dtype=np.uint8)
+        self._buchstaben = bytearray(leerbase)
+        self._matrix = np.zeros((0, 0), dtype=np.uint8)
+        self._anzahlen = np.zeros((0, 1), dtype=np.int32)
+        self._maxentropie = 2.0
+        self.zeichen = np.zeros(0, dtype=np.uint8)
+        self.identitaet = np.zeros(0)
+        self.entropie = np.zeros(0)
+        self.konservierung = np.zeros(0)
+        model.sequenzenRenewed.connect(self.neuBerechnen)
+        model.sequenzenAdded.connect(self.neuBerechnen)
+        model.sequenzenRemoved.connect(self.neuBerechnen)
+        self.neuBerechnen()
+
+    @property
+    def model(self):
+        return self._model
+
+    @property
+    def breite(self) -> int:
+        return self._matrix.shape[1]
+
+    def char(self, idx: int) -> str:
+        return chr(self.zeichen[idx]) if idx < self.breite else leerbase.decode('ascii')
+
+    def _verbinde(self):
+        for sequenz in self._verbunden:
+            sequenz.basenInserted.disconnect(self.basenGeaendert)
+            sequenz.basenRemoved.disconnect(self.basenGeaendert)
+            sequenz.basenRenewed.disconnect(self.zeileErneuert)
+        self._verbunden = list(self.model.sequenzen)
+        for sequenz in self._verbunden:
+            sequenz.basenInserted.connect(self.basenGeaendert)
+            sequenz.basenRemoved.connect(self.basenGeaendert)
+            sequenz.basenRenewed.connect(self.zeileErneuert)
+
+    def _kodiere(self, chars: bytes) -> np.ndarray:
+        "Die Codes der Buchstaben, neue Buchstaben erhalten einen neuen Code."
+
+        roh = np.frombuffer(chars.upper(), dtype=np.uint8)
+        neu = set(roh[self._codes[roh] == 0].tolist()) - {leerbase[0]}
+        if neu:
+            for c in sorted(neu):
+                self._codes[c] = len(self._buchstaben)
+                self._buchstaben.append(c)
+            self._anzahlen = np.pad(self._anzahlen, ((0, 0), (0, len(neu))))
+        return self._codes[roh]
+
+    def _verbreitere(self, breite: int):
+        if breite > self.breite:
+            self._matrix = np.pad(self._matrix, ((0, 0), (0, breite-self.breite)))
+            self._anzahlen = np.pad(self._anzahlen, ((0, breite-len(self._anzahlen)), (0, 0)))
+
+    @logme(logger.debug)
+    def neuBerechnen(self, *args):
+        self._verbinde()
+        sequenzen = self.model.sequenzen
+        chars = [sequenz.basenstr.encode('ascii') for sequenz in sequenzen]
+        self._maxentropie = 2.0 if istNukleotid([c.replace(leerbase, b'') for c in chars]) else math.log2(20)
+        zeilen = [self._kodiere(c) for c in chars]
+        breite = max((len(zeile) for zeile in zeilen), default=0)
+        self._matrix = np.zeros((len(zeilen), breite), dtype=np.uint8)
+        for i, zeile in enumerate(zeilen):
+            self._matrix[i, :len(zeile)] = zeile
+        k = len(self._buchstaben)
+        spalten = np.broadcast_to(np.arange(breite)*k, self._matrix.shape)
+        self._anzahlen = np.bincount((spalten + self._matrix).ravel(), minlength=breite*k).reshape(breite, k).astype(np.int32)
+        self._berechneAb(0)
+
+    def zeileErneuert(self):
+        self.basenGeaendert(0, 0, self.sender())
+
+    def basenGeaendert(self, pos: int, anzahl: int, sequenz: Sequenz = None):
+        "Ersetzt die Zeile der Sequenz ab pos und berechnet die Werte ab dort neu."
+
+        sequenz = sequenz or self.sender()
+        if sequenz not in self._verbunden:
+            return
+        i = self._verbunden.index(sequenz)
+        neu = self._kodiere(sequenz.basenstr.encode('ascii')[pos:])
+        self._verbreitere(pos + len(neu))
+        spalten = np.arange(pos, self.breite)
+        self._anzahlen[spalten, self._matrix[i, pos:]] -= 1
+        self._matrix[i, pos:] = 0
+        self._matrix[i, pos:pos+len(neu)] = neu
+        self._anzahlen[spalten, self._matrix[i, pos:]] += 1
+        self._berechneAb(pos)
+
+    def _berechneAb(self, pos: int):
+        anzahlen = self._anzahlen[pos:, 1:]
+        breite = self.breite
+        if len(self.zeichen) != breite:
+            # Die Werte ab pos werden unten ohnehin überschrieben
+            self.zeichen = np.resize(self.zeichen, breite)
+            self.identitaet = np.resize(self.identitaet, breite)
+            self.entropie = np.resize(self.entropie, breite)
+            self.konservierung = np.resize(self.konservierung, breite)
+        if anzahlen.shape[1] == 0:
+            self.zeichen[pos:] = leerbase[0]
+            self.identitaet[pos:] = self.entropie[pos:] = self.konservierung[pos:] = 0
+            self.konsensChanged.emit(pos)
+            return
+
+        # Bei Gleichstand gewinnt der kleinste Buchstabe, unabhängig von der
+        # Reihenfolge, in der die Codes vergeben wurden
+        buchstaben = np.frombuffer(bytes(self._buchstaben), dtype=np.uint8)
+        ordnung = np.argsort(buchstaben[1:])
+        haeufigster = ordnung[anzahlen[:, ordnung].argmax(axis=1)]
+        maximum = anzahlen[np.arange(len(anzahlen)), haeufigster]
+        self.zeichen[pos:] = np.where(maximum > 0, buchstaben[haeufigster+1], leerbase[0])
+        self.identitaet[pos:] = maximum / max(len(self._matrix), 1)
+        summe = anzahlen.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = anzahlen / summe
+            entropie = np.where(p > 0, p*np.log2(1/p), 0).sum(axis=1)
+        self.entropie[pos:] = entropie
+        self.konservierung[pos:] = np.where(maximum > 0, np.clip(1 - entropie/self._maxentropie, 0, 1), 0)
+        self.konsensChanged.emit(pos)
@@ -4,7 +4,7 @@ from PySide6.QtWidgets import QDialog, QPlainTextEdit, QVBoxLayout, QWidget
 def logme(loggerfunc):
     def decorator(func):
         def wrapper(*args, **kwargs):
-            argstr = ",".join([str(arg) for arg in args]+[str(k)+"="+str(v) for k,v in kwargs])
+            argstr = ",".join([str(arg) for arg in args]+[str(k)+"="+str(v) for k,v in kwargs.items()])
             loggerfunc(f'Enter {func.__name__}({argstr})')
             retval = func(*args, **kwargs)
             loggerfunc(f'Exit {func.__name__} mit {str(retval)}')
@@ -0,0 +1,191 @@
+"""
+Progressives Mehrfachalignment
+
+Zuerst werden die Abstände aller Paare aus ihren gemeinsamen k-meren
+bestimmt, bei vielen Sequenzen verteilt auf mehrere Prozesse. Aus den
+Abständen entsteht ein Führungsbaum nach UPGMA. Entlang des Baums werden
+dann immer zwei Profile, also bereits alignierte Gruppen von Sequenzen, mit
+gotoh zu einem aligniert, bis nur noch eines übrig ist.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import numpy as np
+
+from alignment import Alignment, blosum62, gotoh, nachSpalten, ohneLuecken, verschiebe
+from bioinformatik import Basen, istNukleotid
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+# Ab so vielen Paaren lohnt sich das Starten der Prozesse
+parallelab = 2000
+
+_kmerliste: list[tuple[np.ndarray, np.ndarray]] = None
+
+
+def kmere(chars: bytes, k: int) -> tuple[np.ndarray, np.ndarray]:
+    "Die verschiedenen k-mere von chars als Zahlen und wie oft jedes vorkommt"
+
+    roh = np.frombuffer(chars.upper(), dtype=np.uint8).astype(np.int64)
+    anzahl = len(roh) - k + 1
+    if anzahl <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    werte = np.zeros(anzahl, dtype=np.int64)
+    for t in range(k):
+        werte = (werte << 8) | roh[t:t+anzahl]
+    return np.unique(werte, return_counts=True)
+
+
+def _abstandszeile(kmerliste: list[tuple[np.ndarray, np.ndarray]], i: int) -> np.ndarray:
+    "Abstände von Sequenz i zu allen späteren, 1 - Anteil gemeinsamer k-mere"
+
+    werte_i, anzahl_i = kmerliste[i]
+    summe_i = anzahl_i.sum()
+    zeile = np.ones(len(kmerliste))
+    for j in range(i+1, len(kmerliste)):
+        werte_j, anzahl_j = kmerliste[j]
+        kuerzer = min(summe_i, anzahl_j.sum())
+        if kuerzer == 0:
+            continue
+        _, a, b = np.intersect1d(werte_i, werte_j, assume_unique=True, return_indices=True)
+        zeile[j] = 1 - np.minimum(anzahl_i[a], anzahl_j[b]).sum() / kuerzer
+    return zeile
+
+
+def _setzeKmere(kmerliste: list[tuple[np.ndarray, np.ndarray]]):
+    global _kmerliste
+    _kmerliste = kmerliste
+
+
+def _abstandszeileImProzess(i: int) -> np.ndarray:
+    return _abstandszeile(_kmerliste, i)
+
+
+@logme(logger.debug)
+def kmerAbstaende(sequenzen: list[bytes], k: int, prozesse: int = None) -> np.ndarray:
+    "Die symmetrische Matrix der k-mer-Abstände aller Paare"
+
+    n = len(sequenzen)
+    kmerliste = [kmere(sequenz, k) for sequenz in sequenzen]
+    prozesse = os.cpu_count() if prozesse is None else prozesse
+    if prozesse > 1 and n*(n-1)//2 >= parallelab:
+        # spawn wie im Stapelexport, damit kein Prozess den Zustand von Qt erbt
+        with ProcessPoolExecutor(prozesse, mp_context=get_context('spawn'), initializer=_setzeKmere, initargs=(kmerliste,)) as pool:
+            zeilen = list(pool.map(_abstandszeileImProzess, range(n), chunksize=max(n // (4*prozesse), 1)))
+    else:
+        zeilen = [_abstandszeile(kmerliste, i) for i in range(n)]
+    abstaende = np.triu(np.array(zeilen).reshape(n, n), 1)
+    return abstaende + abstaende.T
+
+
+def fuehrungsbaum(abstaende: np.ndarray) -> list[tuple[int, int]]:
+    """
+    UPGMA: verbindet immer die beiden nächsten Gruppen.
+
+    Die Blätter haben die Nummern 0 bis n-1, die i-te Verbindung erzeugt die
+    Gruppe n+i. Ergebnis sind die verbundenen Paare in ihrer Reihenfolge.
+    """
+
+    n = len(abstaende)
+    d = abstaende.astype(float)
+    np.fill_diagonal(d, np.inf)
+    groessen = [1]*n
+    nummern = list(range(n))
+    schritte = []
+    for neu in range(n, 2*n-1):
+        i, j = divmod(int(np.argmin(d)), n)
+        schritte.append((nummern[i], nummern[j]))
+        d[i] = (d[i]*groessen[i] + d[j]*groessen[j]) / (groessen[i] + groessen[j])
+        d[:, i] = d[i]
+        d[i, i] = np.inf
+        d[j] = d[:, j] = np.inf
+        groessen[i] += groessen[j]
+        nummern[i] = neu
+    return schritte
+
+
+class _Profil:
+    "Eine alignierte Gruppe: für jede Sequenz die Spalten ihrer Basen"
+
+    def __init__(self, mitglieder: list[int], spalten: list[np.ndarray], laenge: int):
+        self.mitglieder = mitglieder
+        self.spalten = spalten
+        self.laenge = laenge
+
+    def haeufigkeiten(self, codes: list[np.ndarray], buchstaben: int) -> np.ndarray:
+        "Anteil jedes Buchstabens je Spalte, leere Basen zählen nicht"
+
+        h = np.zeros((self.laenge, buchstaben))
+        for i, spalten in zip(self.mitglieder, self.spalten):
+            np.add.at(h, (spalten, codes[i]), 1)
+        return h / len(self.mitglieder)
+
+    def luecken(self, luecken: list[tuple[int, int]]):
+        self.spalten = [verschiebe(spalten, luecken) for spalten in self.spalten]
+        self.laenge += sum(anzahl for _, anzahl in luecken)
+
+
+def aligniereProfile(fa: np.ndarray, fb: np.ndarray, matrix: np.ndarray,
+                     oeffnung: float, erweiterung: float) -> Alignment:
+    """
+    Aligniert zwei Profile global, gegeben als Häufigkeiten je Spalte.
+
+    Zwei Spalten erhalten den Mittelwert der Punkte aller Paare von Basen
+    aus ihnen nach matrix, ein Paar mit einer leeren Base zählt 0.
+    """
+
+    n, m = len(fa), len(fb)
+    # fa[i] @ gb[j] ergibt die Punkte von Spalte i gegen j
+    gb = fb @ matrix
+    gb_rueck = gb[::-1].copy()
+
+    def wertung(d: int, von: int, bis: int) -> np.ndarray:
+        return np.einsum('ij,ij->i', fa[von-1:bis], gb_rueck[m-d+von:m-d+bis+1])
+
+    return gotoh(n, m, wertung, False, None, oeffnung, erweiterung)
+
+
+@logme(logger.debug)
+def mehrfachalignment(basen: list[Basen], k: int = None, prozesse: int = None,
+                      treffer: float = 5, fehler: float = -4, oeffnung: float = 10, erweiterung: float = 0.5) -> list[Basen]:
+    """
+    Aligniert alle Sequenzen miteinander, leere Basen darin werden ignoriert.
+
+    Das Ergebnis sind gleich lange Basen in derselben Reihenfolge, die
+    Markierungen bleiben bei ihren Basen. Nukleotide werden mit treffer und
+    fehler bewertet, Aminosäuren nach BLOSUM62. Ohne k werden für Nukleotide
+    6-mere, sonst 3-mere verglichen.
+    """
+
+    chars = [ohneLuecken(b.chars).upper() for b in basen]
+    if len(chars) < 2:
+        return [nachSpalten(b, np.arange(len(c)), len(c)) for b, c in zip(basen, chars)]
+    nukleotid = istNukleotid(chars)
+    if k is None:
+        k = 6 if nukleotid else 3
+    abstaende = kmerAbstaende(chars, k, prozesse)
+
+    alphabet = np.full(256, -1, dtype=np.intp)
+    vorhanden = sorted(set(b''.join(chars)))
+    alphabet[vorhanden] = np.arange(len(vorhanden))
+    if nukleotid:
+        matrix = fehler + (treffer-fehler)*np.eye(len(vorhanden))
+    else:
+        matrix = blosum62(bytes(vorhanden))
+    codes = [alphabet[np.frombuffer(c, dtype=np.uint8)] for c in chars]
+
+    profile: dict[int, _Profil] = {i: _Profil([i], [np.arange(len(c))], len(c)) for i, c in enumerate(chars)}
+    for neu, (i, j) in enumerate(fuehrungsbaum(abstaende), start=len(chars)):
+        a, b = profile.pop(i), profile.pop(j)
+        alignment = aligniereProfile(a.haeufigkeiten(codes, len(vorhanden)), b.haeufigkeiten(codes, len(vorhanden)),
+                                     matrix, oeffnung, erweiterung)
+        a.luecken(alignment.luecken_a)
+        b.luecken(alignment.luecken_b)
+        profile[neu] = _Profil(a.mitglieder + b.mitglieder, a.spalten + b.spalten, a.laenge)
+    ergebnis, = profile.values()
+
+    spalten = dict(zip(ergebnis.mitglieder, ergebnis.spalten))
+    return [nachSpalten(b, spalten[i], ergebnis.laenge) for i, b in enumerate(basen)]
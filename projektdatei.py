@@ -0,0 +1,243 @@
+"""
+Lesen und Schreiben der Projektdateien
+
+Binäres Projektformat
+
+Alle Zahlen sind little-endian. Aufbau:
+
+    Kopf         MAGIC, Version (u16), frei (u16),
+                 Anzahl Markierungen, Anzahl versteckter Bereiche, Anzahl Sequenzen (je u32)
+    Markierung   Beschreibung, Farbe (je Text)
+    Versteckt    Anfang, Ende (je u64)
+    Sequenz      Name (Text), Länge (u64), Anzahl Abschnitte (u32),
+                 Abschnitte aus Anfang, Länge (je u64) und Nummer der Markierung (u32),
+                 danach die Basen als Bytes
+
+Ein Text ist seine Länge in Bytes (u32) gefolgt vom UTF-8.
+
+Die JSON-Dateien (Version 2) werden Sequenz für Sequenz geschrieben, ohne das
+ganze Dokument vorher im Speicher aufzubauen. Beide Formate werden zuerst in
+eine temporäre Datei geschrieben, die dann die alte Datei ersetzt.
+"""
+
+import json
+import mmap
+import os
+import secrets
+import stat
+import struct
+from contextlib import contextmanager
+
+from bioinformatik import Sequenz, Markierung, Basen
+from intervalle import Intervallmenge, Intervallkarte
+from sequenzenmodel import SequenzenModel
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+MAGIC = b'GSEQ'
+VERSION = 1
+ENDUNG = '.gseq'
+# Version 2: Basen als String, Markierungen und versteckte Spalten als Abschnitte
+JSONVERSION = 2
+
+_stueckgroesse = 1 << 16
+
+_kopf = struct.Struct('<4sHHIII')
+_laenge = struct.Struct('<I')
+_bereich = struct.Struct('<QQ')
+_sequenz = struct.Struct('<QI')
+_abschnitt = struct.Struct('<QQI')
+
+
+def istProjektdatei(dateiname: str) -> bool:
+    with open(dateiname, 'rb') as datei:
+        return datei.read(len(MAGIC)) == MAGIC
+
+
+@contextmanager
+def atomarSchreiben(dateiname: str, modus: str = 'w', **kwargs):
+    """
+    Öffnet eine temporäre Datei neben dateiname zum Schreiben.
+
+    Erst wenn alles geschrieben ist, ersetzt sie die Datei. Bei einem Fehler
+    bleibt die alte Datei unverändert und die temporäre wird gelöscht. Die
+    temporäre Datei wird wie jede neue Datei mit 0666 angelegt, die umask
+    wendet das Betriebssystem an. Gibt es die alte Datei schon, erhält die
+    neue ihre Rechte.
+    """
+
+    verzeichnis, name = os.path.split(os.path.abspath(dateiname))
+    tmpname = os.path.join(verzeichnis, f'.{name}.{secrets.token_hex(8)}.tmp')
+    fd = os.open(tmpname, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, modus, **kwargs) as datei:
+            yield datei
+            datei.flush()
+            os.fsync(datei.fileno())
+        if os.path.exists(dateiname):
+            os.chmod(tmpname, stat.S_IMODE(os.stat(dateiname).st_mode))
+        os.replace(tmpname, dateiname)
+    except BaseException:
+        os.remove(tmpname)
+        raise
+
+
+@logme(logger.debug)
+def speichereJson(dateiname: str, model: SequenzenModel):
+    with atomarSchreiben(dateiname, 'w', encoding='utf-8') as datei:
+        _schreibeJson(datei, model)
+
+
+def _schreibeJson(datei, model: SequenzenModel):
+    """
+    Schreibt das Model Sequenz für Sequenz als JSON.
+
+    Jede Markierung und jeder markierte Abschnitt steht in einer eigenen
+    Zeile, damit sich Dateien in einer Versionsverwaltung gut vergleichen
+    lassen. Die Basen werden stückweise geschrieben.
+    """
+
+    datei.write(f'{{"version": {JSONVERSION},\n"markierungen": [')
+    datei.write(','.join('\n  ' + json.dumps(markierung.to_json()) for markierung in model.markierungen))
+    datei.write('\n],\n"versteckt": ')
+    datei.write(json.dumps(model.versteckt.to_json()))
+    datei.write(',\n"sequenzen": [')
+    for nummer, sequenz in enumerate(model.sequenzen):
+        datei.write(',\n  ' if nummer else '\n  ')
+        datei.write(f'{{"Sequenz": {{"_name": {json.dumps(sequenz.name)},\n   "_basen": "')
+        chars = sequenz.basen.chars
+        for pos in range(0, len(chars), _stueckgroesse):
+            datei.write(json.dumps(chars[pos:pos+_stueckgroesse].decode('ascii'))[1:-1])
+        datei.write('",\n   "_markierungen": [')
+        datei.write(','.join(f'\n    [{bereich.start}, {len(bereich)}, {json.dumps(markierung.beschreibung)}]' for bereich, markierung in sequenz.markierteBereiche()))
+        datei.write(']}}')
+    datei.write('\n]}\n')
+
+
+@logme(logger.debug)
+def ladeJson(dateiname: str) -> tuple[list[Sequenz], list[Markierung], Intervallmenge]:
+    """
+    Liest eine JSON-Projektdatei in beiden Versionen.
+
+    Das Dokument wird ohne object_hook vom C-Parser des json-Moduls gelesen.
+    Die Markierungsnamen werden einmal in einer Tabelle aufgelöst und die
+    Sequenzen danach in einem Zug aus den Basen und Abschnitten erzeugt.
+    """
+
+    with open(dateiname, encoding='utf-8') as datei:
+        daten = json.load(datei)
+    version = daten.get('version', 1)
+    if version > JSONVERSION:
+        raise ValueError(f'{dateiname} hat die Version {version}, unterstützt wird bis Version {JSONVERSION}')
+
+    markierungen = [Markierung(**eintrag['Markierung']) for eintrag in daten['markierungen']]
+    tabelle = {markierung.beschreibung: markierung for markierung in markierungen}
+    versteckt = Intervallmenge.ausJson(daten['versteckt'])
+    sequenzen = []
+    for eintrag in daten['sequenzen']:
+        eintrag = eintrag['Sequenz']
+        basen = eintrag['_basen']
+        if isinstance(basen, str):
+            karte = Intervallkarte.ausAbschnitten((range(start, start+laenge), tabelle[beschreibung]) for start, laenge, beschreibung in eintrag.get('_markierungen', []))
+        else:
+            # Version 1: ein Dict je Base
+            karte = Intervallkarte.ausListe([tabelle[basedict['_mtxt']] if '_mtxt' in basedict else None for basedict in basen])
+            basen = ''.join([basedict.get('_char', '~') for basedict in basen])
+        sequenzen.append(Sequenz(eintrag['_name'], Basen(basen.encode('ascii', 'replace'), karte)))
+    return sequenzen, markierungen, versteckt
+
+
+@logme(logger.debug)
+def speichereBinaer(dateiname: str, model: SequenzenModel):
+    with atomarSchreiben(dateiname, 'wb') as datei:
+        _schreibeBinaer(datei, model)
+
+
+def _schreibeBinaer(datei, model: SequenzenModel):
+    markierungsnummern = {markierung: nummer for nummer, markierung in enumerate(model.markierungen)}
+    versteckt = model.versteckt.bereiche
+    datei.write(_kopf.pack(MAGIC, VERSION, 0, len(model.markierungen), len(versteckt), len(model.sequenzen)))
+    for markierung in model.markierungen:
+        _schreibeText(datei, markierung.beschreibung)
+        _schreibeText(datei, markierung.farbe)
+    for bereich in versteckt:
+        datei.write(_bereich.pack(bereich.start, bereich.stop))
+    for sequenz in model.sequenzen:
+        abschnitte = [(bereich, markierung) for bereich, markierung in sequenz.markierteBereiche() if markierung in markierungsnummern]
+        _schreibeText(datei, sequenz.name)
+        datei.write(_sequenz.pack(sequenz.laenge, len(abschnitte)))
+        datei.write(b''.join(_abschnitt.pack(bereich.start, len(bereich), markierungsnummern[markierung]) for bereich, markierung in abschnitte))
+        datei.write(sequenz.basen.chars)
+
+
+@logme(logger.debug)
+def ladeBinaer(dateiname: str) -> tuple[list[Sequenz], list[Markierung], Intervallmenge]:
+    """
+    Liest eine Binärdatei über mmap.
+
+    Die Basen werden über eine memoryview direkt aus der eingeblendeten Datei
+    in die bytearrays der Sequenzen kopiert, das ist die einzige Kopie. Vor
+    jedem Lesen wird geprüft, ob die Datei lang genug ist, und markierte
+    Abschnitte müssen in ihrer Sequenz liegen. Sonst gilt die Datei als
+    beschädigt.
+    """
+
+    if os.path.getsize(dateiname) < _kopf.size:
+        raise ValueError(f'{dateiname} ist beschädigt')
+    with open(dateiname, 'rb') as datei, mmap.mmap(datei.fileno(), 0, access=mmap.ACCESS_READ) as daten, memoryview(daten) as ansicht:
+        magic, version, _, anzahlmarkierungen, anzahlversteckt, anzahlsequenzen = _kopf.unpack_from(daten, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{dateiname} ist keine Projektdatei')
+        if version > VERSION:
+            raise ValueError(f'{dateiname} hat die Version {version}, unterstützt wird bis Version {VERSION}')
+        pos = _kopf.size
+
+        markierungen = []
+        for _ in range(anzahlmarkierungen):
+            beschreibung, pos = _leseText(dateiname, daten, pos)
+            farbe, pos = _leseText(dateiname, daten, pos)
+            markierungen.append(Markierung(beschreibung, farbe))
+
+        _pruefeLaenge(dateiname, daten, pos + anzahlversteckt*_bereich.size)
+        versteckt = Intervallmenge()
+        for anfang, ende in _bereich.iter_unpack(daten[pos:pos+anzahlversteckt*_bereich.size]):
+            versteckt.hinzufuegen(range(anfang, ende))
+        pos += anzahlversteckt*_bereich.size
+
+        sequenzen = []
+        for _ in range(anzahlsequenzen):
+            name, pos = _leseText(dateiname, daten, pos)
+            _pruefeLaenge(dateiname, daten, pos + _sequenz.size)
+            laenge, anzahlabschnitte = _sequenz.unpack_from(daten, pos)
+            pos += _sequenz.size
+            _pruefeLaenge(dateiname, daten, pos + anzahlabschnitte*_abschnitt.size + laenge)
+            abschnitte = list(_abschnitt.iter_unpack(daten[pos:pos+anzahlabschnitte*_abschnitt.size]))
+            if any(anfang+anzahl > laenge or nummer >= len(markierungen) for anfang, anzahl, nummer in abschnitte):
+                raise ValueError(f'{dateiname} ist beschädigt')
+            karte = Intervallkarte.ausAbschnitten((range(anfang, anfang+anzahl), markierungen[nummer]) for anfang, anzahl, nummer in abschnitte)
+            pos += anzahlabschnitte*_abschnitt.size
+            sequenzen.append(Sequenz.ausBytearray(name, bytearray(ansicht[pos:pos+laenge]), karte))
+            pos += laenge
+
+    return sequenzen, markierungen, versteckt
+
+
+def _schreibeText(datei, text: str):
+    daten = text.encode('utf-8')
+    datei.write(_laenge.pack(len(daten)))
+    datei.write(daten)
+
+
+def _pruefeLaenge(dateiname: str, daten, ende: int):
+    if ende > len(daten):
+        raise ValueError(f'{dateiname} ist beschädigt')
+
+
+def _leseText(dateiname: str, daten, pos: int) -> tuple[str, int]:
+    _pruefeLaenge(dateiname, daten, pos + _laenge.size)
+    (laenge,) = _laenge.unpack_from(daten, pos)
+    pos += _laenge.size
+    _pruefeLaenge(dateiname, daten, pos + laenge)
+    return bytes(daten[pos:pos+laenge]).decode('utf-8'), pos+laenge
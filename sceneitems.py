@@ -1,9 +1,17 @@
 
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor, QFont, QFontMetrics, QPen
-from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsRectItem, QGraphicsTextItem, QGraphicsSimpleTextItem, QGraphicsItem
+import html
+import math
+import re
+from bisect import bisect_left
+
+from PySide6.QtCore import Qt, QPointF, QRectF
+from PySide6.QtGui import QColor, QFont, QFontInfo, QFontMetrics, QGlyphRun, QPen, QPainter, QPaintEngine, QPixmap, QRawFont
+from PySide6.QtSvg import QSvgGenerator
+from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsRectItem, QGraphicsTextItem, QGraphicsSimpleTextItem, QGraphicsItem, QStyleOptionGraphicsItem
 
 from bioinformatik import Base, Sequenz, Markierung
+from konsens import Konsens
+from intervalle import Intervallmenge
 from sequenzenmodel import SequenzenModel, SequenzenViewModel
 
 import logging
@@ -22,9 +30,13 @@ seqfm = QFontMetrics(seqfont)
 basenlaenge = 20
 brushversteckt = QColor('lightgray')
 brushhighlight = QColor('lightblue')
+brushfundstelle = QColor('yellow')
 penhighlight = QColor('red')
 sequenznamewidth = 200
-umbruchgap = 2.5
+umbruchgap = 3.5
+linealzeile = -3
+konsenszeile = -1
+konsensstufen = ((0.8, '#6464ff'), (0.6, '#9999ff'), (0.4, '#ccccff'))
 rahmendicke = 20
 
 
@@ -37,6 +49,87 @@ def xyFromColSeqidx(col, seqidx, spaltenzahl, lenseq, umbruch):
         y = basenlaenge * seqidx
     return x, y
 
+def colSeqidxFromXY(x, y, spaltenzahl, lenseq, umbruch):
+    """
+    Umkehrung von xyFromColSeqidx.
+
+    Gibt Spalte und Sequenzindex zurück, in deren Feld der Punkt liegt. Der
+    Sequenzindex ist -3 oder -2 im Bereich des Lineals, -1 beim Konsens. Liegt der Punkt links
+    von den Basen oder rechts neben einer umbrochenen Zeile, ist die Spalte None.
+    """
+
+    zeile = y / basenlaenge
+    spalte = math.floor((x - sequenznamewidth - rahmendicke) / basenlaenge)
+    if umbruch:
+        block = math.floor((zeile - linealzeile) / (lenseq + umbruchgap))
+        seqidx = math.floor(zeile - block * (lenseq + umbruchgap))
+        if spalte >= spaltenzahl:
+            spalte = None
+        elif spalte >= 0:
+            spalte += block * spaltenzahl
+    else:
+        seqidx = math.floor(zeile)
+    if spalte is not None and spalte < 0:
+        spalte = None
+    return spalte, seqidx
+
+def zeichenrect(painter: QPainter, option: QStyleOptionGraphicsItem) -> QRectF:
+    """
+    Der Teil des Items, der neu gezeichnet werden muss.
+
+    QGraphicsScene.render setzt exposedRect auf das ganze Item und begrenzt
+    nur über den Clip des Painters. Beim kachelweisen Export zählt deshalb
+    auch der Clip.
+    """
+
+    rect = option.exposedRect
+    if painter.hasClipping():
+        rect = rect.intersected(painter.clipBoundingRect())
+    return rect
+
+def sichtbareSpalten(rect: QRectF, seqidx, hoehe, colanzahl, spaltenzahl, lenseq, umbruch):
+    """
+    Liefert die Bereiche range(von, bis) der Spalten einer Zeile, die das
+    Rechteck rect schneiden.
+
+    seqidx ist die Zeile wie in xyFromColSeqidx, hoehe die Höhe der Felder
+    in Basenlängen. Nur diese Spalten müssen gezeichnet werden.
+    """
+
+    x0 = sequenznamewidth + rahmendicke
+    links = max(math.floor((rect.left() - x0) / basenlaenge), 0)
+    rechts = math.floor((rect.right() - x0) / basenlaenge) + 1
+    if not umbruch:
+        oben = basenlaenge * seqidx
+        if rect.bottom() < oben or rect.top() > oben + hoehe * basenlaenge:
+            return
+        yield range(links, min(rechts, colanzahl))
+        return
+
+    rechts = min(rechts, spaltenzahl)
+    if links >= rechts:
+        return
+    blockhoehe = basenlaenge * (lenseq + umbruchgap)
+    oben = basenlaenge * seqidx
+    erster = max(math.ceil((rect.top() - oben - hoehe * basenlaenge) / blockhoehe), 0)
+    letzter = min(math.floor((rect.bottom() - oben) / blockhoehe), math.ceil(colanzahl / spaltenzahl) - 1)
+    for block in range(erster, letzter + 1):
+        yield range(block*spaltenzahl + links, min(block*spaltenzahl + rechts, colanzahl))
+
+def zeichenbereich(seqidx, hoehe, colanzahl, spaltenzahl, lenseq, umbruch) -> QRectF:
+    "Rechteck, das alle Felder einer Zeile mit colanzahl Spalten umfasst."
+
+    x0 = sequenznamewidth + rahmendicke
+    if umbruch:
+        _, yletzter = xyFromColSeqidx(max(colanzahl-1, 0), seqidx, spaltenzahl, lenseq, umbruch)
+        breite = min(colanzahl, spaltenzahl)
+        return QRectF(x0, basenlaenge*seqidx, breite*basenlaenge, yletzter - basenlaenge*seqidx + hoehe*basenlaenge)
+    return QRectF(x0, basenlaenge*seqidx, colanzahl*basenlaenge, hoehe*basenlaenge)
+
+def ersteSpalte(bereiche: list[range]) -> int:
+    "Die kleinste Spalte in den Bereichen, ab der neu angeordnet werden muss"
+    return min((bereich.start for bereich in bereiche), default=0)
+
 def deleteItemArray(itemarray: list[QGraphicsItem]):
     while itemarray:
         item = itemarray.pop()
@@ -44,30 +137,125 @@ def deleteItemArray(itemarray: list[QGraphicsItem]):
         scene.removeItem(item)
 
 
+class Spaltenlayout:
+    """
+    Zuordnung der Spalten im Model zu den angezeigten Spalten
+
+    Versteckte Spalten werden nur mit zeigeversteckt angezeigt, sonst steht an
+    ihrer Stelle eine rote Linie. Die Zuordnung gilt gemeinsam für alle
+    Sequenzen und das Lineal. Nach Änderungen wird sie nur ab der ersten
+    betroffenen Spalte neu berechnet.
+    """
+
+    def __init__(self, model: SequenzenModel, viewmodel: SequenzenViewModel):
+        self._model = model
+        self._viewmodel = viewmodel
+        self._laenge = 0
+        self._spalten: list[int] = []
+        self._rotelinien: list[tuple[int, int]] = []
+        self.model.sequenzenRenewed.connect(self.neuBerechnen)
+        self.model.verstecktAdded.connect(self.verstecktGeaendert)
+        self.model.verstecktRemoved.connect(self.verstecktGeaendert)
+        self.viewmodel.zeigeverstecktChanged.connect(self.neuBerechnen)
+
+    @property
+    def model(self):
+        return self._model
+
+    @property
+    def viewmodel(self):
+        return self._viewmodel
+
+    @property
+    def spalten(self) -> list[int]:
+        "Spaltenindex im Model für jede angezeigte Spalte"
+        return self._spalten
+
+    @property
+    def rotelinien(self) -> list[tuple[int, int]]:
+        "Für jeden Block versteckter Spalten: erster Spaltenindex im Model und angezeigte Spalte der roten Linie"
+        return self._rotelinien
+
+    def istVersteckt(self, idx: int) -> bool:
+        return self.model.istVersteckt(idx)
+
+    def anzahlSpalten(self, laenge: int) -> int:
+        "Anzahl der angezeigten Spalten für eine Sequenz der Länge laenge"
+        return bisect_left(self._spalten, laenge)
+
+    def anzahlRotelinien(self, laenge: int) -> int:
+        "Anzahl der roten Linien für eine Sequenz der Länge laenge"
+        return bisect_left(self._rotelinien, (laenge,))
+
+    def anpassen(self):
+        "Ergänzt oder kürzt die Zuordnung, wenn sich die Länge der längsten Sequenz geändert hat."
+
+        maxlen = self.model.maxlen
+        if maxlen != self._laenge:
+            self.berechne(min(maxlen, self._laenge))
+
+    def neuBerechnen(self, *args):
+        self.berechne(0)
+
+    def verstecktGeaendert(self, bereiche: list[range]):
+        self.berechne(ersteSpalte(bereiche))
+
+    @logme(logger.debug)
+    def berechne(self, ab: int):
+        del self._spalten[bisect_left(self._spalten, ab):]
+        del self._rotelinien[bisect_left(self._rotelinien, (ab,)):]
+        self._laenge = self.model.maxlen
+        if self.viewmodel.zeigeversteckt:
+            self._spalten.extend(range(ab, self._laenge))
+            return
+
+        # Ein Block, der vor ab beginnt, hat seine rote Linie schon.
+        pos = ab
+        for bereich in self.model.versteckt.bereicheAb(ab):
+            if bereich.start >= self._laenge:
+                break
+            if bereich.start >= ab:
+                self._spalten.extend(range(pos, bereich.start))
+                self._rotelinien.append((bereich.start, len(self._spalten)))
+            pos = bereich.stop
+        self._spalten.extend(range(pos, self._laenge))
+
+
 class SequenzItem(QGraphicsRectItem):
+    """
+    Zeichnet die Basen einer Sequenz
+
+    Für die Basen gibt es keine eigenen Items, sie werden vom SequenzRowItem
+    in einem Zug gezeichnet. Die Zuordnung von Mausposition zu Base geschieht
+    rechnerisch in der Scene.
+    """
 
-    def __init__(self, parent, sequenz: Sequenz, model: SequenzenModel, viewmodel: SequenzenViewModel, linealitem: 'LinealItem'):
+    def __init__(self, parent, sequenz: Sequenz, model: SequenzenModel, viewmodel: SequenzenViewModel, linealitem: 'LinealItem', spaltenlayout: Spaltenlayout):
         super().__init__(parent)
         self._sequenz = sequenz
         self._model = model
         self._viewmodel = viewmodel
         self._linealitem = linealitem
-        self._baseitems: list[BaseItem] = []
+        self._spaltenlayout = spaltenlayout
+        self._seqidx = self.model.sequenzen.index(sequenz)
+        self._colanzahl = 0
+        self._hover: int = None
+        self._fundstellen = Intervallmenge()
         self._nameitems: list[SequenznameItem] = []
         self._rotelinien: list[RotelinieItem] = []
+        self._rowitem = SequenzRowItem(self)
+        self.setPen(Qt.NoPen)
 
         self.viewmodel.spaltenzahlChanged.connect(self.umbrechen)
         self.viewmodel.umbruchChanged.connect(self.umbrechen)
         self.viewmodel.zeigeverstecktChanged.connect(self.umbrechen)
         self.model.verstecktAdded.connect(self.versteckeBasen)
         self.model.verstecktRemoved.connect(self.enttarneBasen)
+        self.sequenz.nameChanged.connect(self.umbenennen)
         self.sequenz.basenRenewed.connect(self.renewBasen)
         self.sequenz.basenInserted.connect(self.insertBasenItems)
         self.sequenz.basenRemoved.connect(self.removeBasenItems)
-
-        self.erzeugeNamen()
-        self.erzeugeBasen()
-        self.updateVersteckt(0)
+        self.sequenz.basenChanged.connect(self.aktualisiereBasenItems)
 
     @property
     def model(self):
@@ -82,16 +270,32 @@ class SequenzItem(QGraphicsRectItem):
         return self._sequenz
 
     @property
-    def seqidx(self) -> Sequenz:
-        return self.model.sequenzen.index(self.sequenz)
+    def seqidx(self) -> int:
+        "Wird bei setBoxPos aus dem Model übernommen."
+        return self._seqidx
 
     @property
     def linealitem(self):
         return self._linealitem
-    
+
     @property
-    def baseitems(self):
-        return self._baseitems
+    def spaltenlayout(self) -> Spaltenlayout:
+        return self._spaltenlayout
+
+    @property
+    def colanzahl(self) -> int:
+        "Anzahl der angezeigten Spalten"
+        return self._colanzahl
+
+    @property
+    def hover(self) -> int:
+        "Angezeigte Spalte unter der Maus"
+        return self._hover
+
+    @property
+    def fundstellen(self) -> Intervallmenge:
+        "Indizes der Basen, die zu einer Fundstelle der Suche gehören"
+        return self._fundstellen
 
     @property
     def nameitems(self):
@@ -100,112 +304,317 @@ class SequenzItem(QGraphicsRectItem):
     @property
     def rotelinien(self):
         return self._rotelinien
-    
+
+    @property
+    def rowitem(self) -> 'SequenzRowItem':
+        return self._rowitem
+
+    def indexAusSpalte(self, spalte: int) -> int:
+        if spalte is None or spalte >= self.colanzahl:
+            return None
+        return self.spaltenlayout.spalten[spalte]
+
+    def setHover(self, spalte: int):
+        if spalte == self._hover:
+            return
+        self._hover = spalte
+        self.rowitem.update()
+
+    def setzeFundstellen(self, fundstellen: Intervallmenge):
+        if fundstellen == self._fundstellen:
+            return
+        self._fundstellen = fundstellen
+        self.rowitem.update()
+
     @logme(logger.debug)
-    def versteckeBasen(self, idxlist: list[int]):
-        for index in idxlist:
-            try:
-                self.baseitems[index].versteckt = True
-            except IndexError:
-                pass
-        self.setBoxPos()
+    def versteckeBasen(self, bereiche: list[range]):
+        self.aktualisiereAb(ersteSpalte(bereiche))
 
     @logme(logger.debug)
-    def enttarneBasen(self, idxlist: list[int]):
-        for index in idxlist:
-            try:
-                self.baseitems[index].versteckt = False
-            except IndexError:
-                pass
-        self.setBoxPos()
+    def enttarneBasen(self, bereiche: list[range]):
+        self.aktualisiereAb(ersteSpalte(bereiche))
+
+    def umbenennen(self):
+        for nameitem in self.nameitems:
+            nameitem.setName()
 
     @logme(logger.debug)
     def umbrechen(self, *arg):
-        self.erzeugeNamen()
         self.setBoxPos()
 
     @logme(logger.debug)
-    def erzeugeNamen(self):
-        deleteItemArray(self.nameitems)
+    def setBoxPos(self):
+        "Ordnet die Sequenz vollständig neu an."
+
+        self._seqidx = self.model.sequenzen.index(self.sequenz)
+        spaltenzahl = self.viewmodel.spaltenzahl
+        lenseq = len(self.model.sequenzen)
+        for zeile, nameitem in enumerate(self.nameitems):
+            x, y = xyFromColSeqidx(zeile*spaltenzahl, self.seqidx, spaltenzahl, lenseq, self.viewmodel.umbruch)
+            nameitem.setzePosition(0, y)
+        deleteItemArray(self.rotelinien)
+        self.aktualisiereAb(0)
+
+    @logme(logger.debug)
+    def aktualisiereAb(self, pos: int):
+        """
+        Passt die Anordnung ab dem Basenindex pos an.
+
+        Namen und rote Linien vor pos bleiben stehen, fehlende werden
+        angehängt und überzählige am Ende entfernt. Neu gezeichnet wird nur
+        der Bereich ab pos.
+        """
+
+        self.spaltenlayout.anpassen()
+        spaltenzahl = self.viewmodel.spaltenzahl
+        lenseq = len(self.model.sequenzen)
+        umbruch = self.viewmodel.umbruch
+        laenge = self.sequenz.laenge
+        self._colanzahl = self.spaltenlayout.anzahlSpalten(laenge)
 
-        colanzahl = len(self.sequenz.basen) - len(self.model.versteckt)
         anzahl = 1
-        if self.viewmodel.umbruch:
-            anzahl = int(colanzahl / self.viewmodel.spaltenzahl) + 1
-        for idx in range(anzahl):
-            x, y = xyFromColSeqidx(idx*self.viewmodel.spaltenzahl, self.seqidx, self.viewmodel.spaltenzahl, len(self.model.sequenzen), self.viewmodel.umbruch)
+        if umbruch:
+            anzahl = int(self.colanzahl / spaltenzahl) + 1
+        while len(self.nameitems) > anzahl:
+            self.scene().removeItem(self.nameitems.pop())
+        for zeile in range(len(self.nameitems), anzahl):
+            x, y = xyFromColSeqidx(zeile*spaltenzahl, self.seqidx, spaltenzahl, lenseq, umbruch)
             self.nameitems.append(SequenznameItem(self, 0, y, self.sequenz))
 
-    @logme(logger.debug)
-    def erzeugeBasen(self):
-        deleteItemArray(self.baseitems)
+        behalten = min(len(self.rotelinien), self.spaltenlayout.anzahlRotelinien(pos))
+        while len(self.rotelinien) > behalten:
+            self.scene().removeItem(self.rotelinien.pop())
+        for _, spalte in self.spaltenlayout.rotelinien[behalten:self.spaltenlayout.anzahlRotelinien(laenge)]:
+            x, y = xyFromColSeqidx(spalte, self.seqidx, spaltenzahl, lenseq, umbruch)
+            self.rotelinien.append(RotelinieItem(self, x, y, basenlaenge))
+
+        self._hover = None
+        rect = zeichenbereich(self.seqidx, 1, self.colanzahl, spaltenzahl, lenseq, umbruch)
+        if rect != self.rowitem.boundingRect():
+            self.rowitem.setRect(rect)
+        else:
+            self.rowitem.update(self.bereich(pos))
+        self.scene().painted.emit()
 
-        for base in self.sequenz.basen:
-            self.baseitems.append(BaseItem(self, base))
+    def bereich(self, pos: int, anzahl: int = None) -> QRectF:
+        "Der Teil des Zeichenbereichs, in dem die Basen von pos bis pos+anzahl liegen, ohne anzahl bis zum Ende."
 
-    @logme(logger.debug)
-    def setBoxPos(self):
-        self.erzeugeNamen()
-        deleteItemArray(self.rotelinien)
-
-        roteLinieSchonDa = False
-        col = 0
-        for idx, baseitem in enumerate(self.baseitems):
-            # Weil einige Basen versteckt sein können, ist die Spalte col
-            # nicht mit dem Basenindex basidx identisch.
-
-            x, y = xyFromColSeqidx(col, self.seqidx, self.viewmodel.spaltenzahl, len(self.model.sequenzen), self.viewmodel.umbruch)
-            baseitem.setPos(x, y)
-
-            # Hier wird entschieden, ob das Item versteckt werden soll.
-            aktuellversteckt = idx in self.model.versteckt
-            if aktuellversteckt and not self.viewmodel.zeigeversteckt:
-                if not roteLinieSchonDa:
-                    self.rotelinien.append(RotelinieItem(self, x, y, basenlaenge))
-                    roteLinieSchonDa = True
-                baseitem.setVisible(False)
-                continue
+        spaltenzahl = self.viewmodel.spaltenzahl
+        lenseq = len(self.model.sequenzen)
+        umbruch = self.viewmodel.umbruch
+        rect = QRectF(self.rowitem.boundingRect())
+        x, y = xyFromColSeqidx(self.spaltenlayout.anzahlSpalten(pos), self.seqidx, spaltenzahl, lenseq, umbruch)
+        if umbruch:
+            rect.setTop(y)
+        else:
+            rect.setLeft(x)
+        if anzahl is not None:
+            letzte = max(self.spaltenlayout.anzahlSpalten(pos+anzahl)-1, 0)
+            x, y = xyFromColSeqidx(letzte, self.seqidx, spaltenzahl, lenseq, umbruch)
+            if umbruch:
+                rect.setBottom(y+basenlaenge)
             else:
-                baseitem.setVisible(True)
-            roteLinieSchonDa = False
-            col += 1
-        logger.info(len(self.childItems()))
-        self.scene().painted.emit()
-
-    @logme(logger.debug)
-    def updateVersteckt(self, pos: int):
-        for idx, baseitem in enumerate(self.baseitems[pos:], pos):
-            baseitem.versteckt = idx in self.model.versteckt
+                rect.setRight(x+basenlaenge)
+        return rect
 
     @logme(logger.debug)
-    def insertBasenItems(self, pos: int, basen: list[Base]):
-        self.baseitems[pos:pos] = [BaseItem(self, base) for base in basen]
-        self.setBoxPos()
-        self.updateVersteckt(pos)
+    def insertBasenItems(self, pos: int, anzahl: int):
+        self.aktualisiereAb(pos)
         self.linealitem.updateTicks()
 
     @logme(logger.debug)
-    def removeBasenItems(self, pos: int, basen: list[Base]):
-        anzahl = len(basen)
-        for baseitem in self.baseitems[pos:pos+anzahl]:
-            baseitem.setParentItem(None)
-        self.baseitems[pos:pos+anzahl] = []
-        self.setBoxPos()
-        self.updateVersteckt(pos)
+    def removeBasenItems(self, pos: int, anzahl: int):
+        self.aktualisiereAb(pos)
         self.linealitem.updateTicks()
 
+    def aktualisiereBasenItems(self, pos: int, anzahl: int):
+        self.rowitem.update(self.bereich(pos, anzahl))
+
     @logme(logger.debug)
     def renewBasen(self):
-        deleteItemArray(self.baseitems)
-        self.erzeugeBasen()
-        self.setBoxPos()
-        self.updateVersteckt(0)
+        self.aktualisiereAb(0)
         self.linealitem.updateTicks()
 
     def __repr__(self):
         return f'SequenzItem({self.sequenz.name})'
 
 
+class Glyphenatlas:
+    """
+    Zwischenspeicher für vorgerenderte Basenfelder
+
+    Für jede Kombination aus Buchstabe, Schriftfarbe und Hintergrundfarbe wird
+    ein Feld einmal in ein QPixmap gezeichnet und danach nur noch kopiert.
+    """
+
+    def __init__(self):
+        self._pixmaps: dict[tuple[str, str, str, float], QPixmap] = {}
+
+    def pixmap(self, char: str, farbe: str, hintergrund: str, dpr: float = 1.0) -> QPixmap:
+        key = (char, farbe, hintergrund, dpr)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            pixmap = self._pixmaps[key] = self.erzeugePixmap(*key)
+        return pixmap
+
+    @staticmethod
+    def erzeugePixmap(char: str, farbe: str, hintergrund: str, dpr: float) -> QPixmap:
+        pixmap = QPixmap(math.ceil(basenlaenge*dpr), math.ceil(basenlaenge*dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(QColor(hintergrund) if hintergrund else Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setFont(basefont)
+        painter.setPen(QColor(farbe))
+        gcharw = basefm.horizontalAdvance(char)
+        painter.drawText(QPointF(basenlaenge/2-gcharw/2, basenlaenge/2-basefm.height()/2+basefm.ascent()), char)
+        painter.end()
+        return pixmap
+
+
+glyphenatlas = Glyphenatlas()
+
+
+def istVektorausgabe(painter: QPainter) -> bool:
+    "Zeichnet painter in eine SVG- oder PDF-Datei?"
+
+    return painter.paintEngine().type() in (QPaintEngine.SVG, QPaintEngine.Pdf)
+
+
+class SvgGenerator(QSvgGenerator):
+    """
+    QSvgGenerator, der die Basen einer Zeile selbst als SVG schreibt
+
+    QSvgGenerator gibt den Zeichenabstand eines Fonts nicht aus, ein Text
+    liefe deshalb im Betrachter aus den Feldern heraus. zeichneLaeufe legt die
+    fertigen Elemente hier ab und zeichnet nur einen Platzhalter, der in der
+    richtigen Gruppe und Reihenfolge steht. ersetzePlatzhalter setzt die
+    Elemente danach in das SVG ein.
+    """
+
+    _platzhalter = re.compile('<text[^<]*>\ue000(\\d+)\ue001</text>')
+
+    def __init__(self):
+        super().__init__()
+        self._elemente: list[str] = []
+
+    def platzhalter(self, element: str) -> str:
+        self._elemente.append(element)
+        return f'\ue000{len(self._elemente)-1}\ue001'
+
+    def ersetzePlatzhalter(self, svg: str) -> str:
+        return self._platzhalter.sub(lambda treffer: self._elemente[int(treffer.group(1))], svg)
+
+
+def _laeufe(werte: list) -> list[tuple[int, int, object]]:
+    "Die Abschnitte (anfang, ende, wert) gleicher Werte"
+
+    laeufe = []
+    anfang = 0
+    for ende in range(1, len(werte)+1):
+        if ende == len(werte) or werte[ende] != werte[anfang]:
+            laeufe.append((anfang, ende, werte[anfang]))
+            anfang = ende
+    return laeufe
+
+
+def zeichneLaeufe(painter: QPainter, x: float, y: float, felder: list[tuple[str, str, str]], hoehe: float = basenlaenge, versatz: float = 0):
+    """
+    Zeichnet nebeneinanderliegende Felder (Buchstabe, Schriftfarbe, Hintergrund)
+    für die Vektorausgabe.
+
+    Gleiche Hintergründe werden zu einem Rechteck zusammengefasst, alle
+    Buchstaben einer Farbe zu einem Text (im PDF ein Glyphenlauf) mit einer
+    Position je Buchstabe. Jeder Buchstabe steht wie im glyphenatlas mittig in
+    seinem Feld. Der Hintergrund ist hoehe hoch, die
+    Buchstaben stehen um versatz tiefer.
+    """
+
+    for anfang, ende, hintergrund in _laeufe([feld[2] for feld in felder]):
+        if hintergrund:
+            painter.fillRect(QRectF(x + anfang*basenlaenge, y, (ende-anfang)*basenlaenge, hoehe), QColor(hintergrund))
+    grundlinie = y + versatz + basenlaenge/2 - basefm.height()/2 + basefm.ascent()
+    painter.save()
+    device = painter.device()
+    if isinstance(device, SvgGenerator):
+        for farbe in dict.fromkeys(feld[1] for feld in felder):
+            spalten = [i for i, feld in enumerate(felder) if feld[1] == farbe]
+            xliste = ' '.join(f'{x + (i+0.5)*basenlaenge:g}' for i in spalten)
+            text = html.escape(''.join(felder[i][0] for i in spalten))
+            painter.drawText(QPointF(x, grundlinie), device.platzhalter(
+                f'<text x="{xliste}" y="{grundlinie:g}" fill="{QColor(farbe).name()}" text-anchor="middle" xml:space="preserve" '
+                f'font-family="{QFontInfo(basefont).family()}, monospace" font-size="{QFontInfo(basefont).pixelSize()}px" font-weight="bold">{text}</text>'))
+    else:
+        # Ein Glyphenlauf je Farbe mit der Position jedes Buchstabens
+        rawfont = QRawFont.fromFont(basefont)
+        for farbe in dict.fromkeys(feld[1] for feld in felder):
+            spalten = [i for i, feld in enumerate(felder) if feld[1] == farbe]
+            glyphen = rawfont.glyphIndexesForString(''.join(felder[i][0] for i in spalten))
+            breiten = rawfont.advancesForGlyphIndexes(glyphen)
+            lauf = QGlyphRun()
+            lauf.setRawFont(rawfont)
+            lauf.setGlyphIndexes(glyphen)
+            lauf.setPositions([QPointF((i+0.5)*basenlaenge - breite.x()/2, 0) for i, breite in zip(spalten, breiten)])
+            painter.setPen(QColor(farbe))
+            painter.drawGlyphRun(QPointF(x, grundlinie), lauf)
+    painter.restore()
+
+
+class SequenzRowItem(QGraphicsItem):
+    """
+    Zeichnet alle Basen einer Sequenz in einem paint()-Aufruf
+
+    Gezeichnet werden nur die Spalten im sichtbaren Bereich. Jedes Feld wird
+    als fertiges Pixmap aus dem glyphenatlas kopiert, bei der Vektorausgabe
+    werden gleich gefärbte Felder als ein Text gezeichnet.
+    """
+
+    def __init__(self, parent: SequenzItem):
+        super().__init__(parent)
+        self._rect = QRectF()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def setRect(self, rect: QRectF):
+        self.prepareGeometryChange()
+        self._rect = rect
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget=None):
+        sequenzitem: SequenzItem = self.parentItem()
+        sequenz = sequenzitem.sequenz
+        spaltenlayout = sequenzitem.spaltenlayout
+        spalten = spaltenlayout.spalten
+        viewmodel = sequenzitem.viewmodel
+        seqidx = sequenzitem.seqidx
+        lenseq = len(sequenzitem.model.sequenzen)
+        dpr = painter.device().devicePixelRatioF()
+        vektor = istVektorausgabe(painter)
+        for bereich in sichtbareSpalten(zeichenrect(painter, option), seqidx, 1, sequenzitem.colanzahl, viewmodel.spaltenzahl, lenseq, viewmodel.umbruch):
+            felder = []
+            for spalte in bereich:
+                idx = spalten[spalte]
+                char = sequenz.char(idx)
+                markierung = sequenz.markierung(idx)
+                if spalte == sequenzitem.hover:
+                    hintergrund = brushhighlight.name()
+                elif spaltenlayout.istVersteckt(idx):
+                    hintergrund = brushversteckt.name()
+                elif idx in sequenzitem.fundstellen:
+                    hintergrund = brushfundstelle.name()
+                else:
+                    hintergrund = markierung.farbe if markierung else ''
+                if vektor:
+                    felder.append((char, Base.colorMap(char), hintergrund))
+                    continue
+                x, y = xyFromColSeqidx(spalte, seqidx, viewmodel.spaltenzahl, lenseq, viewmodel.umbruch)
+                painter.drawPixmap(QPointF(x, y), glyphenatlas.pixmap(char, Base.colorMap(char), hintergrund, dpr))
+            if felder:
+                x, y = xyFromColSeqidx(bereich.start, seqidx, viewmodel.spaltenzahl, lenseq, viewmodel.umbruch)
+                zeichneLaeufe(painter, x, y, felder)
+
+
 class SequenznameItem(QGraphicsRectItem):
 
     def __init__(self, parent, x: int, y: int, sequenz: Sequenz):
@@ -218,7 +627,6 @@ class SequenznameItem(QGraphicsRectItem):
         self.gtxt = QGraphicsSimpleTextItem(self)
         self.gtxt.setFont(seqfont)
         self.setName()
-        self.sequenz.nameChanged.connect(self.setName)
         self.setAcceptHoverEvents(True)
 
     @property
@@ -233,6 +641,14 @@ class SequenznameItem(QGraphicsRectItem):
     def y(self):
         return self._y
 
+    def setzePosition(self, x: int, y: int):
+        if (x, y) == (self._x, self._y):
+            return
+        self.gtxt.moveBy(x-self._x, y-self._y)
+        self._x = x
+        self._y = y
+        self.setRect(x, y, sequenznamewidth, basenlaenge)
+
     def setName(self):
         text = self.kurzName()
         self.gtxt.setText(text)
@@ -262,67 +678,25 @@ class SequenznameItem(QGraphicsRectItem):
         return f'SequenzNameItem[{self.sequenz.name}]'
 
 
-class BaseItem(QGraphicsRectItem):
-
-    def __init__(self, parent, base: Base):
-        super().__init__(0, 0, basenlaenge, basenlaenge, parent)
-        self._base = base
-        self._versteckt = False
-        self.brush = Qt.NoBrush
-        self.setBoxfarbe()
-        self.setPen(Qt.NoPen)
-        gchar = QGraphicsSimpleTextItem(base.char, self)
-        gchar.setFont(basefont)
-        gcharw = basefm.horizontalAdvance(base.char)
-        gcharh = basefm.height()
-        gchar.setPos(basenlaenge/2-gcharw/2, basenlaenge/2-gcharh/2)
-        gchar.setBrush(QColor(base.getCharFarbe()))
-        self.setAcceptHoverEvents(True)
-        base.changed.connect(self.setBoxfarbe)
-
-    @property
-    def base(self):
-        return self._base
-    
-    @property
-    def versteckt(self):
-        return self._versteckt
-    
-    @versteckt.setter
-    def versteckt(self, value):
-        self._versteckt = value
-        self.setBoxfarbe()
-
-    def setBoxfarbe(self):
-        boxfarbe = self._base.getBoxFarbe()
-        if boxfarbe:
-            self.brush = QColor(boxfarbe)
-        else:
-            self.brush = Qt.NoBrush
-        if self.versteckt:
-            self.brush = brushversteckt
-        self.setBrush(self.brush)
-        
-    def hoverEnterEvent(self, event):
-        self.setBrush(brushhighlight)
-
-    def hoverLeaveEvent(self, event):
-        self.setBrush(self.brush)
-
-    def mousePressEvent(self, *args):
-        self.scene().baseClicked.emit(self.base)
-
-    def __repr__(self):
-        return f'BaseItem[{self.base.char}]'
+class LinealItem(QGraphicsRectItem):
+    """
+    Zeichnet das Lineal über den Sequenzen
 
+    Wie beim SequenzItem werden die Ticks beim Zeichnen nur für die sichtbaren
+    Spalten erzeugt.
+    """
 
-class LinealItem(QGraphicsRectItem):
-    def __init__(self, parent, model: SequenzenModel, viewmodel: SequenzenViewModel):
+    def __init__(self, parent, model: SequenzenModel, viewmodel: SequenzenViewModel, spaltenlayout: Spaltenlayout):
         super().__init__(parent)
         self._model = model
         self._viewmodel = viewmodel
-        self._ticks: list[LinealtickItem] = []
+        self._spaltenlayout = spaltenlayout
+        self._colanzahl = 0
+        self._maxlen = 0
+        self._hover: int = None
         self._rotelinien: list[RotelinieItem] = []
+        self.setPen(Qt.NoPen)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
         self.viewmodel.spaltenzahlChanged.connect(self.setBoxPos)
         self.viewmodel.umbruchChanged.connect(self.setBoxPos)
         self.viewmodel.zeigeverstecktChanged.connect(self.setBoxPos)
@@ -338,144 +712,239 @@ class LinealItem(QGraphicsRectItem):
         return self._viewmodel
 
     @property
-    def ticks(self):
-        return self._ticks
+    def spaltenlayout(self) -> Spaltenlayout:
+        return self._spaltenlayout
+
+    @property
+    def colanzahl(self) -> int:
+        "Anzahl der angezeigten Spalten"
+        return self._colanzahl
 
     @property
     def rotelinien(self):
         return self._rotelinien
 
-    def erzeugeTicks(self):
-        deleteItemArray(self.ticks)
-
-        for idx in range(self.model.maxlen):
-            self.ticks.append(LinealtickItem(self, idx))
-        
-    def versteckeTicks(self, idxlist: list[int]):
-        for index in idxlist:
-            try:
-                self.ticks[index].versteckt = True
-            except IndexError:
-                pass
-        self.setBoxPos()
+    def indexAusSpalte(self, spalte: int) -> int:
+        if spalte is None or spalte >= self.colanzahl:
+            return None
+        return self.spaltenlayout.spalten[spalte]
 
-    def enttarneTicks(self, idxlist: list[int]):
-        for index in idxlist:
-            try:
-                self.ticks[index].versteckt = False
-            except IndexError:
-                pass
-        self.setBoxPos()
+    def setHover(self, spalte: int):
+        if spalte == self._hover:
+            return
+        self._hover = spalte
+        self.update()
+
+    def versteckeTicks(self, bereiche: list[range]):
+        self.aktualisiereAb(ersteSpalte(bereiche))
+
+    def enttarneTicks(self, bereiche: list[range]):
+        self.aktualisiereAb(ersteSpalte(bereiche))
 
     def setBoxPos(self):
+        deleteItemArray(self.rotelinien)
+        self.aktualisiereAb(0)
+
+    def aktualisiereAb(self, pos: int):
+        "Wie SequenzItem.aktualisiereAb für die Ticks des Lineals."
+
+        self.spaltenlayout.anpassen()
+        self._hover = None
+        self._maxlen = self.model.maxlen
         if not self.model.sequenzen:
-            deleteItemArray(self.ticks)
             deleteItemArray(self.rotelinien)
+            self._colanzahl = 0
+            self.prepareGeometryChange()
+            self.setRect(QRectF())
             return
 
-        if self.model.sequenzen and not self.ticks:
-            self.erzeugeTicks()
-        
-        deleteItemArray(self.rotelinien)
-        roteLineSchonDa = False
-        col = 0
-        for tickidx in range(len(self._ticks)):
-            tickitem = self.ticks[tickidx]
-            x, y = xyFromColSeqidx(col, -2, self.viewmodel.spaltenzahl, len(self.model.sequenzen), self.viewmodel.umbruch)
-            tickitem.setPos(x, y)
-
-            aktuellversteckt = tickitem.versteckt
-            if aktuellversteckt and not self.viewmodel.zeigeversteckt:
-                if not roteLineSchonDa:
-                    self.rotelinien.append(RotelinieItem(self, x, y, 2*basenlaenge))
-                    roteLineSchonDa = True
-                tickitem.setVisible(False)
-                continue
-            else:
-                tickitem.setVisible(True)
-            roteLineSchonDa = False
-            col += 1
+        spaltenzahl = self.viewmodel.spaltenzahl
+        lenseq = len(self.model.sequenzen)
+        umbruch = self.viewmodel.umbruch
+        self._colanzahl = len(self.spaltenlayout.spalten)
+        behalten = min(len(self.rotelinien), self.spaltenlayout.anzahlRotelinien(pos))
+        while len(self.rotelinien) > behalten:
+            self.scene().removeItem(self.rotelinien.pop())
+        for _, spalte in self.spaltenlayout.rotelinien[behalten:]:
+            x, y = xyFromColSeqidx(spalte, linealzeile, spaltenzahl, lenseq, umbruch)
+            self.rotelinien.append(RotelinieItem(self, x, y, 2*basenlaenge))
+
+        # Die Nummern ragen über den Rand der Ticks hinaus.
+        bereich = zeichenbereich(linealzeile, 2, self.colanzahl, spaltenzahl, lenseq, umbruch)
+        self.prepareGeometryChange()
+        self.setRect(bereich.adjusted(-basenlaenge, 0, basenlaenge, 0))
+        self.update()
 
     def updateTicks(self):
-        actlen = len(self.ticks)
-        maxlen = self.model.maxlen
-        if actlen == maxlen:
-            return
-        elif actlen < maxlen:
-            # weitere Ticks werden benötigt
-            self.insertTicks(maxlen, maxlen - actlen)
-        else:
-            # zu viele Ticks vorhanden
-            self.popTicks(actlen - maxlen)
-        
-    def insertTicks(self, pos: int, anzahl: int):
-        gesamt = len(self.ticks)
-        for idx in range(anzahl):
-            self.ticks.append(LinealtickItem(self, gesamt+idx))
-        self.setBoxPos()
-
-    @logme(logger.info)
-    def popTicks(self, anzahl: int):
-        for _ in range(anzahl):
-            item = self.ticks.pop()
-            scene = item.scene()
-            scene.removeItem(item)
+        if self._maxlen != self.model.maxlen:
+            self.aktualisiereAb(min(self._maxlen, self.model.maxlen))
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget=None):
+        lenseq = len(self.model.sequenzen)
+        spaltenzahl = self.viewmodel.spaltenzahl
+        umbruch = self.viewmodel.umbruch
+        rect = zeichenrect(painter, option).adjusted(-basenlaenge, 0, basenlaenge, 0)
+        spalten = self.spaltenlayout.spalten
+        bereiche = list(sichtbareSpalten(rect, linealzeile, 2, self.colanzahl, spaltenzahl, lenseq, umbruch))
+        painter.setFont(basefont)
+        painter.setPen(QColor('black'))
+        dpr = painter.device().devicePixelRatioF()
+        vektor = istVektorausgabe(painter)
+        for bereich in bereiche:
+            felder = []
+            for spalte in bereich:
+                idx = spalten[spalte]
+                marke = '|' if (idx+1)%10 == 0 else '∙'
+                if vektor:
+                    if spalte == self._hover:
+                        hintergrund = brushhighlight.name()
+                    elif self.spaltenlayout.istVersteckt(idx):
+                        hintergrund = brushversteckt.name()
+                    else:
+                        hintergrund = ''
+                    felder.append((marke, 'black', hintergrund))
+                    continue
+                x, y = xyFromColSeqidx(spalte, linealzeile, spaltenzahl, lenseq, umbruch)
+                if spalte == self._hover:
+                    painter.fillRect(QRectF(x, y, basenlaenge, 2*basenlaenge), brushhighlight)
+                elif self.spaltenlayout.istVersteckt(idx):
+                    painter.fillRect(QRectF(x, y, basenlaenge, 2*basenlaenge), brushversteckt)
+                # Die Marke sitzt mit ihrer Oberkante auf der unteren Hälfte des Ticks.
+                painter.drawPixmap(QPointF(x, y+basenlaenge/2+basefm.height()/2), glyphenatlas.pixmap(marke, 'black', '', dpr))
+            if felder:
+                x, y = xyFromColSeqidx(bereich.start, linealzeile, spaltenzahl, lenseq, umbruch)
+                zeichneLaeufe(painter, x, y, felder, 2*basenlaenge, basenlaenge/2+basefm.height()/2)
+
+        # Die Nummern sind breiter als ein Tick und kommen deshalb zuletzt.
+        for bereich in bereiche:
+            for spalte in bereich:
+                nummer = spalten[spalte]+1
+                if nummer%10 != 0:
+                    continue
+                x, y = xyFromColSeqidx(spalte, linealzeile, spaltenzahl, lenseq, umbruch)
+                gnummerw = basefm.horizontalAdvance(str(nummer))
+                painter.drawText(QPointF(x+basenlaenge/2-gnummerw/2, y+basenlaenge/2-basefm.descent()-4+basefm.ascent()), str(nummer))
+
+
+class KonsensItem(QGraphicsItem):
+    """
+    Zeichnet unter dem Lineal den Konsens der Spalten
+
+    Jedes Feld zeigt den häufigsten Buchstaben, hinterlegt nach der
+    Identität in den Stufen von konsensstufen. Der Balken am unteren Rand
+    zeigt die Konservierung. Die genauen Werte stehen im Tooltip.
+    """
+
+    def __init__(self, parent, model: SequenzenModel, viewmodel: SequenzenViewModel, spaltenlayout: Spaltenlayout, konsens: Konsens):
+        super().__init__(parent)
+        self._model = model
+        self._viewmodel = viewmodel
+        self._spaltenlayout = spaltenlayout
+        self._konsens = konsens
+        self._rect = QRectF()
+        self._colanzahl = 0
+        self._hover: int = None
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.viewmodel.spaltenzahlChanged.connect(self.aktualisiere)
+        self.viewmodel.umbruchChanged.connect(self.aktualisiere)
+        self.viewmodel.zeigeverstecktChanged.connect(self.aktualisiere)
+        self.model.verstecktAdded.connect(self.aktualisiere)
+        self.model.verstecktRemoved.connect(self.aktualisiere)
+        self.konsens.konsensChanged.connect(self.aktualisiere)
 
+    @property
+    def model(self):
+        return self._model
 
-class LinealtickItem(QGraphicsRectItem):
+    @property
+    def viewmodel(self):
+        return self._viewmodel
 
-    def __init__(self, parent: LinealItem, idx: int):
-        super().__init__(0, 0, basenlaenge, 2*basenlaenge, parent)
-        self._idx = idx
-        self._versteckt = False
-        self.brush = Qt.NoBrush
-        self.setPen(Qt.NoPen)
-        self.setBoxfarbe()
-        nummer = idx+1
-        marke = '∙'
-        gcharh = 0
-        if nummer%10 == 0:
-            marke = '|'
-            gcharh = basefm.descent()
-            gnummer = QGraphicsSimpleTextItem(str(nummer), self)
-            gnummer.setFont(basefont)
-            gnummerw = basefm.horizontalAdvance(str(nummer))
-            gnummer.setPos(basenlaenge/2-gnummerw/2, basenlaenge/2-gcharh-4)
-            self.setZValue(10)
-        gchar = QGraphicsSimpleTextItem(marke, self)
-        gchar.setFont(basefont)
-        gcharw = basefm.horizontalAdvance(marke)
-        gchar.setPos(basenlaenge/2-gcharw/2, basenlaenge)
-        self.setAcceptHoverEvents(True)
+    @property
+    def spaltenlayout(self) -> Spaltenlayout:
+        return self._spaltenlayout
 
     @property
-    def idx(self):
-        return self._idx
-    
+    def konsens(self) -> Konsens:
+        return self._konsens
+
     @property
-    def versteckt(self):
-        return self._versteckt
-    
-    @versteckt.setter
-    def versteckt(self, value):
-        self._versteckt = value
-        self.setBoxfarbe()
-
-    def setBoxfarbe(self):
-        if self.versteckt:
-            self.brush = brushversteckt
-        else:
-            self.brush = Qt.NoBrush
-        self.setBrush(self.brush)
-        
-    def hoverEnterEvent(self, event):
-        self.setBrush(brushhighlight)
+    def colanzahl(self) -> int:
+        "Anzahl der angezeigten Spalten"
+        return self._colanzahl
 
-    def hoverLeaveEvent(self, event):
-        self.setBrush(self.brush)
+    def indexAusSpalte(self, spalte: int) -> int:
+        if spalte is None or spalte >= self.colanzahl:
+            return None
+        return self.spaltenlayout.spalten[spalte]
 
-    def mousePressEvent(self, *args):
-        self.scene().linealClicked.emit(self._idx)
+    def setHover(self, spalte: int):
+        if spalte == self._hover:
+            return
+        self._hover = spalte
+        idx = self.indexAusSpalte(spalte)
+        if idx is None or idx >= self.konsens.breite:
+            self.setToolTip('')
+        else:
+            self.setToolTip(f'Spalte {idx+1}: {self.konsens.char(idx)}, '
+                            f'Identität {100*self.konsens.identitaet[idx]:.0f} %, '
+                            f'Entropie {self.konsens.entropie[idx]:.2f} bit')
+        self.update()
+
+    def aktualisiere(self, *args):
+        self.spaltenlayout.anpassen()
+        self._hover = None
+        self._colanzahl = len(self.spaltenlayout.spalten) if self.model.sequenzen else 0
+        rect = QRectF()
+        if self.colanzahl:
+            rect = zeichenbereich(konsenszeile, 1, self.colanzahl, self.viewmodel.spaltenzahl, len(self.model.sequenzen), self.viewmodel.umbruch)
+        if rect != self._rect:
+            self.prepareGeometryChange()
+            self._rect = rect
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def hintergrund(self, spalte: int, idx: int) -> str:
+        if spalte == self._hover:
+            return brushhighlight.name()
+        if self.spaltenlayout.istVersteckt(idx):
+            return brushversteckt.name()
+        identitaet = self.konsens.identitaet[idx] if idx < self.konsens.breite else 0
+        for schwelle, farbe in konsensstufen:
+            if identitaet >= schwelle:
+                return farbe
+        return ''
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget=None):
+        lenseq = len(self.model.sequenzen)
+        spaltenzahl = self.viewmodel.spaltenzahl
+        umbruch = self.viewmodel.umbruch
+        spalten = self.spaltenlayout.spalten
+        konservierung = self.konsens.konservierung
+        dpr = painter.device().devicePixelRatioF()
+        vektor = istVektorausgabe(painter)
+        for bereich in sichtbareSpalten(zeichenrect(painter, option), konsenszeile, 1, self.colanzahl, spaltenzahl, lenseq, umbruch):
+            felder = []
+            for spalte in bereich:
+                idx = spalten[spalte]
+                char = self.konsens.char(idx)
+                if vektor:
+                    felder.append((char, 'black', self.hintergrund(spalte, idx)))
+                    continue
+                x, y = xyFromColSeqidx(spalte, konsenszeile, spaltenzahl, lenseq, umbruch)
+                painter.drawPixmap(QPointF(x, y), glyphenatlas.pixmap(char, 'black', self.hintergrund(spalte, idx), dpr))
+            if felder:
+                x, y = xyFromColSeqidx(bereich.start, konsenszeile, spaltenzahl, lenseq, umbruch)
+                zeichneLaeufe(painter, x, y, felder)
+            # Der Balken der Konservierung, höchstens ein Fünftel des Feldes hoch
+            for spalte in bereich:
+                idx = spalten[spalte]
+                if idx < len(konservierung) and konservierung[idx] > 0:
+                    hoehe = konservierung[idx] * basenlaenge/5
+                    x, y = xyFromColSeqidx(spalte, konsenszeile, spaltenzahl, lenseq, umbruch)
+                    painter.fillRect(QRectF(x, y+basenlaenge-hoehe, basenlaenge, hoehe), QColor('darkslategray'))
 
 
 class RotelinieItem(QGraphicsLineItem):
@@ -1,26 +1,35 @@
+import os
 import sys
-import json
 
-from PySide6.QtCore import QSize, QRectF, Qt, Signal
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
-from PySide6.QtGui import QColor, QAction, QImage, QPainter, QPixmap, QIcon, QUndoStack, QKeySequence, QSurfaceFormat
+from PySide6.QtGui import QAction, QPixmap, QIcon, QUndoStack, QKeySequence, QSurfaceFormat
 from PySide6.QtWidgets import (
     QApplication, QLabel, QMainWindow, QFileDialog, 
-    QGraphicsView, QCheckBox, QToolBar, QWidget,
-    QMessageBox, QHBoxLayout, QLineEdit
+    QGraphicsView, QCheckBox, QToolBar, QWidget, QDockWidget,
+    QMessageBox, QHBoxLayout, QVBoxLayout, QLineEdit, QProgressDialog
 )
 
 VERSION = "2.0"
-from bioinformatik import Markierung, Sequenz, Base
+from alignment import aligniere
+from bioinformatik import Markierung, Sequenz, Base, Basen, leserahmen
+from export import rendere, renderePNG
+from fasta import FastaImport, IndizierteFasta
+from journal import Journal, journaldatei, leseJournal
+from mehrfachalignment import mehrfachalignment
+from projektdatei import ENDUNG, istProjektdatei, ladeBinaer, ladeJson, speichereBinaer, speichereJson
 from markierungenWidget import MarkierungenVerwalten
 from sequenzenscene import SequenzenScene
 from sequenzenmodel import SequenzenModel, SequenzenViewModel
-from dialoge import NeueSequenzDialog, BaseDialog, SequenzDialog, LinealDialog
+from suche import Fundstelle, Suchindex
+from suchWidget import SucheWidget
+from zusammensetzungWidget import ZusammensetzungWidget
+from dialoge import NeueSequenzDialog, BaseDialog, SequenzDialog, LinealDialog, FastaAuswahlDialog
 from commands import (
     RemoveMarkierungCommand, changeColorMarkierungCommand, changeBeschreibungMarkierungCommand, AddMarkierungCommand,
     RenameSequenzCommand, AminosaeureSequenzCommand, RemoveSequenzenCommand, AddSequenzenCommand,
     InsertLeerBaseCommand, EntferneBaseCommand, InsertBaseCommand, VerstecktCommand, EnttarnenCommand, MarkiereBasenCommand,
-    RenewSequenzBasenCommand, SetAllCommand
+    RenewSequenzBasenCommand, SetAllCommand, AlignmentCommand
 )
 
 import logging
@@ -37,6 +46,8 @@ logger = logging
 
 
 padding={'padx': 6, 'pady': 6}
+# Farben der ORF-Markierungen je Leserahmen
+orffarben = {1: '#fb8072', 2: '#80b1d3', 3: '#b3de69', -1: '#fdb462', -2: '#bc80bd', -3: '#ffed6f'}
 
 class SequenzEditor(QMainWindow):
     """
@@ -56,15 +67,23 @@ class SequenzEditor(QMainWindow):
         self._sequenzmodel = SequenzenModel(self)
         self._viewmodel = SequenzenViewModel(self)
         self._sequenzscene = SequenzenScene(self, self._sequenzmodel, self._viewmodel)
-        grafik = QGraphicsView(self._sequenzscene)
+        grafik = self._grafik = QGraphicsView(self._sequenzscene)
         #opengl = QOpenGLWidget()
         #surfaceformat = QSurfaceFormat()
         #surfaceformat.setSamples(4)
         #opengl.setFormat(surfaceformat)
         #grafik.setViewport(opengl)
         markierungen = MarkierungenVerwalten(self._sequenzmodel)
+        suche = SucheWidget(Suchindex(self, self._sequenzmodel))
+        zusammensetzung = QDockWidget('Zusammensetzung', self)
+        zusammensetzung.setWidget(ZusammensetzungWidget(self._sequenzmodel, self._viewmodel, self._sequenzscene.spaltenlayout))
+        zusammensetzung.hide()
         self._ungespeichert = False
         self._undoStack = QUndoStack(self)
+        self._journal = Journal(self, self._sequenzmodel, self._undoStack, journaldatei())
+        self._fastaimport: FastaImport = None
+        self._fastafortschritt: QProgressDialog = None
+        self._fastamakro = False
 
         neuAction = QAction('&Neu', self)
         neuAction.setIcon(QIcon(':/images/new.svg'))
@@ -78,15 +97,22 @@ class SequenzEditor(QMainWindow):
         fastaimportAction = QAction('&FASTA importieren', self)
         fastaimportAction.setIcon(QIcon(':/images/import.svg'))
         fastaimportAction.setShortcut(Qt.CTRL | Qt.Key_I)
+        faiimportAction = QAction('FASTA-&Ausschnitt laden', self)
+        faiimportAction.setIcon(QIcon(':/images/import.svg'))
         pngexportAction = QAction('&PNG exportieren', self)
         pngexportAction.setIcon(QIcon(':/images/image.svg'))
         pngexportAction.setShortcut(Qt.CTRL | Qt.Key_P)
+        vektorexportAction = QAction('SVG/PDF e&xportieren', self)
+        vektorexportAction.setIcon(QIcon(':/images/image.svg'))
         beendenAction = QAction('&Beenden', self)
         beendenAction.setIcon(QIcon(':/images/quit.svg'))
         beendenAction.setShortcut(Qt.CTRL | Qt.Key_Q)
         neuesequenzAction = QAction('Neue &Sequenz anhängen', self)
         neuesequenzAction.setIcon(QIcon(':/images/listadd.svg'))
         neuesequenzAction.setShortcut(QKeySequence.SelectAll)
+        alignierenAction = QAction('Alle Sequenzen &alignieren', self)
+        suchenAction = QAction('S&uchen', self)
+        suchenAction.setShortcut(QKeySequence.Find)
         undoAction = self._undoStack.createUndoAction(self)
         undoAction.setIcon(QIcon(':/images/undo.svg'))
         undoAction.setShortcut(QKeySequence.Undo)
@@ -97,13 +123,17 @@ class SequenzEditor(QMainWindow):
         menubar = self.menuBar()
         fileMenu = menubar.addMenu('&Datei')
         editMenu = menubar.addMenu('&Bearbeiten')
+        viewMenu = menubar.addMenu('&Ansicht')
         fileMenu.addActions([neuAction, oeffnenAction, speichernAction])
         fileMenu.addSeparator()
         fileMenu.addAction(fastaimportAction)
+        fileMenu.addAction(faiimportAction)
         fileMenu.addAction(pngexportAction)
+        fileMenu.addAction(vektorexportAction)
         fileMenu.addSeparator()
         fileMenu.addActions([beendenAction])
-        editMenu.addActions([neuesequenzAction, undoAction, redoAction])
+        editMenu.addActions([neuesequenzAction, alignierenAction, suchenAction, undoAction, redoAction])
+        viewMenu.addAction(zusammensetzung.toggleViewAction())
 
         self.cb_zeilenumbrechen = QCheckBox('Zeilen umbrechen')
         self.cb_zeilenumbrechen.setChecked(True)
@@ -131,17 +161,25 @@ class SequenzEditor(QMainWindow):
         tools.addAction(neuesequenzAction)
 
         self.statusBar().addPermanentWidget(QLabel(f'Version {VERSION}'))
-        mainlayout.addWidget(markierungen)
+        linkslayout = QVBoxLayout()
+        linkslayout.addWidget(markierungen)
+        linkslayout.addWidget(suche)
+        mainlayout.addLayout(linkslayout)
         mainlayout.addWidget(grafik)
         mainlayout.setStretchFactor(grafik, 3)
         self.setCentralWidget(main)
+        self.addDockWidget(Qt.BottomDockWidgetArea, zusammensetzung)
 
         neuAction.triggered.connect(self.fileNew)
         oeffnenAction.triggered.connect(self.fileOpen)
         speichernAction.triggered.connect(self.fileSave)
         fastaimportAction.triggered.connect(self.importFasta)
+        faiimportAction.triggered.connect(self.importFastaAusschnitt)
         pngexportAction.triggered.connect(self.exportPNG)
+        vektorexportAction.triggered.connect(self.exportVektor)
         beendenAction.triggered.connect(self.close)
+        alignierenAction.triggered.connect(self.alleAlignieren)
+        suchenAction.triggered.connect(suche.fokussieren)
         neuesequenzAction.triggered.connect(self.neueSequenzDialog)
         self.cb_zeilenumbrechen.stateChanged.connect(self._setze_umbruch)
         self.sb_spaltenzahl.returnPressed.connect(self._setze_spaltenzahl)
@@ -153,6 +191,8 @@ class SequenzEditor(QMainWindow):
         markierungen.markierungEntfernen.connect(self.markierung_entfernen)
         markierungen.markierungFarbeSetzen.connect(self.markierung_farbe_setzen)
         markierungen.markierungUmbenennen.connect(self.markierung_name_setzen)
+        suche.fundstellenGefunden.connect(self._sequenzscene.setzeFundstellen)
+        suche.fundstelleGewaehlt.connect(self.zeigeFundstelle)
 
     @property
     def sequenzscene(self) -> SequenzenScene:
@@ -178,6 +218,10 @@ class SequenzEditor(QMainWindow):
         if not self.ungespeichertFortfahren('Editor beenden'):
             event.ignore()
             return
+        if self._fastaimport:
+            self._fastaimport.requestInterruption()
+            self._fastaimport.wait()
+        self._journal.beenden(True)
         self.closed.emit()
         event.accept()
 
@@ -198,28 +242,60 @@ class SequenzEditor(QMainWindow):
     def fileOpen(self):
         if not self.ungespeichertFortfahren('Neue Datei laden'):
             return
-        filename = QFileDialog.getOpenFileName(self, "Datei öffnen", filter='JSON-Dateien (*.json);;Alle Dateien (*.*)')[0]
+        filename = QFileDialog.getOpenFileName(self, "Datei öffnen", filter=f'Projektdateien (*.json *{ENDUNG});;JSON-Dateien (*.json);;Binäre Projektdateien (*{ENDUNG});;Alle Dateien (*.*)')[0]
         if not filename:
             return
         try:
-            self.importJSONFile(filename)
+            self.ladeDatei(filename)
         except Exception as e:
             self.Fehlermeldung(str(e))
 
+    def ladeDatei(self, filename: str, ungespeichert: bool = True) -> None:
+        "Lädt eine Projektdatei im JSON- oder im Binärformat."
+
+        if istProjektdatei(filename):
+            self.importBinaerFile(filename, ungespeichert)
+        else:
+            self.importJSONFile(filename, ungespeichert)
+        if self._journal.aktiv:
+            self._journal.neu(filename)
+
+    def wiederherstellen(self) -> bool:
+        """
+        Bietet die ungesicherten Änderungen der letzten Sitzung aus dem Journal
+        an und startet danach das Journal. True, wenn wiederhergestellt wurde.
+        """
+
+        basis, datensaetze = None, []
+        if os.path.exists(self._journal.dateiname):
+            try:
+                basis, datensaetze = leseJournal(self._journal.dateiname)
+            except Exception as e:
+                logger.warning(f'Journal {self._journal.dateiname} nicht lesbar: {e}')
+        if datensaetze:
+            text = f"Es gibt ungesicherte Änderungen{' an ' + basis if basis else ''} aus der letzten Sitzung.\nSollen sie wiederhergestellt werden?"
+            ret = QMessageBox.question(self, 'Wiederherstellen', text, QMessageBox.Yes | QMessageBox.No)
+            if ret == QMessageBox.Yes:
+                try:
+                    if basis:
+                        self.ladeDatei(basis)
+                    self._journal.wiederherstellen(datensaetze)
+                    self._ungespeichert = True
+                    return True
+                except Exception as e:
+                    self.Fehlermeldung(f'Wiederherstellung fehlgeschlagen: {e}')
+                    self.sequenzmodel.setAll()
+                    os.replace(self._journal.dateiname, self._journal.dateiname + '.alt')
+        self._journal.neu(None)
+        return False
+
+    def importBinaerFile(self, filename: str, ungespeichert: bool = True) -> None:
+        sequenzen, markierungen, versteckt = ladeBinaer(filename)
+        self.sequenzmodel.setAll(sequenzen, markierungen, versteckt)
+        self._ungespeichert = ungespeichert
+
     def importJSONFile(self, filename: str, ungespeichert: bool = True) -> None:
-        with open(filename) as file:
-            dict = json.load(file, cls=SequenzenDecoder)
-        sequenzen = dict['sequenzen']
-        versteckt = dict['versteckt']
-        markierungen = dict['markierungen']
-        mtxtdict = {}
-        for m in markierungen:
-            mtxtdict[m._beschreibung]=m
-        for s in sequenzen:
-            for b in s.basen:
-                if b._mtxt:
-                    b.markierung = mtxtdict[b._mtxt]
-                    del b._mtxt
+        sequenzen, markierungen, versteckt = ladeJson(filename)
         self.sequenzmodel.setAll(sequenzen, markierungen, versteckt)
         self._ungespeichert = ungespeichert
         return
@@ -228,60 +304,105 @@ class SequenzEditor(QMainWindow):
         filename = QFileDialog.getOpenFileName(self, "FASTA-Datei importieren", filter="FASTA-Dateien (*.fasta);; Alle Dateien (*.*)")[0]
         if not filename:
             return
-        with open(filename) as fastafile:
-            lines = fastafile.readlines()
+        if self._fastaimport:
+            self.Fehlermeldung('Es wird noch eine FASTA-Datei importiert.')
+            return
 
+        self._fastaimport = FastaImport(self, filename)
+        self._fastafortschritt = QProgressDialog('FASTA-Datei wird gelesen ...', 'Abbrechen', 0, max(self._fastaimport.dateigroesse, 1), self)
+        self._fastafortschritt.setWindowModality(Qt.WindowModal)
+        self._fastafortschritt.setAutoClose(False)
+        self._fastafortschritt.setAutoReset(False)
+        self._fastafortschritt.canceled.connect(self._fastaimport.requestInterruption)
+        self._fastaimport.fortschritt.connect(self._fastafortschritt.setValue)
+        self._fastaimport.eintraegeGelesen.connect(self.fastaEintraegeHinzu)
+        self._fastaimport.fehler.connect(self.Fehlermeldung)
+        self._fastaimport.finished.connect(self.fastaImportBeendet)
+        self._fastaimport.start()
+
+    def fastaEintraegeHinzu(self, eintraege: list[tuple[str, bytes]]):
+        "Alle Stapel eines Imports werden zu einem Undo-Schritt zusammengefasst."
+
+        if not self._fastamakro:
+            self._undoStack.beginMacro('FASTA importieren')
+            self._fastamakro = True
+        seqarr = [Sequenz(name, Basen(chars)) for name, chars in eintraege]
+        self._undoStack.push(AddSequenzenCommand(self.sequenzmodel, seqarr))
+        self._ungespeichert = True
+
+    def fastaImportBeendet(self):
+        "Ein abgebrochener oder fehlgeschlagener Import wird ganz rückgängig gemacht."
+
+        if self._fastamakro:
+            self._undoStack.endMacro()
+            self._fastamakro = False
+            if not self._fastaimport.vollstaendig:
+                self._undoStack.undo()
+                self.statusBar().showMessage(f'Import von {self._fastaimport.dateiname} nicht vollständig, nichts importiert', 5000)
+        self._fastafortschritt.close()
+        self._fastafortschritt.deleteLater()
+        self._fastaimport.deleteLater()
+        self._fastafortschritt = None
+        self._fastaimport = None
+
+    def importFastaAusschnitt(self):
+        "Lädt nur ausgewählte Einträge oder Abschnitte einer großen FASTA-Datei über ihren .fai-Index."
+
+        filename = QFileDialog.getOpenFileName(self, "FASTA-Ausschnitt laden", filter="FASTA-Dateien (*.fasta *.fa *.fna);; Alle Dateien (*.*)")[0]
+        if not filename:
+            return
         try:
-            seqarr = []
-            name = 'Unbekannt'
-            text = ''
-            for line in lines:
-                if line[:1] == '#':
-                    continue
-                if line[:1] == '>':
-                    if text:
-                        seq = Sequenz(name)
-                        basen = seq.createBasenFromString(text)
-                        seq.basen = basen
-                        seqarr.append(seq)
-                        text = ''
-                        name = 'Unbekannt'
-                    name = line[1:].strip()
-                    continue
-                text += line
-            seq = Sequenz(name)
-            basen = seq.createBasenFromString(text)
-            seq.basen = basen
-            seqarr.append(seq)
-            self._undoStack.push(AddSequenzenCommand(self.sequenzmodel, seqarr))
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                fasta = IndizierteFasta(filename)
+            finally:
+                QApplication.restoreOverrideCursor()
         except Exception as e:
             self.Fehlermeldung(str(e))
+            return
+
+        dlg = FastaAuswahlDialog(self, fasta.eintraege)
+        dlg.ausschnitteGewaehlt.connect(lambda ausschnitte: self.fastaAusschnitteHinzu(fasta, ausschnitte))
+        dlg.exec()
+        fasta.schliessen()
+
+    def fastaAusschnitteHinzu(self, fasta: IndizierteFasta, ausschnitte: list[tuple[str, int, int]]):
+        seqarr = []
+        for name, start, ende in ausschnitte:
+            basen = Basen(fasta.basen(name, start, ende))
+            if start > 0 or ende < fasta.eintrag(name).laenge:
+                name = f'{name}:{start+1}-{ende}'
+            seqarr.append(Sequenz(name, basen))
+        if seqarr:
+            self._undoStack.push(AddSequenzenCommand(self.sequenzmodel, seqarr))
+            self._ungespeichert = True
 
     def fileSave(self):
-        filename = QFileDialog.getSaveFileName(self, "Datei speichern", filter='JSON-Dateien (*.json);;Alle Dateien (*.*)')[0]
+        filename = QFileDialog.getSaveFileName(self, "Datei speichern", filter=f'JSON-Dateien (*.json);;Binäre Projektdateien (*{ENDUNG});;Alle Dateien (*.*)')[0]
         if not filename:
             return
-        with open(filename, 'w') as file:
-            json.dump({
-                'markierungen': self.sequenzmodel.markierungen,
-                'versteckt': self.sequenzmodel.versteckt,
-                'sequenzen': self.sequenzmodel.sequenzen
-            }, file, cls=SequenzenEncoder)
+        if filename.endswith(ENDUNG):
+            speichereBinaer(filename, self.sequenzmodel)
+        else:
+            speichereJson(filename, self.sequenzmodel)
         self._ungespeichert = False
+        if self._journal.aktiv:
+            self._journal.neu(filename)
 
     def exportPNG(self):
         filename = QFileDialog.getSaveFileName(self, "PNG-Export nach", filter='PNG-Image (*.png);;Alle Dateien (*.*)')[0]
         if not filename:
             return
+        if not renderePNG(self._sequenzscene, filename):
+            self.Fehlermeldung(f'{filename} konnte nicht gespeichert werden.')
 
-        rect_f = self._sequenzscene.itemsBoundingRect()
-        img = QImage(QSize(rect_f.width(),rect_f.height()), QImage.Format_RGB888)
-        img.fill(QColor('white'))
-        p = QPainter(img)
-        self._sequenzscene.render(p, target=QRectF(img.rect()), source=rect_f)
-        p.end()
-    
-        saving = img.save(filename)
+    def exportVektor(self):
+        filename = QFileDialog.getSaveFileName(self, "Vektorgrafik-Export nach", filter='SVG-Grafik (*.svg);;PDF-Dokument (*.pdf);;Alle Dateien (*.*)')[0]
+        if not filename:
+            return
+        format = 'pdf' if filename.lower().endswith('.pdf') else 'svg'
+        if not rendere(self._sequenzscene, filename, format):
+            self.Fehlermeldung(f'{filename} konnte nicht gespeichert werden.')
 
     def _setze_spaltenzahl(self):
         try:
@@ -328,6 +449,79 @@ class SequenzEditor(QMainWindow):
         self._undoStack.push(AminosaeureSequenzCommand(sequenz))
         self._ungespeichert = True
 
+    def sequenz_uebersetzen(self, sequenz: Sequenz, rahmen: list[int], tabelle: int):
+        "Legt für jeden Leserahmen eine neue Sequenz mit den Aminosäuren an."
+
+        uebersetzungen = [Sequenz(f'{sequenz.name} Rahmen {r:+d}', sequenz.uebersetzung(r, tabelle)) for r in rahmen]
+        self._undoStack.push(AddSequenzenCommand(self.sequenzmodel, uebersetzungen))
+        self._ungespeichert = True
+
+    def sequenz_orfs_markieren(self, sequenz: Sequenz, rahmen: list[int], tabelle: int, mindestlaenge: int):
+        """
+        Markiert die offenen Leserahmen mit einer Markierung je Rahmen, alles in einem Undo-Schritt.
+
+        Vorhandene Markierungen mit demselben Namen werden weiterverwendet.
+        Überlappen sich ORFs verschiedener Rahmen, gilt der zuletzt markierte.
+        """
+
+        gefunden = sequenz.orfs(mindestlaenge, tabelle, rahmen)
+        if not gefunden:
+            self.statusBar().showMessage(f'Keine ORFs ab {mindestlaenge} Codons in {sequenz.name}', 5000)
+            return
+        vorhanden = {markierung.beschreibung: markierung for markierung in self.sequenzmodel.markierungen}
+        self._undoStack.beginMacro(f'ORFs markiert in {sequenz.name}')
+        try:
+            markierungen = {}
+            for r in sorted({orf.rahmen for orf in gefunden}, key=leserahmen.index):
+                name = f'ORF Rahmen {r:+d}'
+                markierungen[r] = vorhanden.get(name)
+                if markierungen[r] is None:
+                    markierungen[r] = Markierung(name, orffarben[r])
+                    self._undoStack.push(AddMarkierungCommand(self.sequenzmodel, markierungen[r]))
+            for orf in gefunden:
+                self._undoStack.push(MarkiereBasenCommand(sequenz.base(orf.start), orf.ende-orf.start, markierungen[orf.rahmen]))
+        finally:
+            self._undoStack.endMacro()
+        self.statusBar().showMessage(f'{len(gefunden)} ORFs in {sequenz.name} markiert', 5000)
+        self._ungespeichert = True
+
+    def sequenz_alignieren(self, sequenz_a: Sequenz, sequenz_b: Sequenz, lokal: bool, band: int):
+        "Richtet zwei Sequenzen mit leeren Basen aneinander aus, band 0 heißt ohne Band."
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            alignment = aligniere(sequenz_a.basen.chars, sequenz_b.basen.chars, lokal, band or None)
+        except ValueError as e:
+            self.Fehlermeldung(str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self._undoStack.push(AlignmentCommand(sequenz_a, sequenz_b, alignment))
+        self.statusBar().showMessage(f'Alignment mit {alignment.punkte:g} Punkten', 5000)
+        self._ungespeichert = True
+
+    def alleAlignieren(self):
+        "Progressives Mehrfachalignment aller Sequenzen als ein Undo-Schritt"
+
+        sequenzen = self.sequenzmodel.sequenzen
+        if len(sequenzen) < 2:
+            self.Fehlermeldung('Zum Alignieren werden mindestens zwei Sequenzen gebraucht.')
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            alignierte = mehrfachalignment([sequenz.basen for sequenz in sequenzen])
+        finally:
+            QApplication.restoreOverrideCursor()
+        neu = [Sequenz(sequenz.name, basen) for sequenz, basen in zip(sequenzen, alignierte)]
+        # Die versteckten Spalten passen nach dem Alignment nicht mehr
+        self._undoStack.push(SetAllCommand(self.sequenzmodel, neu, list(self.sequenzmodel.markierungen), []))
+        self._ungespeichert = True
+
+    def zeigeFundstelle(self, fundstelle: Fundstelle):
+        rect = self.sequenzscene.fundstelleRect(fundstelle)
+        if not rect.isEmpty():
+            self._grafik.centerOn(rect.center())
+
     def sequenz_basen_ersetzen(self, sequenz: Sequenz, basentxt: str):
         self._undoStack.push(RenewSequenzBasenCommand(sequenz, basentxt))
         self._ungespeichert = True
@@ -387,6 +581,9 @@ class SequenzEditor(QMainWindow):
         dlg.sequenzEntfernen.connect(self.sequenz_entfernen)
         dlg.basenErsetzen.connect(self.sequenz_basen_ersetzen)
         dlg.sequenzInAmino.connect(self.sequenz_in_aminosaeure)
+        dlg.sequenzUebersetzen.connect(self.sequenz_uebersetzen)
+        dlg.sequenzAlignieren.connect(self.sequenz_alignieren)
+        dlg.orfsMarkieren.connect(self.sequenz_orfs_markieren)
         dlg.exec()
 
     def openLinealDialog(self, spalte: int):
@@ -396,33 +593,11 @@ class SequenzEditor(QMainWindow):
         dlg.exec()
 
 
-class SequenzenEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if hasattr(obj, 'to_json') and callable(obj.to_json):
-            return obj.to_json()
-        else:
-            return json.JSONEncoder.default(self, obj)
-
-
-class SequenzenDecoder(json.JSONDecoder):
-    def __init__(self, *args, **kwargs):
-        json.JSONDecoder.__init__(self, object_hook=self.object_sequenz, *args, **kwargs)
-    
-    def object_sequenz(self, dct):
-        if 'Sequenz' in dct:
-            seq = Sequenz(**dct['Sequenz'])
-            seq.importBasenArrayOfDict(dct['Sequenz']['_basen'])
-            return seq
-        elif 'Markierung' in dct:
-            return Markierung(**dct['Markierung'])
-        return dct
-
-
 if __name__ == "__main__":
     from argparse import ArgumentParser
     app = QApplication(sys.argv+['-platform','windows:darkmode=1'])
     parser = ArgumentParser()
-    parser.add_argument("file", nargs="?", help="Json-Datei zum laden einer vorher gesicherten Datei.")
+    parser.add_argument("file", nargs="?", help="Json- oder Binärdatei zum laden einer vorher gesicherten Datei.")
     parser.add_argument("-l", "--loglevel", choices=['DEBUG','INFO','WARNING','ERROR','CRITICAL'])
     args = vars(parser.parse_args())
 
@@ -445,9 +620,9 @@ if __name__ == "__main__":
 
     logger.debug('Starte Sequenzeditor')
 
-    if args['file'] is not None:
+    if not d.wiederherstellen() and args['file'] is not None:
         try:
-            d.importJSONFile(args['file'], False)
+            d.ladeDatei(args['file'], False)
         except Exception as e:
             print(str(e))
 
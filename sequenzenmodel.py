@@ -1,7 +1,8 @@
 
 import logging
 from PySide6.QtCore import Signal, QObject
-from bioinformatik import Sequenz, Markierung, Base
+from bioinformatik import Sequenz, Markierung
+from intervalle import Intervallmenge
 
 logger = logging.getLogger(__name__)
 
@@ -59,11 +60,11 @@ class SequenzenModel(QObject):
     verstecktAdded = Signal(list)
     verstecktRemoved = Signal(list)
 
-    def __init__(self, parent: QObject, sequenzen: list[Sequenz] = None, markierungen: list[Markierung] = None, versteckt: list[int] = None):
+    def __init__(self, parent: QObject, sequenzen: list[Sequenz] = None, markierungen: list[Markierung] = None, versteckt: Intervallmenge = None):
         super().__init__(parent)
         self._sequenzen: list[Sequenz] = sequenzen or []
         self._markierungen: list[Markierung] = markierungen or []
-        self._versteckt: list[int] = versteckt or []
+        self._versteckt: Intervallmenge = self._alsIntervallmenge(versteckt)
 
     @property
     def sequenzen(self) -> list[Sequenz]:
@@ -74,22 +75,34 @@ class SequenzenModel(QObject):
         return self._markierungen
 
     @property
-    def versteckt(self) -> list[bool]:
+    def versteckt(self) -> Intervallmenge:
+        "Die versteckten Spalten"
         return self._versteckt
 
+    def istVersteckt(self, idx: int) -> bool:
+        return idx in self._versteckt
+
+    def sichtbareSpalte(self, idx: int) -> int:
+        "Nummer der Spalte idx, wenn die versteckten Spalten ausgeblendet sind. Für versteckte Spalten die der nächsten sichtbaren."
+        return idx - self._versteckt.anzahlVor(idx)
+
+    def naechsteSichtbare(self, idx: int) -> int:
+        "Die erste nicht versteckte Spalte ab idx"
+        return self._versteckt.naechsteFehlende(idx)
+
     @property
     def maxlen(self):
         if not self.sequenzen:
             return 0
-        return max([len(sequenz.basen) for sequenz in self.sequenzen])
+        return max([sequenz.laenge for sequenz in self.sequenzen])
 
     def getAllCopy(self):
         return self._sequenzen.copy(), self._markierungen.copy(), self.versteckt.copy()
     
-    def setAll(self, sequenzen: list[Sequenz] = None, markierungen: list[Markierung] = None, versteckt: list[range] = None):
+    def setAll(self, sequenzen: list[Sequenz] = None, markierungen: list[Markierung] = None, versteckt: Intervallmenge | list[int] = None):
         self._sequenzen = sequenzen or []
         self._markierungen = markierungen or []
-        self._versteckt = versteckt or []
+        self._versteckt = self._alsIntervallmenge(versteckt)
         self.sequenzenRenewed.emit()
         self.markierungenChanged.emit()
 
@@ -113,19 +126,27 @@ class SequenzenModel(QObject):
         self._markierungen.remove(markierung)
         self.markierungenChanged.emit()
 
-    def addVersteckt(self, arr: list[int]):
-        self._versteckt += arr
-        self.verstecktAdded.emit(arr)
+    def addVersteckt(self, bereiche: list[range]):
+        for bereich in bereiche:
+            self._versteckt.hinzufuegen(bereich)
+        self.verstecktAdded.emit(bereiche)
+
+    def removeVersteckt(self, bereiche: list[range]):
+        for bereich in bereiche:
+            self._versteckt.entfernen(bereich)
+        self.verstecktRemoved.emit(bereiche)
+
+    @staticmethod
+    def _alsIntervallmenge(versteckt: Intervallmenge | list[int]) -> Intervallmenge:
+        "Ältere Dateien speichern die versteckten Spalten als Liste einzelner Spalten."
+        if isinstance(versteckt, Intervallmenge):
+            return versteckt.copy()
+        return Intervallmenge.ausIndizes(versteckt or [])
 
-    def removeVersteckt(self, arr: list[int]):
-        for col in arr:
-            col in self._versteckt and self._versteckt.remove(col)
-        self.verstecktRemoved.emit(arr)
+    def markierteBereiche(self, markierung: Markierung) -> list[tuple[Sequenz, range]]:
+        "Alle Abschnitte der Sequenzen, die mit markierung markiert sind"
 
-    def markierteBasen(self, markierung: Markierung) -> list[Base]:
-        basen = []
+        bereiche = []
         for sequenz in self.sequenzen:
-            for base in sequenz.basen:
-                if base.markierung == markierung:
-                    basen.append(base)
-        return basen
\ No newline at end of file
+            bereiche += [(sequenz, bereich) for bereich, _ in sequenz.markierteBereiche(markierung)]
+        return bereiche
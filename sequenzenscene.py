@@ -1,9 +1,12 @@
 
-from PySide6.QtCore import Signal, Qt, QRect
+from PySide6.QtCore import Signal, Qt, QRect, QRectF, QEvent, QPointF
 
 from PySide6.QtWidgets import QGraphicsScene, QGraphicsRectItem
-from sceneitems import basenlaenge, sequenznamewidth, rahmendicke, SequenzItem, LinealItem, MarkierungItem
+from sceneitems import basenlaenge, sequenznamewidth, rahmendicke, linealzeile, konsenszeile, colSeqidxFromXY, Spaltenlayout, SequenzItem, LinealItem, KonsensItem, MarkierungItem
 from bioinformatik import Sequenz, Markierung, Base
+from konsens import Konsens
+from intervalle import Intervallmenge
+from suche import Fundstelle
 from sequenzenmodel import SequenzenModel, SequenzenViewModel
 
 import logging
@@ -28,18 +31,24 @@ class SequenzenScene(QGraphicsScene):
         self._model = sequenzenmodel
         self._viewmodel = sequenzenviewmodel
         self.vorgängerMarkierungItem: MarkierungItem = None
+        self.hoverItem: SequenzItem | LinealItem | KonsensItem = None
+        self._fundstellen: dict[Sequenz, Intervallmenge] = {}
+        self._ordneAn = False
         self.keineSequenzBemerkung = self.createkeineSequenzenBemerkung()
         self.verstecktBemerkung = self.createVerstecktBemerkung()
         self.markierungenItems = QGraphicsRectItem()
         self.sequenzenRect = QGraphicsRectItem()
         self.sequenzenItems = QGraphicsRectItem(self.sequenzenRect)
-        self.linealitem = LinealItem(self.sequenzenRect, self.model, self.viewmodel)
+        self.spaltenlayout = Spaltenlayout(self.model, self.viewmodel)
+        self.linealitem = LinealItem(self.sequenzenRect, self.model, self.viewmodel, self.spaltenlayout)
+        self.konsens = Konsens(self, self.model)
+        self.konsensitem = KonsensItem(self.sequenzenRect, self.model, self.viewmodel, self.spaltenlayout, self.konsens)
         self.addItem(self.markierungenItems)
         self.addItem(self.sequenzenRect)
 
         self.verstecktBemerkung.setPos(basenlaenge, 3*basenlaenge)
-        self.keineSequenzBemerkung.setPos(sequenznamewidth+rahmendicke, 6*basenlaenge)
-        self.sequenzenRect.setPos(0, 6*basenlaenge)
+        self.keineSequenzBemerkung.setPos(sequenznamewidth+rahmendicke, 7*basenlaenge)
+        self.sequenzenRect.setPos(0, 7*basenlaenge)
         self.markierungenItems.setPos(sequenznamewidth+rahmendicke, 2*basenlaenge)
 
         self.model.sequenzenRenewed.connect(self.ansichtErneuern)
@@ -69,21 +78,27 @@ class SequenzenScene(QGraphicsScene):
 
     @logme(logger.debug)
     def updateBoxPos(self):
+        # Die Größe der Scene wird erst am Ende einmal berechnet.
+        self._ordneAn = True
         for item in self.sequenzenItems.childItems():
             item.setBoxPos()
         self.linealitem.updateTicks()
         self.linealitem.setBoxPos()
+        self.konsensitem.aktualisiere()
+        self._ordneAn = False
         self.recalculateSceneRect()
 
     @logme(logger.debug)
     def sequenzenZeichnen(self):
+        self.setHover(None, None)
         for item in self.sequenzenItems.childItems():
             item.setParentItem(None)
 
         if self.model.sequenzen:
             self.keineSequenzBemerkung.setVisible(False)
             for sequenz in self.model.sequenzen:
-                SequenzItem(self.sequenzenItems, sequenz, self.model, self.viewmodel, self.linealitem)
+                item = SequenzItem(self.sequenzenItems, sequenz, self.model, self.viewmodel, self.linealitem, self.spaltenlayout)
+                item.setzeFundstellen(self._fundstellen.get(sequenz, Intervallmenge()))
         else:
             self.keineSequenzBemerkung.setVisible(True)
         self.updateBoxPos()
@@ -92,11 +107,13 @@ class SequenzenScene(QGraphicsScene):
     def sequenzenAdd(self, sequenzen: list[Sequenz]):
         self.keineSequenzBemerkung.setVisible(False)
         for sequenz in sequenzen:
-            SequenzItem(self.sequenzenItems, sequenz, self.model, self.viewmodel, self.linealitem)
+            item = SequenzItem(self.sequenzenItems, sequenz, self.model, self.viewmodel, self.linealitem, self.spaltenlayout)
+            item.setzeFundstellen(self._fundstellen.get(sequenz, Intervallmenge()))
         self.updateBoxPos()
     
     @logme(logger.debug)
     def sequenzenRemove(self, sequenzen: list[Sequenz]):
+        self.setHover(None, None)
         if not self.model.sequenzen:
             self.keineSequenzBemerkung.setVisible(True)
         for item in self.sequenzenItems.childItems():
@@ -115,6 +132,75 @@ class SequenzenScene(QGraphicsScene):
             self.vorgängerMarkierungItem = MarkierungItem(self.markierungenItems, self.vorgängerMarkierungItem, markierung)
         self.recalculateSceneRect()
 
+    def sequenzItem(self, seqidx: int) -> SequenzItem:
+        sequenz = self.model.sequenzen[seqidx]
+        for item in self.sequenzenItems.childItems():
+            if item.sequenz is sequenz:
+                return item
+
+    @logme(logger.debug)
+    def setzeFundstellen(self, fundstellen: list[Fundstelle]):
+        "Hebt die Basen der Fundstellen einer Suche hervor."
+
+        self._fundstellen = {}
+        for fundstelle in fundstellen:
+            menge = self._fundstellen.setdefault(fundstelle.sequenz, Intervallmenge())
+            menge.hinzufuegen(range(fundstelle.start, fundstelle.ende))
+        for item in self.sequenzenItems.childItems():
+            item.setzeFundstellen(self._fundstellen.get(item.sequenz, Intervallmenge()))
+
+    def fundstelleRect(self, fundstelle: Fundstelle) -> QRectF:
+        "Der Bereich der Fundstelle in Scene-Koordinaten, leer, wenn ihre Sequenz nicht angezeigt wird"
+
+        for item in self.sequenzenItems.childItems():
+            if item.sequenz is fundstelle.sequenz:
+                return item.rowitem.mapRectToScene(item.bereich(fundstelle.start, fundstelle.ende-fundstelle.start))
+        return QRectF()
+
+    def trefferBei(self, scenepos: QPointF) -> tuple[SequenzItem | LinealItem | KonsensItem, int]:
+        """
+        Bestimmt rechnerisch das Item und die angezeigte Spalte unter scenepos.
+
+        Gibt (None, None) zurück, wenn dort keine Base und kein Tick liegt.
+        """
+
+        pos = self.sequenzenRect.mapFromScene(scenepos)
+        spalte, seqidx = colSeqidxFromXY(pos.x(), pos.y(), self.viewmodel.spaltenzahl, len(self.model.sequenzen), self.viewmodel.umbruch)
+        item = None
+        if seqidx in (linealzeile, linealzeile+1) and self.model.sequenzen:
+            item = self.linealitem
+        elif seqidx == konsenszeile and self.model.sequenzen:
+            item = self.konsensitem
+        elif 0 <= seqidx < len(self.model.sequenzen):
+            item = self.sequenzItem(seqidx)
+        if item is None or item.indexAusSpalte(spalte) is None:
+            return None, None
+        return item, spalte
+
+    def setHover(self, item: SequenzItem | LinealItem | KonsensItem, spalte: int):
+        if self.hoverItem is not None and self.hoverItem is not item:
+            self.hoverItem.setHover(None)
+        self.hoverItem = item
+        item is not None and item.setHover(spalte)
+
+    def mousePressEvent(self, event):
+        item, spalte = self.trefferBei(event.scenePos())
+        if item is self.linealitem:
+            self.linealClicked.emit(item.indexAusSpalte(spalte))
+        elif isinstance(item, SequenzItem):
+            self.baseClicked.emit(item.sequenz.base(item.indexAusSpalte(spalte)))
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        self.setHover(*self.trefferBei(event.scenePos()))
+        super().mouseMoveEvent(event)
+
+    def event(self, event):
+        if event.type() == QEvent.GraphicsSceneLeave:
+            self.setHover(None, None)
+        return super().event(event)
+
     @logme(logger.debug)
     def createkeineSequenzenBemerkung(self):
         """Zeichnet einen Infotext, falls keine Sequenzen vorhanden sind."""
@@ -138,8 +224,6 @@ class SequenzenScene(QGraphicsScene):
         self.verstecktBemerkung.setVisible(len(self.model.versteckt) != 0)
 
     def recalculateSceneRect(self):
-        items = self.items()
-        #logger.info("\n"+"\n".join([str(item) for item in items]))
-        #logger.info(len(items))
-        #logger.info("--------------------------------------\n")
+        if self._ordneAn:
+            return
         self.setSceneRect(self.itemsBoundingRect())
@@ -0,0 +1,119 @@
+"""
+Exportiert Projekt- und FASTA-Dateien ohne Oberfläche als PNG oder SVG
+
+    python stapelexport.py -o bilder/ -s 80 *.json *.fasta
+
+Jede Datei wird in einem eigenen Prozess mit der offscreen-Plattform von Qt
+gezeichnet. Bei mehreren Eingabedateien ist die Ausgabe ein Verzeichnis, die
+Bilder erhalten den Namen der Eingabedatei mit der Endung des Formats.
+"""
+
+import os
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from PySide6.QtWidgets import QApplication
+
+from bioinformatik import Basen, Markierung, Sequenz
+from export import FORMATE, rendere
+from fasta import leseFasta
+from projektdatei import istProjektdatei, ladeBinaer, ladeJson
+from sequenzenmodel import SequenzenModel, SequenzenViewModel
+from sequenzenscene import SequenzenScene
+
+import logging
+logger = logging.getLogger(__name__)
+
+fastaendungen = ('.fasta', '.fa', '.fas', '.fna', '.faa', '.ffn', '.frn')
+
+_app: QApplication = None
+
+
+def _initialisiere():
+    "Startet Qt ohne Bildschirm, einmal je Prozess"
+
+    global _app
+    if QApplication.instance() is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        _app = QApplication(['stapelexport'])
+
+
+def ladeEingabe(dateiname: str) -> tuple[list[Sequenz], list[Markierung], list]:
+    "Lädt eine Projektdatei (JSON oder binär) oder eine FASTA-Datei"
+
+    if istProjektdatei(dateiname):
+        return ladeBinaer(dateiname)
+    if dateiname.lower().endswith(fastaendungen):
+        with open(dateiname, 'rb') as datei:
+            return [Sequenz(name, Basen(basen)) for name, basen in leseFasta(datei)], [], []
+    return ladeJson(dateiname)
+
+
+def exportiere(dateiname: str, ziel: str, format: str = 'png', umbruch: bool = True, spaltenzahl: int = 50, zeigeversteckt: bool = False) -> str:
+    "Zeichnet dateiname mit den Ansichtsoptionen und speichert das Bild unter ziel."
+
+    _initialisiere()
+    model = SequenzenModel(None, *ladeEingabe(dateiname))
+    viewmodel = SequenzenViewModel(None, umbruch, spaltenzahl, zeigeversteckt)
+    scene = SequenzenScene(None, model, viewmodel)
+    if not rendere(scene, ziel, format):
+        raise OSError(f'{ziel} konnte nicht geschrieben werden')
+    return ziel
+
+
+def zielname(dateiname: str, ausgabe: str, format: str, verzeichnis: bool) -> str:
+    if not verzeichnis:
+        return ausgabe
+    name = os.path.splitext(os.path.basename(dateiname))[0]
+    return os.path.join(ausgabe, f'{name}.{format}')
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description='Exportiert Sequenzen ohne Oberfläche als Bild.')
+    parser.add_argument('dateien', nargs='+', help='JSON-, Binär- oder FASTA-Dateien')
+    parser.add_argument('-o', '--ausgabe', default='.', help='Bilddatei oder, bei mehreren Dateien, Verzeichnis')
+    parser.add_argument('-f', '--format', choices=FORMATE, help='Bildformat, sonst aus der Endung der Ausgabe oder png')
+    parser.add_argument('-s', '--spaltenzahl', type=int, default=50, help='Basen je Zeile beim Umbruch')
+    parser.add_argument('--kein-umbruch', action='store_true', help='Sequenzen in einer langen Zeile zeichnen')
+    parser.add_argument('--zeige-versteckt', action='store_true', help='Versteckte Spalten grau unterlegt zeigen')
+    parser.add_argument('-j', '--prozesse', type=int, default=os.cpu_count(), help='Anzahl paralleler Prozesse')
+    parser.add_argument('-l', '--loglevel', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], default='WARNING')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.loglevel)
+
+    verzeichnis = len(args.dateien) > 1 or os.path.isdir(args.ausgabe) or args.ausgabe.endswith(os.sep)
+    format = args.format
+    if format is None:
+        endung = os.path.splitext(args.ausgabe)[1].lstrip('.').lower()
+        format = endung if not verzeichnis and endung in FORMATE else 'png'
+    if verzeichnis:
+        os.makedirs(args.ausgabe, exist_ok=True)
+    optionen = dict(format=format, umbruch=not args.kein_umbruch, spaltenzahl=args.spaltenzahl, zeigeversteckt=args.zeige_versteckt)
+    auftraege = [(dateiname, zielname(dateiname, args.ausgabe, format, verzeichnis)) for dateiname in args.dateien]
+
+    fehler = 0
+    if args.prozesse <= 1 or len(auftraege) == 1:
+        for dateiname, ziel in auftraege:
+            try:
+                print(exportiere(dateiname, ziel, **optionen))
+            except Exception as e:
+                print(f'{dateiname}: {e}', file=sys.stderr)
+                fehler += 1
+        return 1 if fehler else 0
+
+    # spawn, damit kein Prozess den Zustand von Qt erbt
+    with ProcessPoolExecutor(min(args.prozesse, len(auftraege)), mp_context=get_context('spawn'), initializer=_initialisiere) as pool:
+        futures = {pool.submit(exportiere, dateiname, ziel, **optionen): dateiname for dateiname, ziel in auftraege}
+        for future in as_completed(futures):
+            try:
+                print(future.result())
+            except Exception as e:
+                print(f'{futures[future]}: {e}', file=sys.stderr)
+                fehler += 1
+    return 1 if fehler else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import re
+
+from PySide6.QtCore import Signal, QTimer
+from PySide6.QtWidgets import (
+    QComboBox, QHBoxLayout, QVBoxLayout, QLabel, QPushButton,
+    QLineEdit, QListWidget, QListWidgetItem, QWidget
+)
+
+from suche import ARTEN, Fundstelle, Suchindex
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+# So viele Fundstellen werden höchstens in der Liste gezeigt
+maxliste = 1000
+
+
+class SucheWidget(QWidget):
+    """
+    Suche nach Motiven, IUPAC-Mustern und regulären Ausdrücken
+
+    Nach jeder Änderung an den Sequenzen wird die letzte Suche kurz danach
+    wiederholt, damit Liste und Hervorhebung stimmen.
+    """
+
+    fundstellenGefunden = Signal(list)
+    fundstelleGewaehlt = Signal(object)
+
+    def __init__(self, suchindex: Suchindex):
+        super().__init__()
+        self._suchindex = suchindex
+        self._fundstellen: list[Fundstelle] = []
+        self._muster = ''
+        self._art = ARTEN[0]
+        self._wiederholen = QTimer(self)
+        self._wiederholen.setSingleShot(True)
+        self._wiederholen.setInterval(300)
+        self._wiederholen.timeout.connect(self._suchen)
+        suchindex.indexChanged.connect(self._indexGeaendert)
+
+        vbox = QVBoxLayout()
+        self.setLayout(vbox)
+        self._le_muster = QLineEdit()
+        self._le_muster.setPlaceholderText('Suchen')
+        self._cb_art = QComboBox()
+        self._cb_art.addItems(ARTEN)
+        btn_suchen = QPushButton('Suchen')
+        hbox = QHBoxLayout()
+        hbox.addWidget(self._le_muster)
+        hbox.addWidget(self._cb_art)
+        hbox.addWidget(btn_suchen)
+        self._lb_anzahl = QLabel()
+        self._lw_fundstellen = QListWidget()
+        self._lw_fundstellen.setFixedWidth(250)
+        vbox.addLayout(hbox)
+        vbox.addWidget(self._lb_anzahl)
+        vbox.addWidget(self._lw_fundstellen)
+
+        self._le_muster.returnPressed.connect(self.suchen)
+        btn_suchen.clicked.connect(self.suchen)
+        self._lw_fundstellen.currentRowChanged.connect(self._gewaehlt)
+
+    @property
+    def suchindex(self) -> Suchindex:
+        return self._suchindex
+
+    @property
+    def fundstellen(self) -> list[Fundstelle]:
+        return self._fundstellen
+
+    def fokussieren(self):
+        self._le_muster.setFocus()
+        self._le_muster.selectAll()
+
+    def suchen(self):
+        self._muster = self._le_muster.text().strip()
+        self._art = self._cb_art.currentText()
+        self._suchen()
+
+    def _indexGeaendert(self):
+        if self._muster:
+            self._wiederholen.start()
+
+    @logme(logger.debug)
+    def _suchen(self):
+        self._wiederholen.stop()
+        fehler = ''
+        try:
+            self._fundstellen = self.suchindex.suche(self._muster, self._art) if self._muster else []
+        except (ValueError, re.error) as e:
+            self._fundstellen = []
+            fehler = str(e)
+        self._lw_fundstellen.blockSignals(True)
+        self._lw_fundstellen.clear()
+        for fundstelle in self._fundstellen[:maxliste]:
+            sequenz = fundstelle.sequenz
+            text = f'{sequenz.name}: {sequenz.nummerOhneLeer(fundstelle.start)}-{sequenz.nummerOhneLeer(fundstelle.ende-1)}'
+            self._lw_fundstellen.addItem(QListWidgetItem(text))
+        self._lw_fundstellen.blockSignals(False)
+        if fehler:
+            self._lb_anzahl.setText(fehler)
+        elif len(self._fundstellen) > maxliste:
+            self._lb_anzahl.setText(f'{len(self._fundstellen)} Fundstellen, die ersten {maxliste} angezeigt')
+        else:
+            self._lb_anzahl.setText(f'{len(self._fundstellen)} Fundstellen' if self._muster else '')
+        self.fundstellenGefunden.emit(self._fundstellen)
+
+    def _gewaehlt(self, zeile: int):
+        if 0 <= zeile < len(self._fundstellen):
+            self.fundstelleGewaehlt.emit(self._fundstellen[zeile])
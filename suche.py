@@ -0,0 +1,267 @@
+"""
+Suche nach Motiven, IUPAC-Mustern und regulären Ausdrücken in allen Sequenzen
+
+Gesucht wird im Text einer Sequenz ohne leere Basen. Für Motive und
+IUPAC-Muster gibt es je Sequenz einen sortierten Index aller k-mere, die
+Fundstellen werden dort mit searchsorted nachgeschlagen statt den Text zu
+durchlaufen. Die Positionen im Text werden über die Spalte jeder Base auf
+die Spalten der Sequenz mit Lücken zurückgerechnet.
+
+Einfügen und Entfernen wird direkt im Index nachgetragen. Leere Basen
+verschieben nur die Spalten. Bei echten Basen werden nur die k-mere, die
+über die geänderte Stelle reichen, neu berechnet und einsortiert, die
+Positionen dahinter werden verschoben. Wird die ganze Sequenz ersetzt, wird
+ihr Index bei der nächsten Suche neu aufgebaut.
+"""
+
+import re
+from itertools import product
+from typing import NamedTuple
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+
+from bioinformatik import Sequenz, leerbase
+from sequenzenmodel import SequenzenModel
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+ARTEN = ('Motiv', 'IUPAC', 'Regex')
+
+iupac = {
+    'A': 'A', 'C': 'C', 'G': 'G', 'T': 'TU', 'U': 'TU',
+    'R': 'AGR', 'Y': 'CTUY', 'S': 'CGS', 'W': 'ATUW', 'K': 'GTUK', 'M': 'ACM',
+    'B': 'CGTUB', 'D': 'AGTUD', 'H': 'ACTUH', 'V': 'ACGV', 'N': 'ACGTUN',
+}
+
+# Mehr Varianten des Fensters werden nicht einzeln nachgeschlagen
+maxvarianten = 256
+
+
+class Fundstelle(NamedTuple):
+    "Ein Fund in sequenz von Spalte start bis vor ende, Lücken darin eingeschlossen"
+    sequenz: Sequenz
+    start: int
+    ende: int
+
+
+def zeichenklassen(muster: str, art: str) -> list[bytes]:
+    "Für jede Stelle eines Motivs oder IUPAC-Musters die erlaubten Buchstaben"
+
+    muster = re.sub(r'\s+', '', muster).upper()
+    if art == 'IUPAC':
+        unbekannt = set(muster) - set(iupac)
+        if unbekannt:
+            raise ValueError(f'Kein IUPAC-Code: {"".join(sorted(unbekannt))}')
+        return [iupac[c].encode('ascii') for c in muster]
+    return [bytes([c]) for c in muster.encode('ascii', 'replace')]
+
+
+class _Eintrag(QObject):
+    """
+    Der Index einer Sequenz
+
+    text ist der Text ohne leere Basen in Großbuchstaben, spalten die Spalte
+    jeder seiner Basen in der Sequenz. kmere enthält die k-mere ab jeder
+    Position des Textes als Zahl, aufsteigend sortiert, stellen die
+    zugehörigen Positionen. Am Ende wird mit Nullbytes aufgefüllt, so dass
+    auch die letzten Positionen ein k-mer haben.
+    """
+
+    geaendert = Signal()
+
+    def __init__(self, sequenz: Sequenz, k: int):
+        super().__init__()
+        self.sequenz = sequenz
+        self.k = k
+        self.text: bytes = None
+        self.spalten: np.ndarray = None
+        self.kmere: np.ndarray = None
+        self.stellen: np.ndarray = None
+        sequenz.basenInserted.connect(self.basenEingefuegt)
+        sequenz.basenRemoved.connect(self.basenEntfernt)
+        sequenz.basenRenewed.connect(self.verwerfen)
+
+    def trennen(self):
+        self.sequenz.basenInserted.disconnect(self.basenEingefuegt)
+        self.sequenz.basenRemoved.disconnect(self.basenEntfernt)
+        self.sequenz.basenRenewed.disconnect(self.verwerfen)
+
+    def verwerfen(self):
+        self.text = None
+        self.geaendert.emit()
+
+    def basenEingefuegt(self, pos: int, anzahl: int):
+        if self.text is None:
+            return
+        chars = self.sequenz.chars(pos, anzahl)
+        neu = np.flatnonzero(np.frombuffer(chars, dtype=np.uint8) != leerbase[0])
+        t = np.searchsorted(self.spalten, pos)
+        if not len(neu):
+            # Nur leere Basen, der Text bleibt gleich
+            self.spalten[t:] += anzahl
+        else:
+            self.spalten = np.concatenate((self.spalten[:t], neu + pos, self.spalten[t:] + anzahl))
+            self.text = self.text[:t] + chars.replace(leerbase, b'').upper() + self.text[t:]
+            self._ersetzeKmere(t, t, len(neu))
+        self.geaendert.emit()
+
+    def basenEntfernt(self, pos: int, anzahl: int):
+        if self.text is None:
+            return
+        t, u = np.searchsorted(self.spalten, [pos, pos+anzahl])
+        if u == t:
+            self.spalten[t:] -= anzahl
+        else:
+            self.spalten = np.concatenate((self.spalten[:t], self.spalten[u:] - anzahl))
+            self.text = self.text[:t] + self.text[u:]
+            self._ersetzeKmere(t, u, t-u)
+        self.geaendert.emit()
+
+    def _kmere(self, von: int, bis: int) -> np.ndarray:
+        "Die k-mere ab den Positionen von bis vor bis im aktuellen Text"
+
+        aufgefuellt = np.frombuffer(self.text[von:bis+self.k-1] + bytes(self.k), dtype=np.uint8).astype(np.int64)
+        n = bis - von
+        werte = np.zeros(n, dtype=np.int64)
+        for t in range(self.k):
+            werte = (werte << 8) | aufgefuellt[t:t+n]
+        return werte
+
+    def _ersetzeKmere(self, von: int, bis: int, verschiebung: int):
+        """
+        Trägt nach, dass der Text von von bis vor bis durch bis-von+verschiebung
+        neue Buchstaben ersetzt wurde.
+
+        Die k-mere, die in den alten Bereich reichen, werden entfernt, die
+        Positionen dahinter verschoben und die k-mere über den neuen Bereich
+        aus dem schon geänderten Text berechnet und einsortiert.
+        """
+
+        anfang = max(von - self.k + 1, 0)
+        weg = np.flatnonzero((self.stellen >= anfang) & (self.stellen < bis))
+        kmere = np.delete(self.kmere, weg)
+        stellen = np.delete(self.stellen, weg)
+        stellen += (stellen >= bis) * verschiebung
+        werte = self._kmere(anfang, bis + verschiebung)
+        ordnung = np.argsort(werte, kind='stable')
+        einfuegen = np.searchsorted(kmere, werte[ordnung])
+        self.kmere = np.insert(kmere, einfuegen, werte[ordnung])
+        self.stellen = np.insert(stellen, einfuegen, ordnung + anfang)
+
+    @logme(logger.debug)
+    def aufbauen(self):
+        chars = self.sequenz.basenstr.encode('ascii')
+        roh = np.frombuffer(chars, dtype=np.uint8)
+        self.spalten = np.flatnonzero(roh != leerbase[0])
+        self.text = chars.replace(leerbase, b'').upper()
+        werte = self._kmere(0, len(self.text))
+        self.stellen = np.argsort(werte, kind='stable')
+        self.kmere = werte[self.stellen]
+
+    def bereit(self) -> '_Eintrag':
+        if self.text is None:
+            self.aufbauen()
+        return self
+
+    def kandidaten(self, praefix: bytes) -> np.ndarray:
+        "Alle Positionen des Textes, an denen praefix (höchstens k Buchstaben) steht"
+
+        verschiebung = 8*(self.k - len(praefix))
+        wert = int.from_bytes(praefix, 'big')
+        von, bis = np.searchsorted(self.kmere, [wert << verschiebung, (wert+1) << verschiebung])
+        return self.stellen[von:bis]
+
+    def fundstellen(self, anfaenge: np.ndarray, laenge: int) -> list[Fundstelle]:
+        enden = self.spalten[anfaenge + laenge - 1] + 1
+        return [Fundstelle(self.sequenz, start, ende) for start, ende in zip(self.spalten[anfaenge].tolist(), enden.tolist())]
+
+
+class Suchindex(QObject):
+    """
+    Sucht in allen Sequenzen des Models
+
+    indexChanged wird gesendet, wenn sich Sequenzen geändert haben und
+    frühere Fundstellen deshalb nicht mehr stimmen müssen.
+    """
+
+    indexChanged = Signal()
+
+    def __init__(self, parent: QObject, model: SequenzenModel, k: int = 8):
+        super().__init__(parent)
+        self._model = model
+        self._k = k
+        self._eintraege: dict[Sequenz, _Eintrag] = {}
+        model.sequenzenRenewed.connect(self.sequenzenErneuert)
+        model.sequenzenAdded.connect(self.sequenzenHinzu)
+        model.sequenzenRemoved.connect(self.sequenzenWeg)
+        self.sequenzenHinzu(model.sequenzen)
+
+    @property
+    def model(self):
+        return self._model
+
+    def sequenzenErneuert(self):
+        self.sequenzenWeg(list(self._eintraege))
+        self.sequenzenHinzu(self.model.sequenzen)
+
+    def sequenzenHinzu(self, sequenzen: list[Sequenz]):
+        for sequenz in sequenzen:
+            if sequenz not in self._eintraege:
+                eintrag = self._eintraege[sequenz] = _Eintrag(sequenz, self._k)
+                eintrag.geaendert.connect(self.indexChanged)
+        self.indexChanged.emit()
+
+    def sequenzenWeg(self, sequenzen: list[Sequenz]):
+        for sequenz in sequenzen:
+            eintrag = self._eintraege.pop(sequenz, None)
+            if eintrag is not None:
+                eintrag.trennen()
+        self.indexChanged.emit()
+
+    @logme(logger.debug)
+    def suche(self, muster: str, art: str = 'Motiv') -> list[Fundstelle]:
+        """
+        Alle Fundstellen von muster, nach Sequenzen und Spalten geordnet.
+
+        art ist Motiv, IUPAC oder Regex. Motive und IUPAC-Muster ignorieren
+        Groß- und Kleinschreibung und finden auch überlappende Stellen.
+        """
+
+        eintraege = [self._eintraege[sequenz].bereit() for sequenz in self.model.sequenzen]
+        if art == 'Regex':
+            ausdruck = re.compile(muster.encode('ascii', 'replace'), re.IGNORECASE)
+            fundstellen = []
+            for eintrag in eintraege:
+                for fund in ausdruck.finditer(eintrag.text):
+                    if fund.end() > fund.start():
+                        fundstellen.append(Fundstelle(eintrag.sequenz, int(eintrag.spalten[fund.start()]), int(eintrag.spalten[fund.end()-1]) + 1))
+            return fundstellen
+
+        klassen = zeichenklassen(muster, art)
+        if not klassen:
+            return []
+        # Das Fenster mit den wenigsten Varianten wird im Index nachgeschlagen
+        breite = min(self._k, len(klassen))
+        versatz = min(range(len(klassen)-breite+1), key=lambda i: np.prod([len(c) for c in klassen[i:i+breite]]))
+        fenster = klassen[versatz:versatz+breite]
+        varianten = np.prod([len(c) for c in fenster])
+        erlaubt = np.zeros((len(klassen), 256), dtype=bool)
+        for i, klasse in enumerate(klassen):
+            erlaubt[i, list(klasse)] = True
+
+        fundstellen = []
+        for eintrag in eintraege:
+            if varianten <= maxvarianten:
+                anfaenge = np.concatenate([eintrag.kandidaten(bytes(variante)) for variante in product(*fenster)]) - versatz
+                anfaenge = np.sort(anfaenge[(anfaenge >= 0) & (anfaenge + len(klassen) <= len(eintrag.text))])
+            else:
+                anfaenge = np.arange(len(eintrag.text) - len(klassen) + 1)
+            # Die Stellen außerhalb des Fensters prüfen
+            text = np.frombuffer(eintrag.text, dtype=np.uint8)
+            for i in range(len(klassen)):
+                if varianten > maxvarianten or not versatz <= i < versatz+breite:
+                    anfaenge = anfaenge[erlaubt[i, text[anfaenge + i]]]
+            fundstellen += eintrag.fundstellen(anfaenge, len(klassen))
+        return fundstellen
@@ -0,0 +1,113 @@
+"""
+GC-Gehalt, Skew und Basenzusammensetzung im gleitenden Fenster
+
+Für jede Sequenz werden einmal die Präfixsummen von A, C, G und T über die
+Basen ohne Lücken gebildet. Die Anzahl einer Base in jedem Fenster ist dann
+die Differenz zweier Präfixsummen, so dass jede Fensterbreite in O(n)
+berechnet wird. Die Präfixsummen werden verworfen, sobald sich die Basen
+der Sequenz ändern.
+
+Die Werte gelten für das Fenster um die Base in jeder Spalte, bei leeren
+Basen um die nächste Base danach. So passen sie zu den Spalten der Scene.
+"""
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+
+from bioinformatik import Sequenz, leerbase
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+KURVEN = ('GC', 'AT-Skew', 'GC-Skew', 'A', 'C', 'G', 'T')
+
+_basencodes = np.full(256, 4, dtype=np.intp)
+for _i, _c in enumerate(b'ACGT'):
+    _basencodes[_c] = _basencodes[_c+32] = _i
+_basencodes[ord('U')] = _basencodes[ord('u')] = 3
+
+
+class Zusammensetzung(QObject):
+    """
+    Zwischenspeicher der Präfixsummen je Sequenz
+
+    verworfen(sequenz) wird gesendet, wenn die Präfixsummen einer Sequenz
+    durch eine Änderung ungültig geworden sind.
+    """
+
+    verworfen = Signal(Sequenz)
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self._praefixe: dict[Sequenz, tuple[np.ndarray, np.ndarray]] = {}
+
+    def _trennen(self, sequenz: Sequenz):
+        if self._praefixe.pop(sequenz, None) is not None:
+            sequenz.basenRenewed.disconnect(self._verwerfen)
+            sequenz.basenInserted.disconnect(self._verwerfen)
+            sequenz.basenRemoved.disconnect(self._verwerfen)
+
+    def _verwerfen(self, *args):
+        sequenz = self.sender()
+        self._trennen(sequenz)
+        self.verworfen.emit(sequenz)
+
+    def behalten(self, sequenzen: list[Sequenz]):
+        "Verwirft die Präfixsummen aller Sequenzen, die nicht in sequenzen sind."
+
+        for sequenz in list(self._praefixe):
+            if sequenz not in sequenzen:
+                self._trennen(sequenz)
+
+    @logme(logger.debug)
+    def praefixe(self, sequenz: Sequenz) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Die Präfixsummen (4, n+1) von A, C, G und T über die n Basen ohne
+        Lücken und für jede Spalte die Nummer ihrer Base
+        """
+
+        if sequenz not in self._praefixe:
+            roh = np.frombuffer(sequenz.basenstr.encode('ascii'), dtype=np.uint8)
+            basen = roh != leerbase[0]
+            codes = _basencodes[roh[basen]]
+            praefixe = np.zeros((4, len(codes)+1), dtype=np.int64)
+            for code in range(4):
+                np.cumsum(codes == code, out=praefixe[code, 1:])
+            nummern = np.cumsum(basen) - basen
+            self._praefixe[sequenz] = praefixe, nummern
+            sequenz.basenRenewed.connect(self._verwerfen)
+            sequenz.basenInserted.connect(self._verwerfen)
+            sequenz.basenRemoved.connect(self._verwerfen)
+        return self._praefixe[sequenz]
+
+    def fenster(self, sequenz: Sequenz, breite: int, spalten: np.ndarray = None) -> dict[str, np.ndarray]:
+        """
+        Die Kurven aus KURVEN für die Spalten der Sequenz, ohne spalten für alle.
+
+        breite ist die Anzahl der Basen im Fenster. Am Anfang und Ende der
+        Sequenz wird das Fenster verschoben, so dass es ganz in ihr liegt.
+        Skews sind (A-T)/(A+T) und (G-C)/(G+C), ohne diese Basen 0.
+        """
+
+        praefixe, nummern = self.praefixe(sequenz)
+        if spalten is not None:
+            nummern = nummern[spalten]
+        n = praefixe.shape[1] - 1
+        breite = max(min(breite, n), 1)
+        von = np.clip(nummern - breite//2, 0, max(n-breite, 0))
+        bis = np.minimum(von + breite, n)
+        # Zeilenweise ist das Nachschlagen viel schneller als mit praefixe[:, bis]
+        a, c, g, t = (praefixe[code][bis] - praefixe[code][von] for code in range(4))
+        gesamt = np.maximum(bis - von, 1)
+        atskew = np.divide(a-t, a+t, out=np.zeros(len(a)), where=a+t > 0)
+        gcskew = np.divide(g-c, g+c, out=np.zeros(len(g)), where=g+c > 0)
+        return {
+            'GC': (g+c) / gesamt,
+            'AT-Skew': atskew,
+            'GC-Skew': gcskew,
+            'A': a / gesamt,
+            'C': c / gesamt,
+            'G': g / gesamt,
+            'T': t / gesamt,
+        }
@@ -0,0 +1,198 @@
+import numpy as np
+from PySide6.QtCore import QPointF, QTimer, Signal
+from PySide6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PySide6.QtWidgets import (
+    QCheckBox, QComboBox, QHBoxLayout, QVBoxLayout, QLabel, QSpinBox, QWidget
+)
+
+from bioinformatik import Sequenz
+from sceneitems import Spaltenlayout
+from sequenzenmodel import SequenzenModel, SequenzenViewModel
+from zusammensetzung import KURVEN, Zusammensetzung
+
+import logging
+from logger import logme
+logger = logging.getLogger(__name__)
+
+kurvenfarben = {
+    'GC': 'black', 'AT-Skew': 'darkorange', 'GC-Skew': 'purple',
+    'A': 'green', 'C': 'red', 'G': 'magenta', 'T': 'blue',
+}
+
+
+class Kurvenbild(QWidget):
+    """
+    Zeichnet die Kurven über den angezeigten Spalten
+
+    Die y-Achse reicht von -1 bis 1, Anteile liegen also in der oberen
+    Hälfte. Die Kurven enthalten nur die Werte an den Spalten in spalten,
+    höchstens eine je Pixel, und werden gleichmäßig über die Breite verteilt.
+    """
+
+    groesseChanged = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.setMinimumHeight(120)
+        self.setMouseTracking(True)
+        self._spalten: list[int] = []
+        self._kurven: dict[str, np.ndarray] = {}
+        self._maus: int = None
+
+    def setzeKurven(self, spalten: list[int], kurven: dict[str, np.ndarray]):
+        self._spalten = spalten
+        self._kurven = kurven
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.groesseChanged.emit()
+
+    def mouseMoveEvent(self, event):
+        self._maus = int(event.position().x())
+        self.update()
+
+    def leaveEvent(self, event):
+        self._maus = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor('white'))
+        breite, hoehe = self.width(), self.height()
+        painter.setPen(QPen(QColor('lightgray')))
+        for wert in (-1, -0.5, 0, 0.5, 1):
+            y = (1-wert)/2 * (hoehe-1)
+            painter.drawLine(QPointF(0, y), QPointF(breite, y))
+        anzahl = len(self._spalten)
+        if not anzahl or not self._kurven:
+            return
+
+        x = np.linspace(0, breite-1, anzahl)
+        painter.setRenderHint(QPainter.Antialiasing)
+        for name, werte in self._kurven.items():
+            y = (1-werte)/2 * (hoehe-1)
+            painter.setPen(QPen(QColor(kurvenfarben[name]), 1.5))
+            painter.drawPolyline(QPolygonF([QPointF(*p) for p in zip(x.tolist(), y.tolist())]))
+
+        if self._maus is not None and 0 <= self._maus < breite:
+            i = round(self._maus * (anzahl-1) / max(breite-1, 1))
+            painter.setPen(QPen(QColor('gray')))
+            painter.drawLine(QPointF(self._maus, 0), QPointF(self._maus, hoehe))
+            text = ', '.join(f'{name} {werte[i]:.2f}' for name, werte in self._kurven.items())
+            painter.setPen(QPen(QColor('black')))
+            painter.drawText(QPointF(4, 14), f'Spalte {self._spalten[i]+1}: {text}')
+
+
+class ZusammensetzungWidget(QWidget):
+    """
+    GC-Gehalt, Skew und Zusammensetzung einer Sequenz im gleitenden Fenster
+
+    Die Kurven laufen über die Spalten, wie sie in der Scene angezeigt
+    werden, versteckte Spalten fehlen also auch hier. Die Combobox enthält nur
+    die Namen, die Sequenzen dazu stehen in _sequenzen. Als Daten der Einträge
+    würden sie nicht festgehalten und könnten nach einem neuen Projekt schon
+    gelöscht sein.
+    """
+
+    def __init__(self, model: SequenzenModel, viewmodel: SequenzenViewModel, spaltenlayout: Spaltenlayout):
+        super().__init__()
+        self._model = model
+        self._viewmodel = viewmodel
+        self._spaltenlayout = spaltenlayout
+        self._sequenzen: list[Sequenz] = []
+        self._zusammensetzung = Zusammensetzung(self)
+        self._neuzeichnen = QTimer(self)
+        self._neuzeichnen.setSingleShot(True)
+        self._neuzeichnen.setInterval(200)
+        self._neuzeichnen.timeout.connect(self.berechne)
+
+        vbox = QVBoxLayout()
+        self.setLayout(vbox)
+        self._cb_sequenz = QComboBox()
+        self._sb_fenster = QSpinBox()
+        self._sb_fenster.setRange(1, 1000000)
+        self._sb_fenster.setValue(100)
+        self._sb_fenster.setSuffix(' Basen')
+        hbox = QHBoxLayout()
+        hbox.addWidget(QLabel('Sequenz'))
+        hbox.addWidget(self._cb_sequenz, 1)
+        hbox.addWidget(QLabel('Fenster'))
+        hbox.addWidget(self._sb_fenster)
+        self._checkboxen: dict[str, QCheckBox] = {}
+        for name in KURVEN:
+            checkbox = self._checkboxen[name] = QCheckBox(name)
+            checkbox.setStyleSheet(f'color: {kurvenfarben[name]}')
+            checkbox.setChecked(name in ('GC', 'GC-Skew'))
+            checkbox.stateChanged.connect(self.berechne)
+            hbox.addWidget(checkbox)
+        self._kurvenbild = Kurvenbild()
+        self._kurvenbild.groesseChanged.connect(self._spaeter)
+        vbox.addLayout(hbox)
+        vbox.addWidget(self._kurvenbild)
+
+        self._cb_sequenz.currentIndexChanged.connect(self.berechne)
+        self._sb_fenster.valueChanged.connect(self._spaeter)
+        self._zusammensetzung.verworfen.connect(self._verworfen)
+        self.model.sequenzenRenewed.connect(self.sequenzenAuflisten)
+        self.model.sequenzenAdded.connect(self.sequenzenAuflisten)
+        self.model.sequenzenRemoved.connect(self.sequenzenAuflisten)
+        self.model.verstecktAdded.connect(self._spaeter)
+        self.model.verstecktRemoved.connect(self._spaeter)
+        self.viewmodel.zeigeverstecktChanged.connect(self._spaeter)
+        self.sequenzenAuflisten()
+
+    @property
+    def model(self):
+        return self._model
+
+    @property
+    def viewmodel(self):
+        return self._viewmodel
+
+    @property
+    def spaltenlayout(self) -> Spaltenlayout:
+        return self._spaltenlayout
+
+    @property
+    def sequenz(self) -> Sequenz:
+        index = self._cb_sequenz.currentIndex()
+        return self._sequenzen[index] if 0 <= index < len(self._sequenzen) else None
+
+    def sequenzenAuflisten(self, *args):
+        alt = self.sequenz
+        self._zusammensetzung.behalten(self.model.sequenzen)
+        self._cb_sequenz.blockSignals(True)
+        self._cb_sequenz.clear()
+        self._sequenzen = list(self.model.sequenzen)
+        self._cb_sequenz.addItems([sequenz.name for sequenz in self._sequenzen])
+        if alt in self.model.sequenzen:
+            self._cb_sequenz.setCurrentIndex(self.model.sequenzen.index(alt))
+        self._cb_sequenz.blockSignals(False)
+        self.berechne()
+
+    def _verworfen(self, sequenz: Sequenz):
+        if sequenz is self.sequenz:
+            self._spaeter()
+
+    def _spaeter(self, *args):
+        self._neuzeichnen.start()
+
+    @logme(logger.debug)
+    def berechne(self, *args):
+        self._neuzeichnen.stop()
+        sequenz = self.sequenz
+        if sequenz is None or not self.isVisible():
+            self._kurvenbild.setzeKurven([], {})
+            return
+        # Berechnet wird nur an den Spalten, die auch gezeichnet werden
+        self.spaltenlayout.anpassen()
+        anzahl = self.spaltenlayout.anzahlSpalten(sequenz.laenge)
+        stellen = np.linspace(0, anzahl-1, min(anzahl, max(self._kurvenbild.width(), 2))).astype(np.intp)
+        spalten = [self.spaltenlayout.spalten[i] for i in stellen.tolist()]
+        kurven = self._zusammensetzung.fenster(sequenz, self._sb_fenster.value(), np.array(spalten, dtype=np.intp))
+        self._kurvenbild.setzeKurven(spalten, {name: kurven[name] for name in KURVEN if self._checkboxen[name].isChecked()})
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.berechne()